@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark del generador procedural de láminas Ishihara.
+
+Mide el tiempo de generación por lámina al tamaño que calcula
+calculate_scaling() para las pantallas usadas en los kioscos.
+
+Uso:
+    python3 scripts/benchmark_generador.py
+    python3 scripts/benchmark_generador.py --screen 800x480 --plates 6 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib.PlateCache import image_size_for_screen  # noqa: E402
+from lib.PlateGenerator import IshiharaPlateGenerator  # noqa: E402
+
+DEFAULT_SCREENS = ["800x480", "1024x600", "1280x720", "1920x1080"]
+
+
+def benchmark(size, plates, repeat):
+    """Devuelve (mejor, media) en ms por lámina"""
+    per_plate = []
+    for r in range(repeat):
+        generator = IshiharaPlateGenerator(size, seed=r)
+        start = time.perf_counter()
+        generator.generate_set(plates)
+        per_plate.append((time.perf_counter() - start) * 1000 / plates)
+    return min(per_plate), sum(per_plate) / len(per_plate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del generador de láminas')
+    parser.add_argument('--screen', action='append', help='Resolución, p. ej. 800x480 (repetible)')
+    parser.add_argument('--plates', type=int, default=6, help='Láminas por juego')
+    parser.add_argument('--repeat', type=int, default=5, help='Juegos generados por pantalla')
+    args = parser.parse_args()
+
+    print(f"{'Pantalla':>10} {'Lámina':>7} {'Mejor ms':>9} {'Media ms':>9} {'Juego ms':>9}")
+    for screen in args.screen or DEFAULT_SCREENS:
+        width, height = (int(v) for v in screen.lower().split('x'))
+        size = image_size_for_screen(width, height)
+        best, mean = benchmark(size, args.plates, args.repeat)
+        print(f"{screen:>10} {size:>6}px {best:>9.1f} {mean:>9.1f} {mean * args.plates:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
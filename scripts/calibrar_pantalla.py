@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Calibra el color de la pantalla del kiosco y hornea las láminas corregidas.
+
+1. Generar los parches a medir (se muestran a pantalla completa y se mide
+   cada uno con un colorímetro, anotando el sRGB medido en "measured"):
+       python3 scripts/calibrar_pantalla.py --patrones parches.json
+2. Ajustar la LUT 3D con las medidas, guardarla en
+   ~/.config/daltonismo/calibration.npz y hornear la caché de láminas:
+       python3 scripts/calibrar_pantalla.py --medidas parches.json --screen 800x480
+
+Formato de parches.json:
+    {"patches": [{"target": [r, g, b], "measured": [r, g, b]}, ...]}  (0-255)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib.ColorCalibration import DEFAULT_LUT_SIZE, fit_lut, patch_targets  # noqa: E402
+from lib.PlateCache import PlateRenderCache, image_size_for_screen  # noqa: E402
+
+IMAGES_DIR = os.path.join(PROJECT_ROOT, "assets", "images")
+
+
+def load_plates(images):
+    """Láminas tal como las carga IshiharaImageLoader, sin tocar el hardware"""
+    # dalton.py lee sus propios argumentos al importarse
+    argv = sys.argv
+    sys.argv = [argv[0], "--no-hardware"]
+    try:
+        from dalton import IshiharaImageLoader
+    finally:
+        sys.argv = argv
+    return IshiharaImageLoader(images).test_plates
+
+
+def write_patterns(path, steps):
+    patches = [{"target": target, "measured": None} for target in patch_targets(steps)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"patches": patches}, f, indent=1)
+    print(f"✓ {len(patches)} parches escritos en {path}; completa 'measured' con las medidas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calibración de color de la pantalla')
+    parser.add_argument('--patrones', help='Escribir la lista de parches a medir en este archivo')
+    parser.add_argument('--pasos', type=int, default=5, help='Niveles por canal de los parches')
+    parser.add_argument('--medidas', help='Archivo de parches con las medidas')
+    parser.add_argument('--lut-size', type=int, default=DEFAULT_LUT_SIZE, help='Nodos por eje de la LUT')
+    parser.add_argument('--output', help='Ruta de la LUT (por defecto ~/.config/daltonismo/calibration.npz)')
+    parser.add_argument('--screen', default='800x480', help='Resolución de pantalla para hornear')
+    parser.add_argument('--images', default=IMAGES_DIR, help='Directorio de láminas')
+    parser.add_argument('--cache-dir', help='Directorio de caché de láminas')
+    args = parser.parse_args()
+
+    if args.patrones:
+        write_patterns(args.patrones, args.pasos)
+        return
+    if not args.medidas:
+        parser.error("indica --patrones o --medidas")
+
+    with open(args.medidas, encoding="utf-8") as f:
+        patches = [p for p in json.load(f)["patches"] if p.get("measured")]
+
+    start = time.perf_counter()
+    lut = fit_lut([p["target"] for p in patches], [p["measured"] for p in patches], args.lut_size)
+    fit_time = time.perf_counter() - start
+    path = lut.save(args.output)
+    print(f"✓ LUT {lut.size}^3 ({lut.fingerprint}) ajustada con {len(patches)} parches "
+          f"en {fit_time:.2f}s -> {path}")
+
+    width, height = (int(v) for v in args.screen.lower().split('x'))
+    size = image_size_for_screen(width, height)
+    plates = load_plates(args.images)
+    cache = PlateRenderCache(args.cache_dir, lut=lut)
+    start = time.perf_counter()
+    rendered = cache.warm(plates, size)
+    bake_time = time.perf_counter() - start
+    per_plate = bake_time / rendered * 1000 if rendered else 0.0
+    print(f"✓ Horneadas {rendered}/{len(plates)} láminas a {size}px en {bake_time:.2f}s "
+          f"({per_plate:.1f} ms por lámina)")
+
+
+if __name__ == "__main__":
+    main()
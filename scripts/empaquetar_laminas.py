@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Empaqueta las láminas de assets/images en un único archivo pre-decodificado.
+
+El paquete (assets/images/plates.dpk) contiene los píxeles RGB de cada lámina
+y sus respuestas, opciones y dificultad. Cuando existe, IshiharaImageLoader lo
+abre con mmap y no vuelve a buscar ni decodificar los archivos sueltos.
+
+Si después cambia alguna lámina o el manifiesto, el cargador detecta el
+paquete desactualizado y usa los archivos sueltos hasta volver a empaquetar.
+
+Uso:
+    python3 scripts/empaquetar_laminas.py              # Resolución original
+    python3 scripts/empaquetar_laminas.py --size 512   # Pre-escaladas a 512 px
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib.PlateCache import file_sha256  # noqa: E402
+from lib.PlateManifest import MANIFEST_FILENAME, PlateManifest  # noqa: E402
+from lib.PlatePack import PACK_FILENAME, PlatePack, source_fingerprint, write_pack  # noqa: E402
+from lib.PlateStore import PLATES_CONFIG, decode_for_size, find_plate_file  # noqa: E402
+
+IMAGES_DIR = os.path.join(PROJECT_ROOT, "assets", "images")
+
+
+def plate_shape(path, size=None):
+    """Forma (alto, ancho, 3) que tendrá la lámina decodificada, leyendo solo la cabecera"""
+    if size is not None:
+        return (size, size, 3)
+    with Image.open(path) as img:
+        return (img.height, img.width, 3)
+
+
+def collect_plates(directory, size=None):
+    """Describe cada lámina del manifiesto (o de PLATES_CONFIG si no hay) sin decodificarla"""
+    manifest = PlateManifest(directory)
+    if manifest.exists():
+        return [{
+            "name": entry["name"],
+            "correct": entry["correct"],
+            "options": entry["options"],
+            "difficulty": entry["difficulty"],
+            "control": entry.get("control", False),
+            "sha256": entry["sha256"],
+            "source": source_fingerprint(directory, entry["file"]),
+            "scaled": size is not None,
+            "path": entry["path"],
+            "shape": plate_shape(entry["path"], size),
+        } for entry in manifest.validated_entries()]
+
+    plates = []
+    for name, config in PLATES_CONFIG.items():
+        path = find_plate_file(directory, name)
+        if path is None:
+            print(f"⚠ Falta la lámina {name}, se omite")
+            continue
+        plates.append({
+            "name": name,
+            "correct": config["correct"],
+            "options": config["options"],
+            "difficulty": config["difficulty"],
+            "control": config.get("control", False),
+            "sha256": file_sha256(path),
+            "source": source_fingerprint(directory, os.path.basename(path)),
+            "scaled": size is not None,
+            "path": path,
+            "shape": plate_shape(path, size),
+        })
+    return plates
+
+
+def decode_plates(plates, size=None):
+    """Decodifica las láminas de una en una, a medida que write_pack las escribe"""
+    for plate in plates:
+        print(f"  + {os.path.basename(plate['path'])}")
+        yield np.asarray(decode_for_size(plate["path"], size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Empaqueta las láminas Ishihara en un archivo mmap')
+    parser.add_argument('--images', default=IMAGES_DIR, help='Directorio de láminas')
+    parser.add_argument('--output', help=f'Archivo de salida (por defecto <images>/{PACK_FILENAME})')
+    parser.add_argument('--size', type=int, help='Pre-escalar a este lado en px')
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.images, PACK_FILENAME)
+    start = time.perf_counter()
+    # El hash del manifiesto y las huellas de cada fuente permiten al cargador
+    # detectar un paquete desactualizado y volver a los archivos sueltos
+    manifest_path = os.path.join(args.images, MANIFEST_FILENAME)
+    manifest_sha256 = file_sha256(manifest_path) if os.path.exists(manifest_path) else None
+    plates = collect_plates(args.images, args.size)
+    count = write_pack(output, plates, manifest_sha256, decode_plates(plates, args.size))
+    elapsed = time.perf_counter() - start
+
+    # Verificar que el paquete se abre correctamente
+    pack = PlatePack(output)
+    pack.close()
+    print(f"✓ {count} láminas empaquetadas en {output} ({os.path.getsize(output) / 1024:.0f} KB, {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
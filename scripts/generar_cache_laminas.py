@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Pre-genera la caché de láminas Ishihara escaladas.
+
+Pensado para ejecutarse durante la instalación o en el primer arranque, de
+modo que la primera sesión ya no tenga que escalar láminas en el hilo de Tk.
+
+Uso:
+    python3 scripts/generar_cache_laminas.py                  # Detecta la pantalla con tkinter
+    python3 scripts/generar_cache_laminas.py --screen 800x480 # Pantalla táctil oficial
+    python3 scripts/generar_cache_laminas.py --size 336       # Tamaño explícito en px
+"""
+
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib.ColorCalibration import ColorLUT  # noqa: E402
+from lib.PlateCache import PlateRenderCache, image_size_for_screen  # noqa: E402
+
+IMAGES_DIR = os.path.join(PROJECT_ROOT, "assets", "images")
+
+
+def detect_screen():
+    """Obtiene el tamaño de la pantalla mediante tkinter"""
+    import tkinter as tk
+    root = tk.Tk()
+    root.withdraw()
+    size = (root.winfo_screenwidth(), root.winfo_screenheight())
+    root.destroy()
+    return size
+
+
+def find_plate_sources(directory):
+    """Un archivo por lámina, con la misma prioridad de extensiones que el cargador"""
+    sources = {}
+    for ext in ['png', 'jpg', 'jpeg']:
+        for name in sorted(os.listdir(directory)):
+            stem, file_ext = os.path.splitext(name)
+            if file_ext.lower() == f".{ext}" and stem not in sources:
+                sources[stem] = os.path.join(directory, name)
+    return list(sources.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-genera la caché de láminas escaladas')
+    parser.add_argument('--size', type=int, help='Lado de la lámina en px')
+    parser.add_argument('--screen', help='Resolución de pantalla, p. ej. 800x480')
+    parser.add_argument('--images', default=IMAGES_DIR, help='Directorio de láminas')
+    parser.add_argument('--cache-dir', help='Directorio de caché (por defecto ~/.cache/daltonismo/plates)')
+    parser.add_argument('--calibration', help='LUT de calibración (por defecto ~/.config/daltonismo/calibration.npz)')
+    args = parser.parse_args()
+
+    if args.size:
+        size = args.size
+    else:
+        if args.screen:
+            width, height = (int(v) for v in args.screen.lower().split('x'))
+        else:
+            width, height = detect_screen()
+        size = image_size_for_screen(width, height)
+
+    cache = PlateRenderCache(args.cache_dir, lut=ColorLUT.load(args.calibration))
+    sources = find_plate_sources(args.images)
+    start = time.perf_counter()
+    rendered = cache.warm(sources, size)
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ Caché en {cache.cache_dir}")
+    print(f"  Láminas: {len(sources)}  renderizadas: {rendered}  tamaño: {size}px  tiempo: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
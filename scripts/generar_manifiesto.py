@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Crea o actualiza assets/images/manifest.json.
+
+Si el manifiesto no existe se genera a partir de PLATES_CONFIG; si existe se
+conservan sus respuestas, opciones y dificultades y solo se recalcula el
+SHA-256 de cada archivo. Ejecutar después de añadir o modificar láminas.
+
+Uso:
+    python3 scripts/generar_manifiesto.py
+    python3 scripts/generar_manifiesto.py --images /ruta/a/laminas
+"""
+
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib.PlateCache import file_sha256  # noqa: E402
+from lib.PlateManifest import MANIFEST_FILENAME, read_manifest, write_manifest  # noqa: E402
+from lib.PlateStore import PLATES_CONFIG, find_plate_file  # noqa: E402
+
+IMAGES_DIR = os.path.join(PROJECT_ROOT, "assets", "images")
+
+
+def entries_from_config(directory):
+    """Entradas iniciales a partir de la tabla PLATES_CONFIG"""
+    entries = []
+    for name, config in PLATES_CONFIG.items():
+        path = find_plate_file(directory, name)
+        if path is None:
+            print(f"⚠ Falta la lámina {name}, se omite")
+            continue
+        entries.append({
+            "name": name,
+            "file": os.path.basename(path),
+            "correct": config["correct"],
+            "options": config["options"],
+            "difficulty": config["difficulty"],
+            "control": config.get("control", False),
+        })
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crea o actualiza el manifiesto de láminas')
+    parser.add_argument('--images', default=IMAGES_DIR, help='Directorio de láminas')
+    args = parser.parse_args()
+
+    manifest_path = os.path.join(args.images, MANIFEST_FILENAME)
+    if os.path.exists(manifest_path):
+        entries = read_manifest(manifest_path)
+    else:
+        entries = entries_from_config(args.images)
+
+    for entry in entries:
+        entry["sha256"] = file_sha256(os.path.join(args.images, entry["file"]))
+
+    write_manifest(manifest_path, entries)
+    print(f"✓ {len(entries)} láminas en {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Genera la pirámide multirresolución de las láminas (assets/images/pyramid).
+
+Cada lámina del manifiesto se pre-escala a los niveles de PYRAMID_LEVELS.
+En ejecución se usa el nivel más cercano al tamaño de la pantalla y el menor
+como miniatura en el reporte PDF. Los niveles de láminas que ya no están en
+el manifiesto se eliminan.
+
+Uso:
+    python3 scripts/generar_piramide.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib.PlateManifest import PlateManifest  # noqa: E402
+from lib.PlatePyramid import PYRAMID_DIRNAME, PlatePyramid  # noqa: E402
+
+IMAGES_DIR = os.path.join(PROJECT_ROOT, "assets", "images")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera la pirámide de láminas')
+    parser.add_argument('--images', default=IMAGES_DIR, help='Directorio de láminas con manifest.json')
+    args = parser.parse_args()
+
+    manifest = PlateManifest(args.images)
+    if not manifest.exists():
+        print("✗ No hay manifest.json; ejecuta primero scripts/generar_manifiesto.py")
+        sys.exit(1)
+
+    pyramid = PlatePyramid(os.path.join(args.images, PYRAMID_DIRNAME))
+    entries = manifest.validated_entries()
+    start = time.perf_counter()
+    written = sum(pyramid.build(entry["path"], entry["sha256"]) for entry in entries)
+    removed = pyramid.prune(entry["sha256"] for entry in entries)
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ Pirámide en {pyramid.directory}")
+    print(f"  Láminas: {len(entries)}  niveles {list(pyramid.levels)}  escritos: {written}  "
+          f"eliminados: {removed}  tiempo: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -61,6 +61,11 @@ if [[ $(uname -m) == arm* ]] || [[ $(uname -m) == aarch64 ]]; then
     fi
 fi
 
+# Pre-generar láminas escaladas para la pantalla actual (si hay display)
+echo ""
+echo "🖼️ Generando caché de láminas Ishihara..."
+python3 "$(dirname "$0")/generar_cache_laminas.py" || echo "⚠️ Se generará en el primer arranque"
+
 echo ""
 echo "✅ Instalación completada"
 echo ""
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Reproduce trazas del sensor ultrasónico por el detector de presencia.
+
+Compara el estimador filtrado (lib/Presence.py) con el umbral crudo anterior
+(una lectura contra MIN_DISTANCE cada 0.2/0.4 s): transiciones, abortos
+espurios y lecturas tomadas. La reproducción no espera, así que una traza
+de horas se evalúa en milisegundos y se pueden probar parámetros.
+
+Uso:
+    python3 scripts/reproducir_presencia.py --sintetica                 # Traza simulada con espurios
+    python3 scripts/reproducir_presencia.py traza.csv --dwell 3 --exit 70
+    python3 scripts/reproducir_presencia.py --grabar traza.csv --segundos 120   # En la Raspberry
+
+Formato CSV: t,distance  (segundos, cm; distance vacía = eco perdido)
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib import Presence  # noqa: E402
+from lib.Presence import PresenceEstimator, load_trace, replay, save_trace  # noqa: E402
+
+TRIG_PIN = 17
+ECHO_PIN = 27
+
+
+class RawThreshold:
+    """Detector anterior: una lectura cruda contra el umbral"""
+
+    def __init__(self, threshold=Presence.ENTER_CM):
+        self.threshold = threshold
+        self.present = False
+
+    def update(self, distance, now):
+        self.present = distance is not None and distance < self.threshold
+        return self.present
+
+    def interval(self):
+        return 0.2 if self.present else 0.4
+
+
+def synthetic_trace(seed, visits=4, rate=20.0):
+    """
+    Traza con visitas de usuarios, ruido y ecos espurios (lejanos o perdidos).
+
+    Returns:
+        (traza, transiciones reales [(t, presente)])
+    """
+    rng = random.Random(seed)
+    trace, truth = [], []
+    t = 0.0
+    step = 1.0 / rate
+
+    def emit(distance):
+        nonlocal t
+        if rng.random() < 0.08:
+            distance = None if rng.random() < 0.5 else rng.uniform(150, 400)
+        trace.append((t, distance))
+        t += step
+
+    for _ in range(visits):
+        for _ in range(int(rng.uniform(10, 30) * rate)):          # Nadie
+            emit(rng.uniform(180, 400) if rng.random() < 0.7 else None)
+        approach = int(2 * rate)
+        for i in range(approach):                                  # Se acerca
+            emit(150 - (110 * i / approach) + rng.gauss(0, 3))
+        truth.append((t, True))
+        for _ in range(int(rng.uniform(20, 60) * rate)):          # Hace el test
+            emit(rng.gauss(40, 4))
+        truth.append((t, False))
+        for i in range(approach):                                  # Se va
+            emit(40 + (160 * i / approach) + rng.gauss(0, 3))
+    return trace, truth
+
+
+def record_trace(path, seconds, period):
+    """Graba lecturas crudas del sensor real"""
+    import RPi.GPIO as GPIO
+    from lib.Ultrasonic import UltrasonicSensor
+
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(TRIG_PIN, GPIO.OUT)
+    GPIO.setup(ECHO_PIN, GPIO.IN)
+    GPIO.output(TRIG_PIN, False)
+    sensor = UltrasonicSensor(GPIO, TRIG_PIN, ECHO_PIN).start()
+    trace = []
+    start = time.monotonic()
+    try:
+        while time.monotonic() - start < seconds:
+            now = time.monotonic() - start
+            trace.append((now, sensor.measure()))
+            time.sleep(max(0.0, period - (time.monotonic() - start - now)))
+    finally:
+        sensor.close()
+        GPIO.cleanup()
+    save_trace(path, trace)
+    print(f"✓ {len(trace)} lecturas grabadas en {path} ({sensor.timeouts} ecos perdidos)")
+
+
+def summarize(name, transitions, samples, duration, truth=None):
+    exits = sum(1 for _, present in transitions if not present)
+    line = (f"  {name:<10} transiciones {len(transitions):>4}  salidas {exits:>4}  "
+            f"lecturas {samples:>6} ({samples / max(duration, 1e-9) * 60:.0f}/min)")
+    if truth is not None:
+        true_exits = sum(1 for _, present in truth if not present)
+        delays = []
+        for t_true, present in truth:
+            later = [t for t, p in transitions if p == present and t >= t_true - 1.0]
+            if later:
+                delays.append(later[0] - t_true)
+        line += f"  abortos espurios {max(0, exits - true_exits):>3}"
+        if delays:
+            line += f"  retardo medio {sum(delays) / len(delays):.2f}s"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reproduce trazas del sensor por el detector de presencia')
+    parser.add_argument('trazas', nargs='*', help='Archivos CSV t,distance')
+    parser.add_argument('--sintetica', action='store_true', help='Evaluar una traza simulada')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla de la traza simulada')
+    parser.add_argument('--guardar', help='Guardar la traza simulada en este CSV')
+    parser.add_argument('--grabar', help='Grabar una traza del sensor real en este CSV')
+    parser.add_argument('--segundos', type=float, default=60, help='Duración de la grabación')
+    parser.add_argument('--enter', type=float, default=Presence.ENTER_CM, help='Umbral de entrada (cm)')
+    parser.add_argument('--exit', type=float, default=Presence.EXIT_CM, help='Umbral de salida (cm)')
+    parser.add_argument('--dwell', type=float, default=Presence.EXIT_DWELL, help='Permanencia antes de abortar (s)')
+    parser.add_argument('--window', type=int, default=Presence.MEDIAN_WINDOW, help='Ventana de la mediana')
+    parser.add_argument('--alpha', type=float, default=Presence.EMA_ALPHA, help='Factor de la EMA')
+    args = parser.parse_args()
+
+    if args.grabar:
+        record_trace(args.grabar, args.segundos, 0.05)
+        return
+
+    traces = [(path, load_trace(path), None) for path in args.trazas]
+    if args.sintetica or not traces:
+        trace, truth = synthetic_trace(args.seed)
+        if args.guardar:
+            save_trace(args.guardar, trace)
+        traces.append((f"sintética (seed {args.seed})", trace, truth))
+
+    for name, trace, truth in traces:
+        if not trace:
+            print(f"⚠ {name}: traza vacía")
+            continue
+        duration = trace[-1][0] - trace[0][0]
+        print(f"✓ {name}: {len(trace)} muestras, {duration:.0f}s")
+        estimator = PresenceEstimator(args.enter, args.exit, args.window, args.alpha, args.dwell)
+        start = time.perf_counter()
+        transitions, samples = replay(trace, estimator)
+        elapsed = time.perf_counter() - start
+        summarize("filtrado", transitions, samples, duration, truth)
+        summarize("crudo", *replay(trace, RawThreshold(args.enter)), duration, truth)
+        print(f"  Reproducido en {elapsed * 1000:.1f} ms ({duration / max(elapsed, 1e-9):,.0f}x tiempo real)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Reproduce logs de sesiones del kiosco (--record-session) sin pantalla.
+
+Pasa las lecturas del sensor y las pulsaciones grabadas por la misma lógica
+que la interfaz (presencia, una respuesta por ronda, puntuación) y compara
+resultados, y presencia en cada inicio y aborto, con los grabados. El log
+simulado (--sintetica) lo escribe SimulatedKiosk, una copia sin pantalla de
+los manejadores de dalton.py, no el propio reproductor. Sin --velocidad no espera:
+un día de tráfico se reproduce en segundos; con --velocidad 20 va a 20x el
+tiempo real.
+
+Uso:
+    python3 scripts/reproducir_sesiones.py ~/.cache/daltonismo/sesiones/*.dlog
+    python3 scripts/reproducir_sesiones.py dia.dlog --velocidad 50
+    python3 scripts/reproducir_sesiones.py --sintetica 40 --guardar dia.dlog   # Log simulado
+
+Sale con código 1 si algún resultado reproducido no coincide con el grabado.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib.FakeGPIO import VirtualClock  # noqa: E402
+from lib.InputPipeline import InputPipeline  # noqa: E402
+from lib.PlateStore import PLATES_CONFIG  # noqa: E402
+from lib.Presence import PresenceEstimator  # noqa: E402
+from lib.Session import SessionEngine  # noqa: E402
+from lib.SessionLog import SessionRecorder, SessionReplay, read_log  # noqa: E402
+
+# Mismos nombres de color que el test de colores de dalton.py
+COLOR_NAMES = ["Rojo", "Verde", "Azul", "Amarillo", "Naranja", "Morado"]
+
+# Pausa de la interfaz antes de abrir la ronda siguiente (colores / Ishihara)
+ROUND_DELAY = {"colors": 0.6, "ishihara": 1.5}
+
+
+class SimulatedKiosk:
+    """
+    Manejadores de TestDaltonismoCompleto (dalton.py) sin pantalla ni hardware,
+    sobre un reloj virtual: misma presencia, mismos filtros de pulsación,
+    mismas marcas y mismas pausas entre rondas. No usa SessionReplay, así que
+    reproducir sus logs compara dos implementaciones y no una consigo misma.
+    """
+
+    def __init__(self, recorder, clock, plates):
+        self.recorder = recorder
+        self.clock = clock
+        self.plates = plates
+        self.presence = PresenceEstimator()
+        self.input = InputPipeline(clock=clock)
+        self.session = SessionEngine(COLOR_NAMES, plates)
+        self.current_test = "waiting"
+        self.user_nearby = False
+
+    def on_distance(self, distance):
+        """get_distance + on_distance del hilo del sensor"""
+        self.recorder.distance(distance)
+        was_nearby = self.user_nearby
+        self.user_nearby = self.presence.update(distance, self.clock())
+        if self.user_nearby and not was_nearby and self.current_test == "waiting":
+            self.clock.call_later(0, self.start_color_test)
+
+    def show_waiting_screen(self):
+        self.current_test = "waiting"
+        self.input.close()
+
+    def abort(self):
+        self.session.abort()
+        self.recorder.mark("abort")
+        self.show_waiting_screen()
+
+    def start_color_test(self):
+        if not self.user_nearby:
+            return
+        self.current_test = "colors"
+        seed = self.recorder.session_seed()
+        self.session.rng.seed(seed)
+        self.recorder.mark("start", str(seed))
+        self.recorder.mark("plates", json.dumps(self.plates))
+        self.session.start()
+        self.next_color_round()
+
+    def next_color_round(self):
+        if not self.user_nearby:
+            self.abort()
+        elif self.session.phase != "colors":
+            self.start_ishihara_test()
+        else:
+            self.input.open_round(("colors", self.session.color_attempt))
+            self.recorder.mark("round", f"colors:{self.session.color_attempt}")
+
+    def start_ishihara_test(self):
+        if self.session.phase != "ishihara":
+            self.show_final_results()
+            return
+        self.current_test = "ishihara"
+        self.next_ishihara_round()
+
+    def next_ishihara_round(self):
+        if not self.user_nearby:
+            self.abort()
+        elif self.session.current_plate is None:
+            self.show_final_results()
+        else:
+            self.input.open_round(("ishihara", self.session.ishihara_attempt))
+            self.recorder.mark("round", f"ishihara:{self.session.ishihara_attempt}")
+
+    def check_answer(self, handler, value):
+        """check_color_answer_with_animation / check_ishihara_answer"""
+        self.recorder.tap(handler, self.current_test, value)
+        if not self.user_nearby or self.current_test != handler or self.session.phase != handler:
+            return
+        attempt = self.session.color_attempt if handler == "colors" else self.session.ishihara_attempt
+        if self.input.accept(handler, (handler, attempt)) is None:
+            return
+        self.session.answer(value)
+        next_round = self.next_color_round if handler == "colors" else self.next_ishihara_round
+        self.clock.call_later(ROUND_DELAY[handler], next_round)
+
+    def show_final_results(self):
+        self.current_test = "results"
+        self.input.close()
+        results = self.session.results()
+        self.recorder.mark("results", json.dumps({key: results[key] for key in
+                                                  ("color_score", "ishihara_score", "overall_percentage", "satisfactory")}))
+
+    def restart_test(self):
+        """Botón de la pantalla de resultados (con sensor: vuelve a la espera)"""
+        self.recorder.tap("restart", self.current_test)
+        self.show_waiting_screen()
+
+
+def synthetic_log(path, visitors=20, seed=0, accuracy=0.85):
+    """
+    Log de un día simulado: visitantes que se acercan, responden (a veces con
+    dobles toques), a veces se van a mitad del test y pulsan "reiniciar" al
+    ver el resultado.
+    """
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    recorder = SessionRecorder(path, clock=clock, seed=seed)
+    plates = [{"correct_answer": c["correct"], "options": c["options"]} for c in PLATES_CONFIG.values()][:6]
+    kiosk = SimulatedKiosk(recorder, clock, plates)
+
+    def stay(seconds, distance):
+        end = clock() + seconds
+        while clock() < end:
+            d = distance() if callable(distance) else distance
+            kiosk.on_distance(None if d is None else d + rng.gauss(0, 1.5))
+            clock.advance(min(kiosk.presence.interval(), max(0.0, end - clock())) or 0.001)
+
+    def answer():
+        session = kiosk.session
+        if session.phase == "colors":
+            right = session.current_color
+            wrong = [c for c in COLOR_NAMES if c != right]
+        else:
+            right = session.current_plate["correct_answer"]
+            wrong = [o for o in session.current_plate["options"] if o != right]
+        return right if rng.random() < accuracy else rng.choice(wrong)
+
+    for _ in range(visitors):
+        stay(rng.uniform(20, 120), lambda: 200 if rng.random() > 0.02 else None)
+        stay(rng.uniform(1.5, 3), 35)
+        leaves_at = rng.randint(3, 12) if rng.random() < 0.15 else None
+        answers = 0
+        while kiosk.current_test in ("colors", "ishihara") and answers != leaves_at:
+            stay(rng.uniform(0.8, 3.0), 35)
+            value = answer() if kiosk.session.phase in ("colors", "ishihara") else COLOR_NAMES[0]
+            kiosk.check_answer(kiosk.current_test, value)
+            answers += 1
+            if rng.random() < 0.1:
+                clock.advance(0.12)
+                kiosk.check_answer(kiosk.current_test, value)
+        stay(2.0, 35)
+        if kiosk.current_test == "results":
+            if rng.random() < 0.2:
+                # Toque tardío en la pantalla de resultados: se descarta
+                kiosk.check_answer("ishihara", plates[-1]["correct_answer"])
+            kiosk.restart_test()
+        stay(rng.uniform(3, 6), 200)
+    recorder.close()
+    return recorder.records
+
+
+def replay_file(path, speed):
+    header, events = read_log(path)
+    replay = SessionReplay(COLOR_NAMES, seed=header["seed"], speed=speed)
+    return replay.run(events), len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reproduce logs de sesiones del kiosco sin pantalla')
+    parser.add_argument('logs', nargs='*', help='Archivos .dlog grabados con dalton.py --record-session')
+    parser.add_argument('--velocidad', type=float, default=0, help='Veces el tiempo real (0 = sin esperar)')
+    parser.add_argument('--sintetica', type=int, metavar='N', help='Generar un log simulado con N visitantes')
+    parser.add_argument('--guardar', help='Ruta del log simulado (por defecto, temporal)')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla del log simulado')
+    parser.add_argument('--json', action='store_true', help='Mostrar el resumen completo en JSON')
+    args = parser.parse_args()
+
+    logs = list(args.logs)
+    if args.sintetica:
+        path = args.guardar or os.path.join(tempfile.mkdtemp(prefix="daltonismo_replay_"), "sintetico.dlog")
+        records = synthetic_log(path, args.sintetica, args.seed)
+        print(f"✓ Log simulado: {path} ({records} registros, {os.path.getsize(path) / 1024:.1f} KB)")
+        logs.append(path)
+    if not logs:
+        parser.error("indica algún log o --sintetica N")
+
+    failed = False
+    for path in logs:
+        start = time.perf_counter()
+        try:
+            summary, count = replay_file(path, args.velocidad or None)
+        except (OSError, ValueError) as e:
+            print(f"⚠ {path}: {e}")
+            failed = True
+            continue
+        elapsed = time.perf_counter() - start
+        hours = summary["virtual_s"] / 3600
+        print(f"✓ {os.path.basename(path)}: {count} eventos, {hours:.2f} h grabadas en {elapsed:.2f}s "
+              f"({summary['virtual_s'] / max(elapsed, 1e-9):,.0f}x)")
+        print(f"  Sesiones {summary['sessions']} (grabadas {summary['recorded_sessions']})  "
+              f"completas {summary['completed']} (grabadas {summary['recorded_completed']})  "
+              f"abortadas {summary['aborted']} (grabadas {summary['recorded_aborts']})")
+        print(f"  Toques {summary['taps']}: {summary['input']}  sin usuario/pantalla {summary['gated']}  "
+              f"reinicios {summary['restarts']}")
+        if summary["presence_mismatches"]:
+            print(f"⚠ {summary['presence_mismatches']} inicios/abortos no concuerdan con la presencia reproducida")
+        if args.json:
+            print(json.dumps(summary, indent=2, ensure_ascii=False))
+        if summary["mismatches"]:
+            failed = True
+            print(f"⚠ {len(summary['mismatches'])} resultados no coinciden con los grabados")
+            for mismatch in summary["mismatches"][:5]:
+                print(f"    {mismatch}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
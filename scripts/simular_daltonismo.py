@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Valida las láminas simulando daltonismo protan, deutan y tritan.
+
+Carga las láminas con IshiharaImageLoader (mismas respuestas y archivos que
+usa el test), las analiza en un pool de procesos y muestra, por lámina, el
+contraste figura/fondo (ΔE) en visión normal y con cada simulación
+(Brettel, Viénot y Machado). Una lámina valida si queda oculta para alguna
+deficiencia; las de control ("control": true en el manifiesto o en
+PLATES_CONFIG) validan si se siguen viendo con todas. Al final se listan las
+láminas que no validan. Conviene ejecutarlo antes de distribuir un juego
+nuevo de láminas.
+
+Uso:
+    python3 scripts/simular_daltonismo.py                     # assets/images
+    python3 scripts/simular_daltonismo.py --generated 12      # Juego generado
+    python3 scripts/simular_daltonismo.py --json informe.json # Métricas en JSON
+    python3 scripts/simular_daltonismo.py --strict            # Código 1 si alguna falla
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib.CvdSimulation import (  # noqa: E402
+    ANALYSIS_SIZE, DEFICIENCIES, HIDDEN_DELTA_E, VISIBLE_DELTA_E, analyze_library, plate_ok, plate_task
+)
+
+IMAGES_DIR = os.path.join(PROJECT_ROOT, "assets", "images")
+
+
+def load_plates(images, generated=0, seed=None):
+    """Láminas en el formato de IshiharaImageLoader, sin tocar el hardware"""
+    # dalton.py lee sus propios argumentos al importarse
+    argv = sys.argv
+    sys.argv = [argv[0], "--no-hardware"]
+    try:
+        from dalton import IshiharaImageLoader
+    finally:
+        sys.argv = argv
+    loader = IshiharaImageLoader(images)
+    if generated:
+        # Directorio aparte para no podar el juego generado que usa el kiosco
+        return loader.load_generated_plates(generated, ANALYSIS_SIZE, seed=seed,
+                                            cache_dir=tempfile.mkdtemp(prefix="daltonismo_cvd_"))
+    return loader.test_plates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simula daltonismo sobre las láminas Ishihara')
+    parser.add_argument('--images', default=IMAGES_DIR, help='Directorio de láminas')
+    parser.add_argument('--generated', type=int, default=0, help='Analizar N láminas generadas')
+    parser.add_argument('--seed', type=int, help='Semilla de las láminas generadas')
+    parser.add_argument('--workers', type=int, help='Procesos del pool (por defecto, todos los núcleos)')
+    parser.add_argument('--json', help='Guardar las métricas en este archivo')
+    parser.add_argument('--strict', action='store_true', help='Salir con código 1 si alguna lámina no valida')
+    args = parser.parse_args()
+
+    plates = load_plates(args.images, args.generated, args.seed)
+    if not plates:
+        print("✗ No hay láminas para analizar")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    results = analyze_library((plate_task(plate) for plate in plates), workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"ΔE figura/fondo (visible >= {VISIBLE_DELTA_E}, oculta < {HIDDEN_DELTA_E}); "
+          f"máximo de los tres modelos por deficiencia")
+    print(f"{'Lámina':<28} {'Resp.':>5} {'Normal':>7} " + " ".join(f"{d:>7}" for d in DEFICIENCIES))
+    for result in results:
+        if "error" in result:
+            print(f"⚠ {result['name']:<26} error: {result['error']}")
+            continue
+        worst = [max(result["simulated"][d].values()) for d in DEFICIENCIES]
+        mark = "✓" if plate_ok(result) else "⚠"
+        notes = []
+        if result["digit_region_ok"] is False:
+            notes.append("figura fuera de la zona del número")
+        if not result["visible_normal"]:
+            notes.append("poco contraste en visión normal")
+        if result["control"]:
+            notes.append("control")
+            if len(result["visible_for"]) < len(DEFICIENCIES):
+                notes.append("poco contraste con alguna deficiencia")
+        elif not result["hidden_for"]:
+            notes.append("no se oculta con ninguna deficiencia")
+        else:
+            notes.append("oculta: " + ", ".join(result["hidden_for"]))
+        print(f"{mark} {result['name']:<26} {str(result['correct']):>5} {result['normal']:7.1f} "
+              + " ".join(f"{v:7.1f}" for v in worst)
+              + (f"  ({'; '.join(notes)})" if notes else ""))
+
+    valid = sum(plate_ok(result) for result in results)
+    print(f"\n{valid}/{len(results)} láminas validadas en {elapsed:.2f}s")
+    failed = [result["name"] for result in results if not plate_ok(result)]
+    if failed:
+        print(f"⚠ No validan: {', '.join(failed)}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✓ Métricas guardadas en {args.json}")
+
+    if args.strict and valid < len(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Simula sesiones completas del test sin pantalla ni hardware.
+
+Usa la misma máquina de estados que la interfaz (lib/Session.py) con
+respuestas guionizadas: cada respuesta es correcta con la probabilidad
+indicada. Sirve para validar cambios de puntuación y umbrales, y con
+--reportes para cargar la generación de reportes PDF.
+
+Uso:
+    python3 scripts/simular_sesiones.py                       # 10000 sesiones
+    python3 scripts/simular_sesiones.py --acierto 0.7 -n 50000
+    python3 scripts/simular_sesiones.py --reportes 20         # + 20 PDFs
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib.PlateStore import PLATES_CONFIG  # noqa: E402
+from lib.Session import SessionEngine  # noqa: E402
+
+# Mismos nombres de color que el test de colores de dalton.py
+COLOR_NAMES = ["Rojo", "Verde", "Azul", "Amarillo", "Naranja", "Morado"]
+
+
+def scripted_answers(rng, accuracy):
+    """Funciones de respuesta que aciertan con probabilidad `accuracy`"""
+    def color_answer(expected):
+        if rng.random() < accuracy:
+            return expected
+        return rng.choice([c for c in COLOR_NAMES if c != expected])
+
+    def plate_answer(plate):
+        if rng.random() < accuracy:
+            return plate["correct_answer"]
+        return rng.choice([o for o in plate["options"] if o != plate["correct_answer"]])
+
+    return color_answer, plate_answer
+
+
+def generate_reports(sessions, count):
+    """Genera `count` reportes PDF y devuelve el tiempo medio por reporte"""
+    from lib.Notification import DaltonismReportGenerator
+
+    output_dir = tempfile.mkdtemp(prefix="daltonismo_reportes_")
+    start = time.perf_counter()
+    for i, results in enumerate(sessions[:count]):
+        test_results = dict(results, timestamp=f"sim_{i:05d}", patient_id=f"SIM_{i:05d}")
+        DaltonismReportGenerator.generate_pdf_report(test_results, os.path.join(output_dir, f"sim_{i:05d}.pdf"))
+    elapsed = time.perf_counter() - start
+    return elapsed / max(1, min(count, len(sessions))), output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simula sesiones del test sin interfaz')
+    parser.add_argument('-n', '--sesiones', type=int, default=10000, help='Número de sesiones')
+    parser.add_argument('--acierto', type=float, default=0.85, help='Probabilidad de acierto por respuesta')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla')
+    parser.add_argument('--reportes', type=int, default=0, help='Generar N reportes PDF con los resultados')
+    args = parser.parse_args()
+
+    plates = [{"correct_answer": c["correct"], "options": c["options"]} for c in PLATES_CONFIG.values()][:6]
+    rng = random.Random(args.seed)
+    session = SessionEngine(COLOR_NAMES, plates, rng=rng)
+    color_answer, plate_answer = scripted_answers(rng, args.acierto)
+
+    start = time.perf_counter()
+    sessions = [session.run(color_answer, plate_answer) for _ in range(args.sesiones)]
+    elapsed = time.perf_counter() - start
+
+    evaluations = Counter(r["evaluation"] for r in sessions)
+    satisfactory = sum(r["satisfactory"] for r in sessions)
+    print(f"✓ {args.sesiones} sesiones en {elapsed:.2f}s ({args.sesiones / elapsed:,.0f} sesiones/s)")
+    print(f"  Acierto {args.acierto:.0%}: satisfactorias {satisfactory / args.sesiones:.1%}  "
+          + "  ".join(f"{k}: {v / args.sesiones:.1%}" for k, v in sorted(evaluations.items())))
+
+    if args.reportes:
+        try:
+            per_report, output_dir = generate_reports(sessions, args.reportes)
+            print(f"✓ {args.reportes} reportes en {output_dir} ({per_report * 1000:.0f} ms por reporte)")
+        except ImportError as e:
+            print(f"⚠ Reportes no disponibles: {e}")
+
+
+if __name__ == "__main__":
+    main()
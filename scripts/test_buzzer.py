@@ -8,18 +8,28 @@ Conexión del Buzzer:
 
 Uso:
     python3 test_buzzer.py
+    python3 test_buzzer.py --jitter 20     # Solo el benchmark de jitter (20 repeticiones)
     
 Controles:
     - Presiona 1: Tono de éxito (agradable)
     - Presiona 2: Tono de fallo (descendente)
     - Presiona 3: Tono de alerta (intermitente)
     - Presiona 4: Tono continuo (prueba básica)
+    - Presiona 5: Benchmark de jitter (bucle con sleep vs. secuenciador)
     - Presiona q: Salir
 """
 
+import argparse
+import os
 import time
 import sys
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from lib.Hardware import HardwareWorker, PwmOutputs, melody  # noqa: E402
+from lib.Melody import DEFAULT_GAP, MELODIES, compile_schedule, parse  # noqa: E402
+
 try:
     import RPi.GPIO as GPIO
     GPIO_AVAILABLE = True
@@ -103,6 +113,49 @@ class BuzzerTester:
         print(f"▶ Reproduciendo tono CONTINUO ({duration}s)...")
         self.beep(1000, duration)
     
+    def jitter_benchmark(self, repeats=10, name="resultado_bueno"):
+        """
+        Error de temporización por nota: bucle tono + sleep (como antes) frente
+        al secuenciador con instantes absolutos del hilo de hardware
+        """
+        notes = parse(MELODIES[name], DEFAULT_GAP)
+        events, duration = compile_schedule(notes)
+        expected = [t for t, frequency in events if frequency]
+        print(f"▶ Benchmark de jitter: '{name}' ({len(expected)} notas, {duration:.2f}s) x{repeats}")
+        
+        pwm = self.pwm if GPIO_AVAILABLE else None
+        if pwm:
+            pwm.start(0)
+        outputs = TimedOutputs(pwm)
+        
+        legacy, sequenced = [], []
+        for _ in range(repeats):
+            outputs.starts = []
+            for frequency, length in notes:
+                if frequency:
+                    outputs.tone(frequency)
+                    time.sleep(length)
+                    outputs.silence()
+                else:
+                    time.sleep(length)
+            legacy.append(note_errors(outputs.starts, expected))
+        
+        worker = HardwareWorker(outputs).start()
+        try:
+            for _ in range(repeats):
+                outputs.starts = []
+                worker.submit(melody(MELODIES[name], DEFAULT_GAP))
+                while not worker.idle():
+                    time.sleep(0.01)
+                sequenced.append(note_errors(outputs.starts, expected))
+        finally:
+            worker.stop()
+            if pwm:
+                pwm.stop()
+        
+        print_jitter("sleep", legacy)
+        print_jitter("secuenciador", sequenced)
+    
     def cleanup(self):
         """Limpia los recursos GPIO"""
         if GPIO_AVAILABLE:
@@ -111,6 +164,37 @@ class BuzzerTester:
             GPIO.cleanup()
             print("\n✓ GPIO limpiado correctamente")
 
+class TimedOutputs(PwmOutputs):
+    """Salida del buzzer que anota el instante en que empieza cada nota"""
+    
+    def __init__(self, pwm):
+        super().__init__(buzzer_pwm=pwm)
+        self.starts = []
+    
+    def tone(self, frequency):
+        self.starts.append(time.monotonic())
+        if self.buzzer_pwm is not None:
+            super().tone(frequency)
+
+
+def note_errors(starts, expected):
+    """Error en ms de cada nota respecto a su instante previsto desde la primera"""
+    if not starts:
+        return []
+    return [((start - starts[0]) - offset) * 1000 for start, offset in zip(starts, expected)]
+
+
+def print_jitter(label, runs):
+    """Error medio por nota y resumen (media, p95 y máximo en valor absoluto)"""
+    errors = sorted(abs(e) for run in runs for e in run)
+    if not errors:
+        return
+    per_note = [sum(run[i] for run in runs) / len(runs) for i in range(min(len(run) for run in runs))]
+    p95 = errors[min(len(errors) - 1, int(len(errors) * 0.95))]
+    print(f"  {label:<13} media {sum(errors) / len(errors):6.2f} ms  p95 {p95:6.2f} ms  máx {errors[-1]:6.2f} ms")
+    print(f"  {'':<13} por nota: " + " ".join(f"{e:+.2f}" for e in per_note))
+
+
 def print_menu():
     """Muestra el menú de opciones"""
     print("\n" + "="*50)
@@ -122,11 +206,24 @@ def print_menu():
     print("  [2] Tono de FALLO (melodía descendente)")
     print("  [3] Tono de ALERTA (beeps intermitentes)")
     print("  [4] Tono CONTINUO (prueba básica de 2s)")
+    print("  [5] Benchmark de JITTER (sleep vs. secuenciador)")
     print("  [q] SALIR")
     print("-"*50)
 
 def main():
     """Función principal del test"""
+    parser = argparse.ArgumentParser(description='Test del buzzer')
+    parser.add_argument('--jitter', type=int, metavar='N', help='Solo el benchmark de jitter con N repeticiones')
+    args = parser.parse_args()
+    
+    if args.jitter:
+        buzzer = BuzzerTester(BUZZER_PIN)
+        try:
+            buzzer.jitter_benchmark(args.jitter)
+        finally:
+            buzzer.cleanup()
+        return
+    
     print("\n🔊 Iniciando test de buzzer...")
     print("\nConexiones requeridas:")
     print(f"  • Buzzer (+) -> GPIO {BUZZER_PIN} (Pin físico ~16)")
@@ -147,6 +244,8 @@ def main():
                 buzzer.alert_tone()
             elif choice == '4':
                 buzzer.continuous_tone(2.0)
+            elif choice == '5':
+                buzzer.jitter_benchmark()
             elif choice == 'q':
                 print("\n👋 Saliendo del test...")
                 break
@@ -1,32 +1,38 @@
+import time
+BOOT_START = time.perf_counter()  # Origen de --profile-startup
+
 import tkinter as tk
 from tkinter import ttk
 import random
-import time
 import threading
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import os
 import glob
 import argparse
 import sys
-import asyncio
+import json
 from datetime import datetime
 
-# Import notification service for PDF reports
-try:
-    # Intentar import relativo primero
-    try:
-        from lib.Notification import DaltonismReportGenerator
-    except ImportError:
-        # Si falla, agregar el directorio actual al path
-        import sys
-        import os
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        sys.path.insert(0, current_dir)
-        from lib.Notification import DaltonismReportGenerator
-    NOTIFICATION_AVAILABLE = True
-except ImportError as e:
-    print(f"[WARNING] Notification module not available - PDF reports disabled: {e}")
-    NOTIFICATION_AVAILABLE = False
+# Módulos internos de lib/. Los que arrastran numpy (PlatePack, PlateGenerator,
+# ColorCalibration) se importan al cargar las láminas, después del primer pintado
+if os.path.dirname(os.path.abspath(__file__)) not in sys.path:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from lib.PlateCache import PlateRenderCache, image_size_for_screen
+from lib.PlatePrefetcher import PlatePrefetcher
+from lib.PlateStore import DecodedImageLRU, LazyPlateImage, DEFAULT_MAX_DECODED_BYTES, PLATES_CONFIG
+from lib.PlateManifest import PlateManifest
+from lib.PlatePyramid import PlatePyramid, PYRAMID_DIRNAME
+from lib.LoopMonitor import EventLoopMonitor
+from lib.Animator import Animator
+from lib.Session import SessionEngine, PASS_THRESHOLD
+from lib.Startup import BackgroundImport, StartupProfiler
+from lib.InputPipeline import InputPipeline
+from lib.Ultrasonic import SimulatedUltrasonic, UltrasonicSensor
+from lib.Presence import PresenceEstimator
+from lib.Melody import MELODIES
+from lib.Hardware import (HardwareWorker, PwmOutputs, PRIORITY_FEEDBACK, PRIORITY_IDLE, PRIORITY_RESULT,
+                          led_blink, led_color, led_effect, melody, servo_profile, tone)
+from lib import LedEffects
 
 # ============================================================================
 # CONFIGURACIÓN DE HARDWARE
@@ -40,6 +46,11 @@ Ejemplos de uso:
   python3 dalton.py                    # Modo normal con todo el hardware
   python3 dalton.py --no-sensor        # Sin sensor (buzzer y servo SÍ funcionan)
   python3 dalton.py --no-hardware      # Sin ningún hardware (todo simulado)
+  python3 dalton.py --generated-plates 6   # Láminas generadas, distintas en cada sesión
+  python3 dalton.py --no-hardware --profile-startup   # Tiempos de cada fase del arranque
+  python3 dalton.py --fake-gpio        # GPIO emulado: mismo código de hardware sin Raspberry Pi
+  python3 dalton.py --gpio-trace       # Tiempos de cada llamada a GPIO por pin (JSON al salir)
+  python3 dalton.py --record-session   # Grabar sensor, toques y órdenes para reproducirlos
     '''
 )
 parser.add_argument(
@@ -54,15 +65,89 @@ parser.add_argument(
     action='store_true',
     help='Deshabilitar TODO el hardware: sensor, servo y buzzer (modo simulación completa)'
 )
+parser.add_argument(
+    '--fake-gpio',
+    dest='fake_gpio',
+    action='store_true',
+    help='Usar un RPi.GPIO emulado (PWM, sensor HC-SR04 a 30 cm) en lugar del real; '
+         'sensor y actuadores comparten su reloj virtual, que avanza al ritmo real'
+)
+parser.add_argument(
+    '--generated-plates',
+    dest='generated_plates',
+    type=int,
+    default=0,
+    help='Usar N láminas generadas proceduralmente en lugar de las de assets/images'
+)
+parser.add_argument(
+    '--plate-seed',
+    dest='plate_seed',
+    type=int,
+    default=None,
+    help='Semilla para las láminas generadas (mismo juego en cada sesión)'
+)
+
+parser.add_argument(
+    '--loop-monitor',
+    dest='loop_monitor',
+    nargs='?',
+    const='',
+    default=None,
+    metavar='ARCHIVO',
+    help='Medir la latencia del bucle de Tk por pantalla y volcarla al salir '
+         '(por defecto ~/.cache/daltonismo/loop_latency.json)'
+)
+
+parser.add_argument(
+    '--gpio-trace',
+    dest='gpio_trace',
+    nargs='?',
+    const='',
+    default=None,
+    metavar='ARCHIVO',
+    help='Medir llamadas, duración e intervalos de cada operación GPIO por pin y volcarlos al salir '
+         '(por defecto ~/.cache/daltonismo/gpio_trace.json)'
+)
+
+parser.add_argument(
+    '--record-session',
+    dest='record_session',
+    nargs='?',
+    const='',
+    default=None,
+    metavar='ARCHIVO',
+    help='Grabar lecturas del sensor, toques, callbacks y órdenes de hardware en un log binario '
+         '(por defecto ~/.cache/daltonismo/sesiones/FECHA.dlog); ver scripts/reproducir_sesiones.py'
+)
+
+parser.add_argument(
+    '--profile-startup',
+    dest='profile_startup',
+    action='store_true',
+    help='Mostrar el tiempo de cada fase del arranque'
+)
 
 args = parser.parse_args()
 
+# Perfil del arranque (solo anota si se pidió --profile-startup)
+PROFILER = StartupProfiler(args.profile_startup, origin=BOOT_START)
+PROFILER.mark("modulos")
+
+# Servicio de reportes PDF/Telegram (reportlab, telegram): se importa en
+# segundo plano tras el primer pintado y solo se espera al enviar un reporte
+REPORTING = BackgroundImport("lib.Notification", PROFILER)
+
 # Configurar banderas de hardware
 SENSOR_ENABLED = not (args.no_sensor or args.no_hardware)  # Sensor solo si no se especifica --no-sensor o --no-hardware
 HARDWARE_ENABLED = not args.no_hardware  # Hardware (servo/buzzer) solo si no se especifica --no-hardware
 
 try:
-    if HARDWARE_ENABLED:
+    if HARDWARE_ENABLED and args.fake_gpio:
+        from lib.FakeGPIO import FakeGPIO
+        GPIO = FakeGPIO(history=10000)
+        GPIO_AVAILABLE = True
+        print("[MODO SIMULACIÓN] GPIO emulado (--fake-gpio)")
+    elif HARDWARE_ENABLED:
         import RPi.GPIO as GPIO
         GPIO_AVAILABLE = True
         if not SENSOR_ENABLED:
@@ -75,10 +160,19 @@ except ImportError:
     SENSOR_ENABLED = False
     print("[ATENCIÓN] GPIO no disponible - ejecutando en modo simulación completa")
 
+# Traza de GPIO opcional: sin --gpio-trace el módulo se usa sin envolver
+GPIO_TRACER = None
+if GPIO_AVAILABLE and args.gpio_trace is not None:
+    from lib.GpioTrace import GpioTracer
+    GPIO_TRACER = GpioTracer()
+    GPIO = GPIO_TRACER.wrap(GPIO)
+
 # Configuración del sensor ultrasónico
 TRIG_PIN = 17
 ECHO_PIN = 27
 MIN_DISTANCE = 50  # Cambiado a 50 cm
+EXIT_DISTANCE = 65  # Histéresis: se considera que se fue por encima de esto...
+EXIT_DWELL = 2.0    # ...durante este tiempo (s), así un eco suelto no aborta la sesión
 
 # Configuración del servo motor MG996R
 SERVO_PIN = 18  # GPIO18 (Pin físico 12)
@@ -94,6 +188,16 @@ RGB_GREEN_PIN = 25  # GPIO25 (Pin físico 22)
 RGB_BLUE_PIN = 16    # GPIO8 (Pin físico 36)
 # 5V común -> Conectar a pin 5V (ej: Pin físico 2 o 4)
 
+# Botones de opción del test de Ishihara (se amplían si una lámina trae más)
+OPTION_BUTTONS = 4
+
+# Texto y color de la evaluación final (ver lib/Session.evaluate)
+EVALUATION_TEXTS = {
+    "normal": ("[OK] Vision cromatica normal", "#4CAF50"),
+    "mild": ("[ATENCION] Posible deficiencia leve", "#FF9800"),
+    "consult": ("[ERROR] Se recomienda consulta oftalmologica", "#F44336"),
+}
+
 # Colores básicos
 colors = {
     "Rojo": "#FF0000",
@@ -107,23 +211,37 @@ colors = {
 class IshiharaImageLoader:
     """Cargador de láminas Ishihara reales desde archivos"""
     
-    def __init__(self, image_directory="."):
+    def __init__(self, image_directory=".", max_decoded_bytes=DEFAULT_MAX_DECODED_BYTES, index_path=None):
         self.image_directory = image_directory
+        self.manifest = PlateManifest(image_directory, index_path)
+        # Niveles pre-escalados (scripts/generar_piramide.py), si existen
+        self.pyramid = PlatePyramid(os.path.join(image_directory, PYRAMID_DIRNAME))
+        # Píxeles decodificados compartidos por todas las láminas, con límite en bytes
+        self.decoded_cache = DecodedImageLRU(max_decoded_bytes)
         self.test_plates = self.load_real_plates()
         
     def load_real_plates(self):
         """Carga las láminas reales y define sus respuestas correctas"""
-        # Definir respuestas correctas para cada imagen
-        plates_config = {
-            "12": {"correct": 12, "options": [12, 17, 21, "No veo nada"], "difficulty": "easy"},
-            "13": {"correct": 73, "options": [73, 13, 78, "No veo nada"], "difficulty": "easy"}, 
-            "16": {"correct": 16, "options": [16, 19, 18, "No veo nada"], "difficulty": "medium"},
-            "29": {"correct": 29, "options": [29, 70, 20, "No veo nada"], "difficulty": "medium"},
-            "42": {"correct": 42, "options": [42, 24, 74, "No veo nada"], "difficulty": "hard"},
-            "5": {"correct": 5, "options": [5, 2, 8, "No veo nada"], "difficulty": "easy"},
-            "74": {"correct": 74, "options": [74, 21, 71, "No veo nada"], "difficulty": "hard"},
-            "8": {"correct": 8, "options": [8, 3, 6, "No veo nada"], "difficulty": "easy"}
-        }
+        # Si existe un paquete pre-decodificado se usa en lugar de los archivos sueltos
+        from lib.PlatePack import PACK_FILENAME
+        pack_path = os.path.join(self.image_directory, PACK_FILENAME)
+        if os.path.exists(pack_path):
+            try:
+                plates = self.load_packed_plates(pack_path)
+                if plates is not None:
+                    return plates
+            except Exception as e:
+                print(f" Error abriendo paquete {pack_path}, usando archivos: {e}")
+        
+        # Manifiesto con hashes: solo se revisan los archivos modificados
+        if self.manifest.exists():
+            try:
+                return self.load_manifest_plates()
+            except Exception as e:
+                print(f" Error leyendo manifiesto, usando configuración por defecto: {e}")
+        
+        # Respuestas correctas por defecto (directorios sin manifest.json)
+        plates_config = PLATES_CONFIG
         
         loaded_plates = []
         
@@ -133,17 +251,18 @@ class IshiharaImageLoader:
                 image_path = os.path.join(self.image_directory, f"{filename}.{ext}")
                 if os.path.exists(image_path):
                     try:
-                        # Cargar y redimensionar imagen - 50% de la pantalla o más grande
-                        img = Image.open(image_path)
-                        # El tamaño se ajustará dinámicamente en calculate_scaling()
-                        # Por ahora cargamos a tamaño original, se redimensionará después
+                        # Solo se valida la cabecera; los píxeles se decodifican
+                        # al primer uso y ya al tamaño calculado en calculate_scaling()
+                        img = LazyPlateImage.probe(image_path, self.decoded_cache)
                         
                         plate_data = {
                             "filename": filename,
-                            "image": img,  # Guardar imagen original
+                            "path": image_path,
+                            "image": img,  # Referencia perezosa a la imagen
                             "correct_answer": config["correct"],
                             "options": config["options"].copy(),
-                            "difficulty": config["difficulty"]
+                            "difficulty": config["difficulty"],
+                            "control": config.get("control", False)
                         }
                         
                         # Mezclar opciones aleatoriamente
@@ -156,6 +275,89 @@ class IshiharaImageLoader:
                         
         print(f" Total de láminas cargadas: {len(loaded_plates)}")
         return loaded_plates
+    
+    def load_manifest_plates(self):
+        """Carga las láminas descritas en manifest.json, validadas por hash"""
+        pyramid = self.pyramid if self.pyramid.available() else None
+        loaded_plates = []
+        for entry in self.manifest.validated_entries():
+            img = LazyPlateImage(
+                entry["path"], self.decoded_cache,
+                size=(entry["width"], entry["height"]), image_format=entry["format"],
+                digest=entry["sha256"], pyramid=pyramid
+            )
+            plate_data = {
+                "filename": entry["name"],
+                "path": entry["path"],
+                "digest": entry["sha256"],
+                "image": img,
+                "correct_answer": entry["correct"],
+                "options": list(entry["options"]),
+                "difficulty": entry["difficulty"],
+                "control": entry.get("control", False)
+            }
+            random.shuffle(plate_data["options"])
+            loaded_plates.append(plate_data)
+        
+        print(f" Total de láminas cargadas desde manifiesto: {len(loaded_plates)} "
+              f"(reutilizadas {self.manifest.reused}, verificadas {self.manifest.rehashed}, "
+              f"inválidas {self.manifest.invalid})")
+        return loaded_plates
+    
+    def load_packed_plates(self, pack_path):
+        """Carga las láminas desde un paquete mmap (None si está desactualizado)"""
+        from lib.PlatePack import PlatePack, PackedPlateImage
+        pack = PlatePack(pack_path)
+        # Láminas o manifiesto modificados tras empaquetar: el paquete no vale
+        reason = pack.stale_reason(self.image_directory)
+        if reason:
+            pack.close()
+            print(f" Paquete {pack_path} desactualizado ({reason}), usando archivos")
+            return None
+        self.pack = pack
+        
+        loaded_plates = []
+        for entry in self.pack.entries:
+            plate_data = {
+                "filename": entry["name"],
+                "path": f"{pack_path}#{entry['name']}",
+                "digest": entry.get("digest", entry["sha256"]),
+                "image": PackedPlateImage(self.pack, entry, self.decoded_cache),
+                "correct_answer": entry["correct"],
+                "options": list(entry["options"]),
+                "difficulty": entry["difficulty"],
+                "control": entry.get("control", False)
+            }
+            random.shuffle(plate_data["options"])
+            loaded_plates.append(plate_data)
+        
+        print(f" Total de láminas cargadas desde paquete: {len(loaded_plates)}")
+        return loaded_plates
+    
+    def load_generated_plates(self, count, size, seed=None, cache_dir=None):
+        """Genera (o reutiliza) un juego de láminas y las sirve igual que las de archivo"""
+        from lib.PlateGenerator import GeneratedPlateCache
+        generated = GeneratedPlateCache(cache_dir).get_set(count, size, seed=seed)
+        
+        loaded_plates = []
+        for plate in generated:
+            try:
+                plate_data = {
+                    "filename": os.path.splitext(os.path.basename(plate["path"]))[0],
+                    "path": plate["path"],
+                    "image": LazyPlateImage.probe(plate["path"], self.decoded_cache),
+                    "correct_answer": plate["number"],
+                    "options": list(plate["options"]),
+                    "difficulty": plate["difficulty"],
+                    "generated": True
+                }
+                random.shuffle(plate_data["options"])
+                loaded_plates.append(plate_data)
+            except Exception as e:
+                print(f" Error cargando lámina generada {plate['path']}: {e}")
+        
+        print(f" Total de láminas generadas: {len(loaded_plates)}")
+        return loaded_plates
 
 class TestDaltonismoCompleto:
     def __init__(self):
@@ -171,6 +373,27 @@ class TestDaltonismoCompleto:
         self.root.bind('<Escape>', lambda e: self.root.quit())
         self.root.bind('<F11>', lambda e: self.toggle_fullscreen())  # F11 para alternar pantalla completa
         
+        # Latencia del bucle de eventos por pantalla (opcional, apta para producción)
+        self.loop_monitor = None
+        if args.loop_monitor is not None:
+            self.loop_monitor = EventLoopMonitor(self.root, lambda: getattr(self, "current_test", "waiting"))
+            self.loop_monitor.install()
+        
+        # Grabación de la actividad para reproducirla sin pantalla (opcional)
+        self.recorder = None
+        if args.record_session is not None:
+            try:
+                from lib.SessionLog import SessionRecorder, default_log_path
+                self.recorder = SessionRecorder(args.record_session or default_log_path())
+                self.recorder.install(self.root)
+                print(f"[REPLAY] Grabando sesiones en {self.recorder.path}")
+            except Exception as e:
+                print(f"[ERROR] No se pudo iniciar la grabación de sesiones: {e}")
+        
+        # Una respuesta por ronda, con antirrebote; las latencias tap->pantalla y
+        # tap->buzzer van al mismo volcado que las del bucle (--loop-monitor)
+        self.input = InputPipeline(self.root, histogram=self.loop_monitor.histogram if self.loop_monitor else None)
+        
         # Detectar tamaño de pantalla y calcular escalado automático
         self.screen_width = self.root.winfo_screenwidth()
         self.screen_height = self.root.winfo_screenheight()
@@ -185,35 +408,41 @@ class TestDaltonismoCompleto:
         # Configuración de threading para mejor responsividad
         self.ui_update_delay = 50  # ms - delay reducido para mejor respuesta
         
+        # Reloj único para todas las animaciones de la interfaz
+        self.animator = Animator(self.root)
+        
         # Optimizaciones específicas para Raspberry Pi
         self.root.option_add('*tearOff', False)  # Deshabilitar tear-off menus
         self.root.resizable(False, False)  # Evitar redimensionamiento
         
-        # Variables del test de colores
-        self.color_attempts = 8
-        self.color_attempt = 0
-        self.color_score = 0
-        self.current_color_name = ""
-        
-        # Variables del test de Ishihara
-        print("[DEBUG] Inicializando cargador de imagenes Ishihara...")
-        # Obtener ruta a las imágenes desde el directorio actual del script
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        images_path = os.path.join(os.path.dirname(current_dir), "assets", "images")
-        self.ishihara_loader = IshiharaImageLoader(images_path)
-        print(f"[DEBUG] Laminas disponibles: {len(self.ishihara_loader.test_plates)}")
-        self.ishihara_plates = self.ishihara_loader.test_plates[:6]  # Usar 6 láminas
-        print(f"[DEBUG] Laminas seleccionadas para el test: {len(self.ishihara_plates)}")
-        self.ishihara_attempts = len(self.ishihara_plates)
-        self.ishihara_attempt = 0
-        self.ishihara_score = 0
-        self.current_ishihara_answer = None
+        # Estado de la sesión (rondas y puntuación), independiente de la UI
+        self.session = SessionEngine(colors.keys(), color_attempts=8)
+        
+        # Láminas, calibración y caché: se cargan en segundo plano después del
+        # primer pintado (load_plates); hasta entonces el test no puede empezar
+        self.ishihara_loader = None
+        self.ishihara_plates = []
+        self.color_lut = None
+        self.display_colors = dict(colors)
+        self.plate_cache = None
+        self.plates_ready = False
+        
+        # Precarga de la siguiente lámina en un hilo trabajador
+        self.plate_prefetcher = PlatePrefetcher(
+            self.root,
+            fetch=lambda plate: self.plate_cache.get_plate(plate, self.image_size),
+            build=lambda data: tk.PhotoImage(data=data, format="ppm")
+        )
         self.current_options = []
         
-        # Variables del sensor
+        # Variables del sensor (simulado con usuario presente hasta que setup_gpio
+        # configure el real)
+        self.ultrasonic = SimulatedUltrasonic(30)
+        self.presence = PresenceEstimator(MIN_DISTANCE, EXIT_DISTANCE, exit_dwell=EXIT_DWELL)
         self.user_nearby = not SENSOR_ENABLED  # Si sensor deshabilitado, usuario siempre "presente"
         self.sensor_thread = None
         self.running = True
+        self._cleaned_up = False
         self.current_test = "waiting"  # waiting, colors, ishihara, results
         
         # Variables UI
@@ -221,9 +450,8 @@ class TestDaltonismoCompleto:
         self.option_buttons = []
         self.current_photo = None
         
-        # Variable para control del servo
+        # Variable para control del servo (la posición la lleva PwmOutputs.servo_angle)
         self.servo_pwm = None
-        self.current_servo_angle = 90  # Trackear posición actual
         
         # Variable para control del buzzer
         self.buzzer_pwm = None
@@ -233,19 +461,139 @@ class TestDaltonismoCompleto:
         self.rgb_green_pwm = None
         self.rgb_blue_pwm = None
         
+        PROFILER.mark("ventana")
+        
         # Configurar hardware
+        self.gpio_driver = None
         self.setup_gpio()
         
+        # Un único hilo maneja buzzer, LED y servo (sin hilos por evento)
+        self.hardware = HardwareWorker(PwmOutputs(
+            self.buzzer_pwm, (self.rgb_red_pwm, self.rgb_green_pwm, self.rgb_blue_pwm), self.servo_pwm
+        ), clock=GPIO.clock if self.gpio_driver else time.monotonic,
+            on_submit=self.recorder.command if self.recorder else None)
+        if self.gpio_driver:
+            # GPIO emulado: el mismo hilo que lleva el reloj virtual ejecuta las órdenes
+            self.gpio_driver.worker = self.hardware
+            self.gpio_driver.start()
+        else:
+            self.hardware.start()
+        # Servo al centro y LED azul al inicio
+        self.set_servo_angle(90)
+        self.rgb_set_blue()
+        PROFILER.mark("hardware")
+        
         # Configurar UI
         self.setup_ui()
+        PROFILER.mark("interfaz")
         
         # Reproducir tono de inicio
         if GPIO_AVAILABLE and self.buzzer_pwm:
-            threading.Thread(target=self.buzzer_start, daemon=True).start()
+            self.buzzer_start()
         
         # Iniciar sensor
         self.start_sensor_monitoring()
     
+    def start_background_boot(self):
+        """Tras el primer pintado: láminas y módulo de reportes en segundo plano"""
+        threading.Thread(target=self.load_plates, daemon=True).start()
+        REPORTING.start()
+    
+    def load_plates(self):
+        """Hilo de arranque: carga las láminas, la calibración y la caché escalada"""
+        try:
+            print("[DEBUG] Inicializando cargador de imagenes Ishihara...")
+            # Obtener ruta a las imágenes desde el directorio actual del script
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            images_path = os.path.join(os.path.dirname(current_dir), "assets", "images")
+            with PROFILER.phase("laminas"):
+                self.ishihara_loader = IshiharaImageLoader(images_path)
+            print(f"[DEBUG] Laminas disponibles: {len(self.ishihara_loader.test_plates)}")
+            
+            # Calibración de color de esta pantalla (scripts/calibrar_pantalla.py)
+            with PROFILER.phase("calibracion"):
+                from lib.ColorCalibration import ColorLUT
+                self.color_lut = ColorLUT.load()
+            if self.color_lut:
+                print(f"[CALIBRACION] LUT {self.color_lut.size}^3 cargada ({self.color_lut.fingerprint})")
+            
+            # Caché de láminas ya escaladas y calibradas (se regenera si cambia la
+            # fuente, la pantalla o la LUT)
+            with PROFILER.phase("cache"):
+                self.plate_cache = PlateRenderCache(lut=self.color_lut)
+                self.ishihara_plates = self.select_ishihara_plates()
+                self.session.set_plates(self.ishihara_plates)
+            print(f"[DEBUG] Laminas seleccionadas para el test: {len(self.ishihara_plates)}")
+        except Exception as e:
+            print(f"[ERROR] Error cargando laminas: {e}")
+            if self.plate_cache is None:
+                self.plate_cache = PlateRenderCache(lut=self.color_lut)
+        
+        self.root.after(0, self.on_plates_loaded)
+    
+    def on_plates_loaded(self):
+        """En el hilo de Tk: aplica la calibración y habilita el inicio del test"""
+        if self.color_lut:
+            self.display_colors = {name: self.color_lut.apply_hex(hex_code) for name, hex_code in colors.items()}
+            for name, btn in self.color_buttons.items():
+                btn.config(bg=self.display_colors[name], activebackground=self.display_colors[name])
+        PROFILER.mark("laminas_listas")
+        self.report_startup()
+        self.on_plates_ready()
+    
+    def refresh_plates(self):
+        """Hilo de trabajo: juego nuevo de láminas generadas entre sesiones"""
+        try:
+            plates = self.select_ishihara_plates()
+        except Exception as e:
+            print(f"[ERROR] Error generando láminas: {e}")
+            plates = self.ishihara_plates
+        self.root.after(0, lambda: self.on_plates_refreshed(plates))
+    
+    def on_plates_refreshed(self, plates):
+        """En el hilo de Tk: usa el juego nuevo en la próxima sesión"""
+        self.ishihara_plates = plates
+        self.session.set_plates(plates)
+        self.on_plates_ready()
+    
+    def on_plates_ready(self):
+        """Habilita el inicio del test; si el usuario llegó mientras se preparaban, empezar ya"""
+        self.plates_ready = True
+        if self.current_test == "waiting":
+            self.show_waiting_screen()
+            if self.user_nearby:
+                self.start_color_test()
+    
+    def report_startup(self):
+        """Imprime el perfil de arranque cuando también terminó el import de reportes"""
+        if not PROFILER.enabled:
+            return
+        if not REPORTING.done():
+            self.root.after(100, self.report_startup)
+            return
+        PROFILER.print_report()
+    
+    def select_ishihara_plates(self):
+        """
+        Elige las láminas de la sesión y prepara su caché escalada. Genera y
+        escala imágenes: llamar solo fuera del hilo de Tk.
+        
+        Returns:
+            Láminas elegidas (el llamador las pasa a la sesión)
+        """
+        if args.generated_plates > 0:
+            # Láminas generadas: con semilla se repite el juego, sin ella cambia cada sesión
+            selected = self.ishihara_loader.load_generated_plates(
+                args.generated_plates, self.image_size, seed=args.plate_seed
+            )
+        else:
+            selected = self.ishihara_loader.test_plates[:6]  # Usar 6 láminas
+        
+        plates = {p["path"]: p for p in self.ishihara_loader.test_plates + selected}
+        rendered = self.plate_cache.warm(plates.values(), self.image_size)
+        print(f"[CACHE] Laminas renderizadas: {rendered}, ya en cache: {len(plates) - rendered}")
+        return selected
+    
     def calculate_scaling(self):
         """Calcula el escalado automático basado en el tamaño de pantalla"""
         # Tamaño base de referencia (1024x768)
@@ -295,9 +643,7 @@ class TestDaltonismoCompleto:
         }
         
         # Tamaño de imagen escalado - 70% de la pantalla para que no se corte
-        min_image_percentage = 0.70  # 70% de la pantalla (ajustado para que no se corte)
-        max_dimension = min(self.screen_width, self.screen_height)
-        self.image_size = max(300, int(max_dimension * min_image_percentage))
+        self.image_size = image_size_for_screen(self.screen_width, self.screen_height)
         
         print(f"[ESCALADO] Pantalla: {self.screen_width}x{self.screen_height}")
         print(f"[ESCALADO] Factor: {self.scale_factor:.2f}")
@@ -309,6 +655,10 @@ class TestDaltonismoCompleto:
         if GPIO_AVAILABLE:
             try:
                 GPIO.setmode(GPIO.BCM)
+                if args.fake_gpio:
+                    # Reloj virtual al ritmo real, compartido por sensor y actuadores
+                    from lib.FakeGPIO import RealtimeDriver
+                    self.gpio_driver = RealtimeDriver(GPIO.clock)
                 GPIO.setup(TRIG_PIN, GPIO.OUT)
                 GPIO.setup(ECHO_PIN, GPIO.IN)
                 GPIO.setup(SERVO_PIN, GPIO.OUT)  # Configurar pin del servo
@@ -318,6 +668,16 @@ class TestDaltonismoCompleto:
                 GPIO.setup(RGB_BLUE_PIN, GPIO.OUT)   # Configurar pin azul RGB
                 GPIO.output(TRIG_PIN, False)
                 
+                # Sensor ultrasónico por flancos del eco (sin espera activa)
+                if SENSOR_ENABLED:
+                    if args.fake_gpio:
+                        # El HC-SR04 emulado mide sobre el reloj virtual del GPIO emulado
+                        GPIO.attach_hcsr04(TRIG_PIN, ECHO_PIN, distance=30.0)
+                        self.ultrasonic = UltrasonicSensor(GPIO, TRIG_PIN, ECHO_PIN,
+                                                           clock=GPIO.clock, sleep=GPIO.clock.sleep).start()
+                    else:
+                        self.ultrasonic = UltrasonicSensor(GPIO, TRIG_PIN, ECHO_PIN).start()
+                
                 # Inicializar PWM para el servo
                 self.servo_pwm = GPIO.PWM(SERVO_PIN, 50)  # 50Hz
                 self.servo_pwm.start(0)
@@ -336,149 +696,92 @@ class TestDaltonismoCompleto:
                 self.rgb_green_pwm.start(0)
                 self.rgb_blue_pwm.start(0)
                 
-                # Posicionar servo en centro al inicio
-                self.set_servo_angle(90)
-                
-                # Encender LED azul al inicio
-                self.set_rgb_color(0, 0, 100)  # Azul al 100%
-                
                 print("[OK] GPIO configurado correctamente (sensor + servo + buzzer + RGB)")
             except Exception as e:
                 print(f"[ERROR] Error configurando GPIO: {e}")
     
+    # ============================================================================
+    # ACTUADORES (órdenes al hilo de hardware, nunca bloquean)
+    # ============================================================================
+    
     def set_servo_angle(self, angle):
         """
         Mueve el servo al ángulo especificado
         angle: 0-180 grados
         """
-        if not GPIO_AVAILABLE or self.servo_pwm is None:
-            print(f"[SERVO-SIM] Simulando movimiento a {angle}°")
-            self.current_servo_angle = angle  # Actualizar posición simulada
-            return
-            
-        try:
-            # Convertir ángulo a duty cycle
-            # 0° = 2.5% duty cycle, 90° = 7.5% duty cycle, 180° = 12.5% duty cycle
-            duty_cycle = 2.5 + (angle / 180.0) * 10.0
-            self.servo_pwm.ChangeDutyCycle(duty_cycle)
-            time.sleep(1.0)  # Aumentado para movimiento más suave
-            self.servo_pwm.ChangeDutyCycle(0)  # Detener señal PWM
-            self.current_servo_angle = angle  # Actualizar posición actual
-            print(f"[SERVO] Movido a {angle}°")
-        except Exception as e:
-            print(f"[ERROR] Error moviendo servo: {e}")
+        self.hardware.submit(servo_profile([(angle, 0)], name=f"servo {angle}°"))
     
-    def play_buzzer_tone(self, frequency, duration):
+    def play_buzzer_tone(self, frequency, duration, tap=None, priority=PRIORITY_FEEDBACK):
         """
         Reproduce un tono en el buzzer
         frequency: Frecuencia en Hz
         duration: Duración en segundos
+        tap: Pulsación que lo provocó (para medir la latencia tap->buzzer)
         """
-        if not GPIO_AVAILABLE or self.buzzer_pwm is None:
-            print(f"[BUZZER-SIM] Simulando tono {frequency}Hz por {duration}s")
-            return
-        
-        try:
-            self.buzzer_pwm.ChangeFrequency(frequency)
-            self.buzzer_pwm.ChangeDutyCycle(50)  # 50% duty cycle
-            time.sleep(duration)
-            self.buzzer_pwm.ChangeDutyCycle(0)  # Detener sonido
-        except Exception as e:
-            print(f"[ERROR] Error reproduciendo tono: {e}")
+        on_start = (lambda: self.input.buzzer_started(tap)) if tap else None
+        self.hardware.submit(tone(frequency, duration, priority, on_start=on_start))
     
-    def buzzer_pip_correct(self):
+    def play_melody(self, name, tap=None, priority=PRIORITY_RESULT, max_delay=None):
+        """Reproduce una melodía de lib/Melody.MELODIES (no bloquea)"""
+        on_start = (lambda: self.input.buzzer_started(tap)) if tap else None
+        self.hardware.submit(melody(MELODIES[name], priority=priority, name=name,
+                                    on_start=on_start, max_delay=max_delay))
+    
+    def buzzer_pip_correct(self, tap=None):
         """Pip corto para respuesta correcta"""
         print("[BUZZER] Pip correcto")
-        self.play_buzzer_tone(1200, 0.1)  # Tono agudo corto
+        self.play_melody("pip_correcto", tap, PRIORITY_FEEDBACK, max_delay=0.2)
     
-    def buzzer_pip_incorrect(self):
+    def buzzer_pip_incorrect(self, tap=None):
         """Pip corto para respuesta incorrecta"""
         print("[BUZZER] Pip incorrecto")
-        self.play_buzzer_tone(400, 0.15)  # Tono grave corto
+        self.play_melody("pip_incorrecto", tap, PRIORITY_FEEDBACK, max_delay=0.2)
     
     def buzzer_start(self):
         """Tonito de inicio del programa"""
         print("[BUZZER] Tono de inicio")
-        # Tonito alegre de inicio: Do-Mi-Sol
-        notes = [(523, 0.1), (659, 0.1), (784, 0.15)]
-        for freq, duration in notes:
-            self.play_buzzer_tone(freq, duration)
-            time.sleep(0.05)
+        self.play_melody("inicio", priority=PRIORITY_IDLE)
     
     def buzzer_result_good(self):
         """Tonada alegre para resultado bueno"""
         print("[BUZZER] Tonada de resultado bueno")
-        # Melodía alegre: Do-Mi-Sol-Do alto-Sol-Do alto
-        notes = [(523, 0.15), (659, 0.15), (784, 0.15), (1047, 0.2), (784, 0.15), (1047, 0.3)]
-        for freq, duration in notes:
-            self.play_buzzer_tone(freq, duration)
-            time.sleep(0.05)
+        self.play_melody("resultado_bueno")
     
     def buzzer_result_bad(self):
         """Tonada triste para resultado malo"""
         print("[BUZZER] Tonada de resultado malo")
-        # Melodía descendente triste
-        notes = [(784, 0.2), (659, 0.2), (523, 0.2), (392, 0.4)]
-        for freq, duration in notes:
-            self.play_buzzer_tone(freq, duration)
-            time.sleep(0.05)
+        self.play_melody("resultado_malo")
     
     # Mantener las funciones antiguas por compatibilidad (ahora llaman a las nuevas)
-    def buzzer_success(self):
+    def buzzer_success(self, tap=None):
         """Alias para buzzer_pip_correct"""
-        self.buzzer_pip_correct()
+        self.buzzer_pip_correct(tap)
     
-    def buzzer_failure(self):
+    def buzzer_failure(self, tap=None):
         """Alias para buzzer_pip_incorrect"""
-        self.buzzer_pip_incorrect()
+        self.buzzer_pip_incorrect(tap)
     
     # ============================================================================
     # FUNCIONES DE CONTROL DE TIRA RGB
     # ============================================================================
     
-    def set_rgb_color(self, red_duty, green_duty, blue_duty):
+    def set_rgb_color(self, red_duty, green_duty, blue_duty, priority=PRIORITY_FEEDBACK):
         """
-        Establece el color de la tira RGB (ánodo común - lógica invertida)
+        Establece el color de la tira RGB
         red_duty, green_duty, blue_duty: 0-100 (porcentaje de brillo)
         
-        NOTA: Tira RGB de ánodo común (5V común, pines R/G/B a tierra)
-        - Para encender: duty cycle ALTO (100 = totalmente encendido)
-        - La inversión se hace internamente: 100-duty_cycle
+        NOTA: Tira RGB de ánodo común (5V común, pines R/G/B a tierra); la
+        inversión del duty cycle la hace PwmOutputs.led
         """
-        if not HARDWARE_ENABLED or not all([self.rgb_red_pwm, self.rgb_green_pwm, self.rgb_blue_pwm]):
-            print(f"[RGB-SIM] Simulando color RGB: R={red_duty}% G={green_duty}% B={blue_duty}%")
-            return
-        
-        try:
-            # INVERTIR la lógica para ánodo común:
-            # 100% brillo = 100% duty cycle (pin LOW máximo tiempo)
-            # 0% brillo = 0% duty cycle (pin HIGH máximo tiempo)
-            inverted_red = 100 - red_duty
-            inverted_green = 100 - green_duty
-            inverted_blue = 100 - blue_duty
-            
-            self.rgb_red_pwm.ChangeDutyCycle(inverted_red)
-            self.rgb_green_pwm.ChangeDutyCycle(inverted_green)
-            self.rgb_blue_pwm.ChangeDutyCycle(inverted_blue)
-            print(f"[RGB] Color establecido: R={red_duty}% G={green_duty}% B={blue_duty}% (invertido para ánodo común)")
-        except Exception as e:
-            print(f"[ERROR] Error estableciendo color RGB: {e}")
+        self.hardware.submit(led_color(red_duty, green_duty, blue_duty, priority))
     
     def rgb_blink_blue(self, times=3):
         """
         Parpadea azul al inicio de un test
         times: número de parpadeos
         """
-        def blink():
-            print(f"[RGB] Parpadeando azul {times} veces")
-            for _ in range(times):
-                self.set_rgb_color(0, 0, 0)    # Apagar
-                time.sleep(0.2)
-                self.set_rgb_color(0, 0, 100)  # Azul
-                time.sleep(0.2)
-        
-        # Ejecutar en thread separado para no bloquear
-        threading.Thread(target=blink, daemon=True).start()
+        print(f"[RGB] Parpadeando azul {times} veces")
+        self.hardware.submit(led_blink((0, 0, 100), times, period=0.4))
     
     def rgb_set_blue(self):
         """Establece color azul (estado por defecto)"""
@@ -486,45 +789,48 @@ class TestDaltonismoCompleto:
         self.set_rgb_color(0, 0, 100)
     
     def rgb_set_green(self):
-        """Establece color verde (resultado satisfactorio)"""
+        """Pulsos verdes y verde fijo (resultado satisfactorio)"""
         print("[RGB] Estableciendo verde (resultado satisfactorio)")
-        self.set_rgb_color(0, 100, 0)
+        self.hardware.submit(led_effect(LedEffects.result_pulse((0, 100, 0)), PRIORITY_RESULT, "resultado verde"))
     
     def rgb_set_red(self):
-        """Establece color rojo (resultado insatisfactorio)"""
+        """Pulsos rojos y rojo fijo (resultado insatisfactorio)"""
         print("[RGB] Estableciendo rojo (resultado insatisfactorio)")
-        self.set_rgb_color(100, 0, 0)
+        self.hardware.submit(led_effect(LedEffects.result_pulse((100, 0, 0)), PRIORITY_RESULT, "resultado rojo"))
     
-    def move_servo_result(self, satisfactory=True):
+    def rgb_attract(self):
         """
-        Mueve el servo según el resultado del test
+        Modo atracción en la pantalla de espera: respiración azul sin fin con
+        la prioridad más baja, así que cualquier otro efecto la sustituye
+        """
+        self.hardware.submit(led_effect(LedEffects.breathe((0, 0, 100), period=4.0, floor=0.15),
+                                        PRIORITY_IDLE, "modo atracción"))
+    
+    def move_servo_result(self, satisfactory=True, delay=1.0):
+        """
+        Mueve el servo según el resultado del test, sin bloquear la interfaz
         satisfactory: True = 90° izquierda, False = 90° derecha desde centro
+        delay: Segundos antes de empezar (la pantalla de resultados va primero)
         """
         print(f"[SERVO] Resultado: {'Satisfactorio' if satisfactory else 'Insatisfactorio'}")
         
-        # Solo centrar si no está ya en centro
-        if self.current_servo_angle != 90:
-            print("[SERVO] Posicionando en centro")
-            self.set_servo_angle(90)
-            time.sleep(2)  # Más tiempo para posicionamiento
-        else:
-            print("[SERVO] Ya está en centro")
-        
-        if satisfactory:
-            # Resultado satisfactorio - girar 90° a la IZQUIERDA desde centro (90° → 0°)
-            print("[SERVO] Girando 90° a la izquierda desde centro")
-            self.set_servo_angle(0)
-        else:
-            # Resultado insatisfactorio - girar 90° a la DERECHA desde centro (90° → 180°)
-            print("[SERVO] Girando 90° a la derecha desde centro")
-            self.set_servo_angle(180)
-        
-        # Esperar 2 segundos en la posición del resultado
-        time.sleep(2)
-        
-        # Regresar a la posición original (centro)
-        print("[SERVO] Regresando a posición original (centro)")
-        self.set_servo_angle(90)
+        # Centro -> resultado -> espera -> centro. Satisfactorio: 90° a la
+        # IZQUIERDA desde centro (90° → 0°); insatisfactorio: 90° a la DERECHA
+        # (90° → 180°). El perfil parte del ángulo real y centra primero si hace falta
+        positions = [(90, 0.5), (0 if satisfactory else 180, 2), (90, 0)]
+        self.hardware.submit(servo_profile(
+            positions, PRIORITY_RESULT, name="servo resultado", start_delay=delay,
+            on_done=lambda completed: self.root.after(0, lambda: self.on_servo_done(completed))
+        ))
+    
+    def on_servo_done(self, completed):
+        """Aviso (en el hilo de Tk) del final de la secuencia del servo"""
+        print(f"[SERVO] Secuencia de resultado {'completada' if completed else 'interrumpida'}")
+    
+    def center_servo(self):
+        """Interrumpe cualquier secuencia en curso y vuelve al centro"""
+        if self.hardware.busy("servo") or self.hardware.outputs.servo_angle != 90:
+            self.hardware.submit(servo_profile([(90, 0)], PRIORITY_RESULT, name="servo centro"))
     
     def setup_ui(self):
         """Configuración de la interfaz de usuario"""
@@ -555,6 +861,10 @@ class TestDaltonismoCompleto:
         # Frame para test de Ishihara
         self.setup_ishihara_test_ui()
         
+        # Frame de resultados (se rellena al terminar cada sesión)
+        self.setup_results_ui()
+        self.visible_screen = None
+        
         # Mostrar pantalla de espera inicial
         self.show_waiting_screen()
     
@@ -601,7 +911,7 @@ class TestDaltonismoCompleto:
         buttons_container.grid(row=0, column=1)
         
         self.color_buttons = {}
-        for color_name, hex_code in colors.items():
+        for color_name, hex_code in self.display_colors.items():
             btn = tk.Button(
                 buttons_container, 
                 text="",  # Sin texto, solo el color
@@ -614,6 +924,8 @@ class TestDaltonismoCompleto:
                 activebackground=hex_code
             )
             btn.pack(side=tk.LEFT, padx=20, pady=20)  # Mayor espaciado
+            # El toque se sella al pulsar; el comando llega después, al soltar
+            btn.bind("<ButtonPress-1>", self.input.press, add="+")
             self.color_buttons[color_name] = btn
             self.add_color_button_effects(btn, hex_code)
     
@@ -654,35 +966,154 @@ class TestDaltonismoCompleto:
         self.options_frame = tk.Frame(self.content_frame, bg="white")
         self.options_frame.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
         
-        # Los botones se crearán dinámicamente para cada lámina
+        # Configurar el options_frame para centrar contenido
+        self.options_frame.grid_rowconfigure(0, weight=1)
+        self.options_frame.grid_columnconfigure(0, weight=1)
+        
+        # Título para los botones - Escalado adaptativo
+        self.options_title = tk.Label(
+            self.options_frame, 
+            text="Selecciona una opción:",
+            font=("Segoe UI", self.fonts['button'], "bold"),
+            fg="#FF5722", bg="white"
+        )
+        self.options_title.grid(row=0, column=0, pady=self.spacing['medium'])
+        
+        # Botones creados una sola vez; en cada lámina solo cambia su texto
         self.option_buttons = []
+        for i in range(OPTION_BUTTONS):
+            self.add_option_button()
+    
+    def add_option_button(self):
+        """Añade un botón al conjunto reutilizable de opciones"""
+        i = len(self.option_buttons)
+        # Sin colores para mantener validez del test
+        btn = tk.Button(
+            self.options_frame, 
+            text="", 
+            font=("Arial", self.fonts['option_button'], "bold"),
+            width=self.button_sizes['option_width'], 
+            height=self.button_sizes['option_height'],  # Botones rectangulares
+            bg="white", fg="black",  # Sin colores para no invalidar el test
+            relief="raised", bd=3, cursor="hand2",
+            # El comando lee la opción actual: no hay que recrearlo por lámina
+            command=lambda i=i: self.check_ishihara_answer(self.current_options[i])
+        )
+        btn.grid(row=i+1, column=0, pady=self.spacing['medium'], padx=self.spacing['medium'], sticky="ew")
+        btn.bind("<ButtonPress-1>", self.input.press, add="+")
+        self.options_frame.grid_rowconfigure(i+1, weight=1)
+        self.option_buttons.append(btn)
+        
+        # Añadir efectos hover neutros
+        self.add_option_button_hover(btn, "white")
+        return btn
+    
+    def setup_results_ui(self):
+        """Configura la UI de resultados; sus textos se actualizan en cada sesión"""
+        self.results_frame = tk.Frame(self.root, bg="white")
+        
+        # Configurar distribución vertical para usar toda la altura
+        self.results_frame.grid_rowconfigure(0, weight=1)  # Espaciado superior
+        self.results_frame.grid_rowconfigure(1, weight=2)  # Título
+        self.results_frame.grid_rowconfigure(2, weight=2)  # Resultado colores
+        self.results_frame.grid_rowconfigure(3, weight=2)  # Resultado Ishihara
+        self.results_frame.grid_rowconfigure(4, weight=3)  # Evaluación
+        self.results_frame.grid_rowconfigure(5, weight=2)  # Botón reinicio
+        self.results_frame.grid_rowconfigure(6, weight=1)  # Espaciado inferior
+        self.results_frame.grid_columnconfigure(0, weight=1)
+        
+        # Título - Escalado adaptativo
+        self.results_title = tk.Label(
+            self.results_frame, text=" Resultados del Test", 
+            font=("Arial", self.fonts['title'], "bold"),
+            fg="#2196F3", bg="white"
+        )
+        self.results_title.grid(row=1, column=0, sticky="nsew", pady=self.spacing['large'])
+        
+        # Resultados del test de colores - Escalado adaptativo
+        self.color_result_label = tk.Label(
+            self.results_frame, text="",
+            font=("Arial", self.fonts['button'], "bold"), bg="white"
+        )
+        self.color_result_label.grid(row=2, column=0, sticky="nsew", pady=self.spacing['medium'])
+        
+        # Resultados del test de Ishihara - Escalado adaptativo
+        self.ishihara_result_label = tk.Label(
+            self.results_frame, text="",
+            font=("Arial", self.fonts['button'], "bold"), bg="white"
+        )
+        self.ishihara_result_label.grid(row=3, column=0, sticky="nsew", pady=self.spacing['medium'])
+        
+        # Evaluación final - Escalado adaptativo
+        self.eval_label = tk.Label(
+            self.results_frame, text="",
+            font=("Arial", self.fonts['button'], "bold"), bg="white"
+        )
+        self.eval_label.grid(row=4, column=0, sticky="nsew", pady=self.spacing['large'])
+        
+        # Botón para reiniciar - Escalado adaptativo, sin colores
+        self.restart_button = tk.Button(
+            self.results_frame, text=" Nuevo Test",
+            font=("Arial", self.fonts['button'], "bold"), bg="lightgray", fg="black",
+            width=self.button_sizes['large_width'], height=self.button_sizes['height'], cursor="hand2",
+            command=self.restart_test
+        )
+        self.restart_button.grid(row=5, column=0, sticky="ew", pady=self.spacing['large'])
+    
+    def show_screen(self, frame):
+        """Cambia la pantalla visible (None = solo la barra superior)"""
+        if frame is self.visible_screen:
+            return
+        # Las animaciones de la pantalla anterior terminan en su estado final
+        self.animator.cancel_all(finish=True)
+        if self.visible_screen is not None:
+            self.visible_screen.pack_forget()
+        if frame is not None:
+            frame.pack(expand=True, fill=tk.BOTH)
+        self.visible_screen = frame
     
     def show_waiting_screen(self):
         """Muestra pantalla de espera"""
         self.current_test = "waiting"
-        self.main_frame.pack_forget()
-        self.ishihara_frame.pack_forget()
+        self.input.close()
+        self.show_screen(None)
+        self.rgb_attract()
         
-        self.test_indicator.config(text=" Acércate al sensor para iniciar")
+        if self.plates_ready:
+            self.test_indicator.config(text=" Acércate al sensor para iniciar")
+        else:
+            self.test_indicator.config(text=" Preparando láminas...")
     
     def start_color_test(self):
         """Inicia el test de colores"""
-        if not self.user_nearby:
+        if not self.user_nearby or not self.plates_ready:
+            # Sin láminas todavía: on_plates_loaded lo iniciará al terminar
             return
             
         self.current_test = "colors"
         self.test_indicator.config(text="✓ Test de Colores")
         
+        # Nueva sesión: interrumpir la secuencia del servo de la anterior
+        self.center_servo()
+        
         # Parpadear LED azul al inicio del test
         self.rgb_blink_blue(times=3)
         
         # Mostrar frame de colores
-        self.ishihara_frame.pack_forget()
-        self.main_frame.pack(expand=True, fill=tk.BOTH)
+        self.show_screen(self.main_frame)
         
-        # Resetear variables
-        self.color_attempt = 0
-        self.color_score = 0
+        # Nueva sesión (con la semilla del log si se graba, para reproducirla)
+        if self.recorder:
+            seed = self.recorder.session_seed()
+            self.session.rng.seed(seed)
+            self.record("start", str(seed))
+            self.record("plates", json.dumps([{"correct_answer": p["correct_answer"], "options": p["options"]}
+                                              for p in self.session.plates]))
+        self.session.start()
+        
+        # Preparar la primera lámina Ishihara mientras dura el test de colores
+        self.plate_prefetcher.reset()
+        self.prefetch_plate(0)
         
         # Comenzar primera ronda
         self.next_color_round()
@@ -690,17 +1121,21 @@ class TestDaltonismoCompleto:
     def next_color_round(self):
         """Siguiente ronda del test de colores"""
         if not self.user_nearby:
+            self.session.abort()
+            self.record("abort")
             self.show_waiting_screen()
             return
             
-        if self.color_attempt >= self.color_attempts:
+        if self.session.phase != "colors":
             # Terminar test de colores, comenzar Ishihara
             self.start_ishihara_test()
             return
         
-        # Seleccionar color aleatorio
-        self.current_color_name = random.choice(list(colors.keys()))
-        color_hex = colors[self.current_color_name]
+        # Restaurar el estilo de los botones (se crean una sola vez)
+        self.reset_color_buttons()
+        
+        # Color pedido en esta ronda (elegido por la sesión)
+        color_name = self.session.current_color
         
         # Actualizar UI
         self.label.config(text=f"Selecciona el color:", fg="black")
@@ -708,14 +1143,18 @@ class TestDaltonismoCompleto:
         # Eliminado: actualización de contador
         
         # Animar texto principal
-        self.animate_text_fade(self.label, f"Selecciona: {self.current_color_name}")
+        self.animate_text_fade(self.label, f"Selecciona: {color_name}")
+        
+        # Desde ahora se admite una respuesta para esta ronda
+        self.input.open_round(("colors", self.session.color_attempt))
+        self.record("round", f"colors:{self.session.color_attempt}")
     
     def start_ishihara_test(self):
         """Inicia el test de Ishihara"""
         print(f"[DEBUG] Iniciando test Ishihara...")
         print(f"[DEBUG] Cantidad de laminas cargadas: {len(self.ishihara_plates)}")
         
-        if not self.ishihara_plates:
+        if self.session.phase != "ishihara":
             print("[ERROR] No hay laminas Ishihara cargadas!")
             self.show_final_results()
             return
@@ -728,12 +1167,7 @@ class TestDaltonismoCompleto:
         self.rgb_blink_blue(times=3)
         
         # Cambiar a frame de Ishihara
-        self.main_frame.pack_forget()
-        self.ishihara_frame.pack(expand=True, fill=tk.BOTH)
-        
-        # Resetear variables
-        self.ishihara_attempt = 0
-        self.ishihara_score = 0
+        self.show_screen(self.ishihara_frame)
         
         # Empezar primera lámina
         self.next_ishihara_round()
@@ -742,97 +1176,76 @@ class TestDaltonismoCompleto:
         """Siguiente ronda del test de Ishihara"""
         try:
             if not self.user_nearby:
+                self.session.abort()
+                self.record("abort")
                 self.show_waiting_screen()
                 return
             
-            # Verificación de seguridad para prevenir crashes
-            if self.ishihara_attempt >= self.ishihara_attempts or self.ishihara_attempt >= len(self.ishihara_plates):
-                print(f"[DEBUG] Test completado: attempt={self.ishihara_attempt}, total={self.ishihara_attempts}")
+            current_plate = self.session.current_plate
+            if current_plate is None:
+                print(f"[DEBUG] Test completado: {self.session.ishihara_attempt}/{self.session.ishihara_attempts} laminas")
                 self.show_final_results()
                 return
             
-            # Verificar que tenemos placas disponibles
-            if not self.ishihara_plates or len(self.ishihara_plates) == 0:
-                print("[ERROR] No hay placas de Ishihara disponibles")
-                self.show_final_results()
-                return
-            
-            # Eliminado: actualización de contador Ishihara
+            attempt = self.session.ishihara_attempt
+            self.current_options = current_plate["options"]
             
-            # Verificar índice válido antes de acceder a la placa
-            if self.ishihara_attempt < len(self.ishihara_plates):
-                current_plate = self.ishihara_plates[self.ishihara_attempt]
-                self.current_ishihara_answer = current_plate["correct_answer"]
-                self.current_options = current_plate["options"]
+            # Mostrar imagen con verificación - precargada o servida desde la caché
+            img = current_plate["image"]
+            if img:
+                photo = self.plate_prefetcher.take(attempt)
+                self.current_photo = photo or self.load_plate_photo(current_plate)
+                self.ishihara_image_label.config(image=self.current_photo)
                 
-                # Mostrar imagen con verificación - redimensionar dinámicamente
-                img = current_plate["image"]
-                if img:
-                    # Redimensionar a tamaño calculado (50% de pantalla o más)
-                    img_resized = img.resize((self.image_size, self.image_size), Image.LANCZOS)
-                    self.current_photo = ImageTk.PhotoImage(img_resized)
-                    self.ishihara_image_label.config(image=self.current_photo)
-                    
-                    # Crear botones de opciones
-                    self.create_option_buttons()
-                else:
-                    print(f"[ERROR] Imagen no disponible para placa {self.ishihara_attempt}")
-                    self.ishihara_attempt += 1
-                    self.root.after(100, self.next_ishihara_round)
+                # Preparar la siguiente mientras el usuario observa esta
+                self.prefetch_plate(attempt + 1)
+                
+                # Actualizar botones de opciones
+                self.update_option_buttons()
+                self.input.open_round(("ishihara", attempt))
+                self.record("round", f"ishihara:{attempt}")
             else:
-                print(f"[ERROR] Índice fuera de rango: {self.ishihara_attempt} >= {len(self.ishihara_plates)}")
-                self.show_final_results()
+                print(f"[ERROR] Imagen no disponible para placa {attempt}")
+                self.session.skip()
+                self.record("skip")
+                self.root.after(100, self.next_ishihara_round)
                 
         except Exception as e:
             print(f"[ERROR] Error en next_ishihara_round: {e}")
             # En caso de error, ir directo a resultados para no crashear
             self.show_final_results()
     
-    def create_option_buttons(self):
-        """Crea los botones de opción múltiple para Ishihara"""
-        # Limpiar botones anteriores
-        for btn in self.option_buttons:
-            btn.destroy()
-        self.option_buttons.clear()
-        
-        # Limpiar el frame de opciones
-        for widget in self.options_frame.winfo_children():
-            widget.destroy()
-        
-        # Configurar el options_frame para centrar contenido
-        self.options_frame.grid_rowconfigure(0, weight=1)
-        self.options_frame.grid_rowconfigure(1, weight=1)
-        self.options_frame.grid_rowconfigure(2, weight=1)
-        self.options_frame.grid_rowconfigure(3, weight=1)
-        self.options_frame.grid_rowconfigure(4, weight=1)
-        self.options_frame.grid_columnconfigure(0, weight=1)
-        
-        # Título para los botones - Escalado adaptativo
-        title_label = tk.Label(
-            self.options_frame, 
-            text="Selecciona una opción:",
-            font=("Segoe UI", self.fonts['button'], "bold"),
-            fg="#FF5722", bg="white"
-        )
-        title_label.grid(row=0, column=0, pady=self.spacing['medium'])
-        
-        # Crear botones sin colores para mantener validez del test
-        for i, option in enumerate(self.current_options):
-            btn = tk.Button(
-                self.options_frame, 
-                text=str(option), 
-                font=("Arial", self.fonts['option_button'], "bold"),
-                width=self.button_sizes['option_width'], 
-                height=self.button_sizes['option_height'],  # Botones rectangulares
-                bg="white", fg="black",  # Sin colores para no invalidar el test
-                relief="raised", bd=3, cursor="hand2",
-                command=lambda opt=option: self.check_ishihara_answer(opt)
-            )
-            btn.grid(row=i+1, column=0, pady=self.spacing['medium'], padx=self.spacing['medium'], sticky="ew")
-            self.option_buttons.append(btn)
-            
-            # Añadir efectos hover neutros
-            self.add_option_button_hover(btn, "white")
+    def prefetch_plate(self, index):
+        """Solicita precargar la lámina `index` si existe"""
+        if index < len(self.ishihara_plates):
+            self.plate_prefetcher.request(index, self.ishihara_plates[index])
+    
+    def load_plate_photo(self, plate):
+        """Obtiene la lámina escalada como PhotoImage, desde la caché si es posible"""
+        try:
+            data = self.plate_cache.get_plate(plate, self.image_size)
+            return tk.PhotoImage(data=data, format="ppm")
+        except Exception as e:
+            print(f"[CACHE] Error usando cache para {plate['filename']}: {e}")
+            img = plate["image"].get(self.image_size)
+            if self.color_lut:
+                img = self.color_lut.apply_image(img)
+            return ImageTk.PhotoImage(img)
+    
+    def update_option_buttons(self):
+        """Muestra las opciones de la lámina actual en los botones reutilizables"""
+        while len(self.option_buttons) < len(self.current_options):
+            self.add_option_button()
+        
+        for i, btn in enumerate(self.option_buttons):
+            if i < len(self.current_options):
+                # Restaurar el estilo neutro que pudo dejar la respuesta anterior
+                btn.config(text=str(self.current_options[i]), bg="white", fg="black",
+                           relief="raised", bd=3)
+                if not btn.winfo_manager():
+                    btn.grid()
+            elif btn.winfo_manager():
+                btn.grid_remove()
     
     def add_option_button_hover(self, button, normal_color):
         """Añade efecto hover neutral a los botones de opción"""
@@ -847,21 +1260,29 @@ class TestDaltonismoCompleto:
     
     def check_ishihara_answer(self, chosen_answer):
         """Verifica respuesta del test de Ishihara"""
+        pressed = self.input.take_press()
+        if self.recorder:
+            self.recorder.tap("ishihara", self.current_test, chosen_answer)
         try:
-            if not self.user_nearby or self.current_test != "ishihara":
+            if not self.user_nearby or self.current_test != "ishihara" or self.session.phase != "ishihara":
                 return
             
-            # Verificar respuesta
-            is_correct = chosen_answer == self.current_ishihara_answer
+            # Una sola respuesta por lámina: los toques repetidos se descartan
+            tap = self.input.accept("ishihara", ("ishihara", self.session.ishihara_attempt), pressed)
+            if tap is None:
+                return
+            
+            # Verificar respuesta (la sesión avanza a la siguiente lámina)
+            expected = self.session.current_plate["correct_answer"]
+            is_correct = self.session.answer(chosen_answer)
             if is_correct:
-                self.ishihara_score += 1
-                # Reproducir tono de éxito en un hilo separado para no bloquear UI
-                threading.Thread(target=self.buzzer_success, daemon=True).start()
+                # Tono de éxito (lo reproduce el hilo de hardware, no bloquea la UI)
+                self.buzzer_success(tap)
             else:
-                # Reproducir tono de fallo en un hilo separado para no bloquear UI
-                threading.Thread(target=self.buzzer_failure, daemon=True).start()
+                # Tono de fallo
+                self.buzzer_failure(tap)
             
-            print(f"[DEBUG] Respuesta: {chosen_answer}, Correcta: {self.current_ishihara_answer}, Puntaje: {self.ishihara_score}")
+            print(f"[DEBUG] Respuesta: {chosen_answer}, Correcta: {expected}, Puntaje: {self.session.ishihara_score}")
             
             # Efecto visual neutral en el botón seleccionado
             for btn in self.option_buttons:
@@ -872,34 +1293,40 @@ class TestDaltonismoCompleto:
                         btn.config(bg="gray", fg="white", relief="solid", bd=5)  # Gris claro para incorrecto
                     self.animate_button_press(btn)
                     break
+            self.input.visual_done(tap)
             
             # Avanzar a siguiente lámina
-            self.ishihara_attempt += 1
-            print(f"[DEBUG] Avanzando a attempt {self.ishihara_attempt} de {self.ishihara_attempts}")
+            print(f"[DEBUG] Avanzando a attempt {self.session.ishihara_attempt} de {self.session.ishihara_attempts}")
             
             # Programar siguiente ronda con verificación
             self.root.after(1500, self.next_ishihara_round)
             
         except Exception as e:
             print(f"[ERROR] Error en check_ishihara_answer: {e}")
-            # En caso de error, avanzar de forma segura
-            self.ishihara_attempt += 1
+            # En caso de error, continuar de forma segura
             self.root.after(100, self.next_ishihara_round)
     
     def check_color_answer_with_animation(self, chosen_color):
         """Verifica respuesta del test de colores con animación"""
-        if not self.user_nearby or self.current_test != "colors":
+        pressed = self.input.take_press()
+        if self.recorder:
+            self.recorder.tap("colors", self.current_test, chosen_color)
+        if not self.user_nearby or self.current_test != "colors" or self.session.phase != "colors":
             return
         
-        # Verificar respuesta
-        is_correct = chosen_color == self.current_color_name
+        # Una sola respuesta por ronda: los toques repetidos se descartan
+        tap = self.input.accept("colors", ("colors", self.session.color_attempt), pressed)
+        if tap is None:
+            return
+        
+        # Verificar respuesta (la sesión avanza a la siguiente ronda)
+        is_correct = self.session.answer(chosen_color)
         if is_correct:
-            self.color_score += 1
-            # Reproducir tono de éxito en un hilo separado para no bloquear UI
-            threading.Thread(target=self.buzzer_success, daemon=True).start()
+            # Tono de éxito (lo reproduce el hilo de hardware, no bloquea la UI)
+            self.buzzer_success(tap)
         else:
-            # Reproducir tono de fallo en un hilo separado para no bloquear UI
-            threading.Thread(target=self.buzzer_failure, daemon=True).start()
+            # Tono de fallo
+            self.buzzer_failure(tap)
         
         # Efecto visual neutral - mantener colores del botón
         btn = self.color_buttons[chosen_color]
@@ -912,80 +1339,47 @@ class TestDaltonismoCompleto:
             btn.config(relief="groove", bd=6)
         
         self.animate_button_press(btn)
+        self.input.visual_done(tap)
         
         # Restaurar estado original - Más rápido para Raspberry Pi
-        self.root.after(400, lambda: btn.config(relief="raised", bd=3))
+        self.animator.later(btn, "style", 0.4, lambda: btn.config(relief="raised", bd=3))
         
         # Avanzar - Delay reducido para mejor fluidez
-        self.color_attempt += 1
         self.root.after(600, self.next_color_round)
     
     def show_final_results(self):
         """Muestra los resultados finales"""
         try:
             self.current_test = "results"
-            print(f"[DEBUG] Mostrando resultados: colores={self.color_score}/{self.color_attempts}, ishihara={self.ishihara_score}/{self.ishihara_attempts}")
-            
-            # Ocultar frames anteriores de forma segura
-            try:
-                self.main_frame.pack_forget()
-            except:
-                pass
-            try:
-                self.ishihara_frame.pack_forget()
-            except:
-                pass
+            self.input.close()
+            results = self.session.results()
+            self.record("results", json.dumps({key: results[key] for key in
+                                               ("color_score", "ishihara_score", "overall_percentage", "satisfactory")}))
+            print(f"[DEBUG] Mostrando resultados: colores={results['color_score']}/{results['color_attempts']}, ishihara={results['ishihara_score']}/{results['ishihara_attempts']}")
+            print(f"[PREFETCH] {self.plate_prefetcher.stats()}")
+            print(f"[INPUT] {self.input.stats()}")
             
-            # Frame de resultados con distribución vertical completa
-            results_frame = tk.Frame(self.root, bg="white")
-            results_frame.pack(expand=True, fill=tk.BOTH)
-            
-            # Configurar distribución vertical para usar toda la altura
-            results_frame.grid_rowconfigure(0, weight=1)  # Espaciado superior
-            results_frame.grid_rowconfigure(1, weight=2)  # Título
-            results_frame.grid_rowconfigure(2, weight=2)  # Resultado colores
-            results_frame.grid_rowconfigure(3, weight=2)  # Resultado Ishihara
-            results_frame.grid_rowconfigure(4, weight=3)  # Evaluación
-            results_frame.grid_rowconfigure(5, weight=2)  # Botón reinicio
-            results_frame.grid_rowconfigure(6, weight=1)  # Espaciado inferior
-            results_frame.grid_columnconfigure(0, weight=1)
-        
-            # Título - Escalado adaptativo
-            title = tk.Label(
-                results_frame, text=" Resultados del Test", 
-                font=("Arial", self.fonts['title'], "bold"),
-                fg="#2196F3", bg="white"
-            )
-            title.grid(row=1, column=0, sticky="nsew", pady=self.spacing['large'])
-        
-            # Resultados del test de colores - Escalado adaptativo
-            color_percentage = (self.color_score / self.color_attempts) * 100
-            color_result = tk.Label(
-                results_frame, 
-                text=f" Colores: {self.color_score}/{self.color_attempts} ({color_percentage:.1f}%)",
-                font=("Arial", self.fonts['button'], "bold"), fg="#4CAF50" if color_percentage >= 75 else "#FF5722",
-                bg="white"
+            # Resultados del test de colores
+            color_percentage = results['color_percentage']
+            self.color_result_label.config(
+                text=f" Colores: {results['color_score']}/{results['color_attempts']} ({color_percentage:.1f}%)",
+                fg="#4CAF50" if color_percentage >= PASS_THRESHOLD else "#FF5722"
             )
-            color_result.grid(row=2, column=0, sticky="nsew", pady=self.spacing['medium'])
             
-            # Resultados del test de Ishihara - Escalado adaptativo
-            if self.ishihara_attempts > 0:
-                ishihara_percentage = (self.ishihara_score / self.ishihara_attempts) * 100
-                ishihara_result = tk.Label(
-                    results_frame,
-                    text=f" Ishihara: {self.ishihara_score}/{self.ishihara_attempts} ({ishihara_percentage:.1f}%)",
-                    font=("Arial", self.fonts['button'], "bold"), fg="#4CAF50" if ishihara_percentage >= 75 else "#FF5722",
-                    bg="white"
+            # Resultados del test de Ishihara
+            if results['ishihara_attempts'] > 0:
+                ishihara_percentage = results['ishihara_percentage']
+                self.ishihara_result_label.config(
+                    text=f" Ishihara: {results['ishihara_score']}/{results['ishihara_attempts']} ({ishihara_percentage:.1f}%)",
+                    fg="#4CAF50" if ishihara_percentage >= PASS_THRESHOLD else "#FF5722"
                 )
-                ishihara_result.grid(row=3, column=0, sticky="nsew", pady=self.spacing['medium'])
-            
-            # Evaluación general
-            total_score = self.color_score + self.ishihara_score
-            total_possible = self.color_attempts + self.ishihara_attempts
-            overall_percentage = (total_score / total_possible) * 100 if total_possible > 0 else 0
+                self.ishihara_result_label.grid()
+            else:
+                self.ishihara_result_label.grid_remove()
             
             # CONTROL DEL SERVO SEGÚN RESULTADO
-            is_satisfactory = overall_percentage >= 75  # Umbral para resultado satisfactorio
+            overall_percentage = results['overall_percentage']
+            is_satisfactory = results['satisfactory']
             print(f"[RESULTADO] Puntuacion: {overall_percentage:.1f}% - {'SATISFACTORIO' if is_satisfactory else 'INSATISFACTORIO'}")
             
             # Cambiar color del LED RGB según resultado
@@ -997,59 +1391,46 @@ class TestDaltonismoCompleto:
             # Reproducir tonada según resultado
             if GPIO_AVAILABLE and self.buzzer_pwm:
                 if is_satisfactory:
-                    threading.Thread(target=self.buzzer_result_good, daemon=True).start()
+                    self.buzzer_result_good()
                 else:
-                    threading.Thread(target=self.buzzer_result_bad, daemon=True).start()
+                    self.buzzer_result_bad()
             
             # Mover servo según resultado
-            self.root.after(1000, lambda: self.move_servo_result(is_satisfactory))
+            self.move_servo_result(is_satisfactory)
             
-            if overall_percentage >= 85:
-                evaluation = "[OK] Vision cromatica normal"
-                eval_color = "#4CAF50"
-            elif overall_percentage >= 65:
-                evaluation = "[ATENCION] Posible deficiencia leve"
-                eval_color = "#FF9800"
-            else:
-                evaluation = "[ERROR] Se recomienda consulta oftalmologica"
-                eval_color = "#F44336"
-        
-            # Evaluación final - Escalado adaptativo
-            eval_label = tk.Label(
-                results_frame, text=evaluation,
-                font=("Arial", self.fonts['button'], "bold"), fg=eval_color, bg="white"
-            )
-            eval_label.grid(row=4, column=0, sticky="nsew", pady=self.spacing['large'])
+            evaluation, eval_color = EVALUATION_TEXTS[results['evaluation']]
             
-            # Botón para reiniciar - Escalado adaptativo, sin colores
-            restart_btn = tk.Button(
-                results_frame, text=" Nuevo Test",
-                font=("Arial", self.fonts['button'], "bold"), bg="lightgray", fg="black",
-                width=self.button_sizes['large_width'], height=self.button_sizes['height'], cursor="hand2",
-                command=self.restart_test
-            )
-            restart_btn.grid(row=5, column=0, sticky="ew", pady=self.spacing['large'])
+            # Evaluación final
+            self.results_title.config(text=" Resultados del Test")
+            self.eval_label.config(text=evaluation, fg=eval_color)
+            self.show_screen(self.results_frame)
             
             # Actualizar indicador
             self.test_indicator.config(text=" Test Completado")
             
             # Generar y enviar reporte PDF a Telegram
-            if NOTIFICATION_AVAILABLE:
+            if not REPORTING.failed:
                 try:
                     # Preparar datos del test
                     test_results = {
-                        'color_score': self.color_score,
-                        'color_attempts': self.color_attempts,
-                        'ishihara_score': self.ishihara_score,
-                        'ishihara_attempts': self.ishihara_attempts,
+                        'color_score': results['color_score'],
+                        'color_attempts': results['color_attempts'],
+                        'ishihara_score': results['ishihara_score'],
+                        'ishihara_attempts': results['ishihara_attempts'],
                         'timestamp': datetime.now().strftime('%Y%m%d_%H%M%S'),
+                        'plate_thumbnails': self.plate_thumbnails(),
                         'patient_id': f'TEST_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
                     }
                     
                     # Enviar reporte en thread separado para no bloquear UI
                     def send_report():
                         try:
-                            asyncio.run(DaltonismReportGenerator.generate_and_send_report(test_results))
+                            # Si el import de fondo aún no terminó, se espera aquí y no en la UI
+                            notification = REPORTING.get()
+                            if notification is None:
+                                return
+                            import asyncio
+                            asyncio.run(notification.DaltonismReportGenerator.generate_and_send_report(test_results))
                             print("[TELEGRAM] Reporte enviado exitosamente")
                         except Exception as e:
                             print(f"[ERROR] Error enviando reporte a Telegram: {e}")
@@ -1060,48 +1441,53 @@ class TestDaltonismoCompleto:
         
         except Exception as e:
             print(f"[ERROR] Error mostrando resultados: {e}")
-            # Crear una pantalla de resultados básica en caso de error
+            # Pantalla de resultados básica en caso de error
             try:
-                for widget in self.root.winfo_children():
-                    if hasattr(widget, 'pack_forget'):
-                        widget.pack_forget()
-                
-                error_frame = tk.Frame(self.root, bg="white")
-                error_frame.pack(expand=True, fill=tk.BOTH)
-                
-                error_label = tk.Label(error_frame, text="Test Completado\n(Error al mostrar resultados detallados)", 
-                                     font=("Arial", 24), fg="black", bg="white")
-                error_label.pack(pady=50)
-                
-                restart_btn = tk.Button(error_frame, text="Nuevo Test", font=("Arial", 18), 
-                                      bg="lightgray", fg="black", command=self.restart_test)
-                restart_btn.pack(pady=20)
+                self.results_title.config(text="Test Completado\n(Error al mostrar resultados detallados)")
+                self.color_result_label.config(text="")
+                self.ishihara_result_label.grid_remove()
+                self.eval_label.config(text="")
+                self.show_screen(self.results_frame)
             except Exception as e2:
                 print(f"[ERROR] Error crítico en show_final_results: {e2}")
     
+    def plate_thumbnails(self):
+        """Miniaturas de las láminas de la sesión (nivel menor de la pirámide)"""
+        if self.ishihara_loader is None:
+            return []
+        pyramid = self.ishihara_loader.pyramid
+        if not pyramid.available():
+            return []
+        thumbnails = []
+        for plate in self.ishihara_plates:
+            path = pyramid.thumbnail_path(plate["digest"]) if plate.get("digest") else None
+            if path:
+                thumbnails.append(path)
+        return thumbnails
+    
     def restart_test(self):
         """Reinicia todo el test"""
-        # Resetear variables
-        self.color_attempt = 0
-        self.color_score = 0
-        self.ishihara_attempt = 0
-        self.ishihara_score = 0
+        # La sesión se reinicia en start_color_test
+        if self.recorder:
+            self.recorder.tap("restart", self.current_test)
+        
+        # Juego nuevo de láminas generadas (si se usan y no hay semilla fija),
+        # en otro hilo: generar y escalar bloquearía la interfaz
+        if args.generated_plates > 0 and args.plate_seed is None:
+            self.plates_ready = False
+            threading.Thread(target=self.refresh_plates, daemon=True).start()
         
         # Volver LED RGB a azul
         self.rgb_set_blue()
         
-        # Limpiar pantalla
-        for widget in self.root.winfo_children():
-            if widget != self.top_frame:
-                widget.destroy()
-        
-        # Reconfigurar UI
-        self.setup_color_test_ui()
-        self.setup_ishihara_test_ui()
-        
+        # Las pantallas son persistentes (sin destruir ni recrear widgets):
+        # cada una restaura su estado al mostrarse
         # Si el sensor está deshabilitado, ir directo al test
         if not SENSOR_ENABLED:
             self.user_nearby = True
+            if not self.plates_ready:
+                # Espera con "Preparando láminas..."; on_plates_ready inicia el test
+                self.show_waiting_screen()
             self.start_color_test()
         else:
             # Volver a pantalla de espera
@@ -1110,28 +1496,31 @@ class TestDaltonismoCompleto:
     # Funciones de animación
     def animate_text_fade(self, widget, text, steps=10):
         """Anima el desvanecimiento del texto"""
-        def fade_in(step=0):
-            if step < steps:
-                alpha = step / steps
-                gray_value = int(255 * alpha)
-                color = f"#{gray_value:02x}{gray_value:02x}{gray_value:02x}"
-                widget.config(fg=color, text=text)
-                self.root.after(50, lambda: fade_in(step + 1))
-            else:
-                widget.config(fg="black")
-        fade_in()
+        def fade(progress):
+            gray_value = int(255 * progress)
+            widget.config(fg=f"#{gray_value:02x}{gray_value:02x}{gray_value:02x}")
+        
+        widget.config(text=text, fg="black")
+        # Un nuevo texto sustituye al desvanecimiento en curso del mismo label
+        self.animator.animate(widget, "fg", steps * 0.05, fade, lambda: widget.config(fg="black"))
     
     def animate_button_press(self, button):
         """Anima el efecto de presión del botón - Optimizado para Raspberry Pi"""
         original_relief = button['relief']
         button.config(relief="sunken")
-        self.root.after(100, lambda: button.config(relief=original_relief))  # Más rápido
+        self.animator.later(button, "press", 0.1, lambda: button.config(relief=original_relief))  # Más rápido
     
     def pulse_counter(self, widget):
         """Efecto de pulso en el contador"""
         original_font = widget['font']
         widget.config(font=("Segoe UI", 26, "bold"))
-        self.root.after(200, lambda: widget.config(font=original_font))
+        self.animator.later(widget, "font", 0.2, lambda: widget.config(font=original_font))
+    
+    def reset_color_buttons(self):
+        """Devuelve los botones de colores a su estado normal sin recrearlos"""
+        for btn in self.color_buttons.values():
+            if btn['relief'] != "raised" or str(btn['bd']) != "3":
+                btn.config(relief="raised", bd=3)
     
     def add_color_button_effects(self, button, color):
         """Añade efectos a los botones de colores"""
@@ -1144,34 +1533,20 @@ class TestDaltonismoCompleto:
         button.bind("<Enter>", on_enter)
         button.bind("<Leave>", on_leave)
     
+    def record(self, name, payload=""):
+        """Marca de sesión en el log de --record-session (si se graba)"""
+        if self.recorder:
+            self.recorder.mark(name, payload)
+    
     # Funciones del sensor
     def get_distance(self):
-        """Obtiene la distancia del sensor ultrasónico"""
-        if not SENSOR_ENABLED:
-            return 30  # Simular usuario siempre presente (distancia menor a MIN_DISTANCE)
-        
-        if not GPIO_AVAILABLE:
-            return 30  # Simular usuario presente para pruebas
-        
+        """Obtiene la distancia del sensor ultrasónico (999 si se perdió el eco)"""
         try:
-            GPIO.output(TRIG_PIN, True)
-            time.sleep(0.00001)
-            GPIO.output(TRIG_PIN, False)
-            
-            start_time = time.time()
-            stop_time = time.time()
-            
-            while GPIO.input(ECHO_PIN) == 0:
-                start_time = time.time()
-            
-            while GPIO.input(ECHO_PIN) == 1:
-                stop_time = time.time()
-            
-            elapsed_time = stop_time - start_time
-            distance = (elapsed_time * 34300) / 2
-            
-            return distance
-        except:
+            distance = self.ultrasonic.measure()
+            if self.recorder:
+                self.recorder.distance(distance)
+            return 999 if distance is None else distance
+        except Exception:
             return 999
     
     def start_sensor_monitoring(self):
@@ -1188,20 +1563,10 @@ class TestDaltonismoCompleto:
         def monitor():
             while self.running:
                 try:
-                    distance = self.get_distance()
-                    was_nearby = self.user_nearby
-                    self.user_nearby = distance < MIN_DISTANCE
-                    
-                    # Actualizar indicador de proximidad
-                    if self.user_nearby != was_nearby:
-                        self.root.after(0, self.update_proximity_indicator)
-                    
-                    # Si el usuario se acerca y estamos esperando, iniciar test
-                    if self.user_nearby and not was_nearby and self.current_test == "waiting":
-                        self.root.after(0, self.start_color_test)
+                    self.on_distance(self.get_distance(), time.monotonic())
                     
-                    # Delay más corto para mejor responsividad
-                    time.sleep(0.2 if self.user_nearby else 0.4)
+                    # Muestreo adaptativo: lento en reposo, rápido al acercarse
+                    time.sleep(self.presence.interval())
                 except:
                     time.sleep(1)
         
@@ -1209,6 +1574,20 @@ class TestDaltonismoCompleto:
             self.sensor_thread = threading.Thread(target=monitor, daemon=True)
             self.sensor_thread.start()
     
+    def on_distance(self, distance, now):
+        """Procesa una lectura del sensor (hilo del sensor; 999 = eco perdido)"""
+        was_nearby = self.user_nearby
+        # Lectura filtrada con histéresis
+        self.user_nearby = self.presence.update(distance if distance < 999 else None, now)
+        
+        # Actualizar indicador de proximidad
+        if self.user_nearby != was_nearby:
+            self.root.after(0, self.update_proximity_indicator)
+        
+        # Si el usuario se acerca y estamos esperando, iniciar test
+        if self.user_nearby and not was_nearby and self.current_test == "waiting":
+            self.root.after(0, self.start_color_test)
+    
     def update_proximity_indicator(self):
         """Actualiza el indicador de proximidad"""
         if not SENSOR_ENABLED:
@@ -1228,8 +1607,28 @@ class TestDaltonismoCompleto:
             )
     
     def cleanup(self):
-        """Limpia recursos al cerrar"""
+        """Limpia recursos al cerrar (solo la primera vez que se llama)"""
+        if self._cleaned_up:
+            return
+        self._cleaned_up = True
         self.running = False
+        self.plate_prefetcher.stop()
+        if self.loop_monitor:
+            try:
+                path = self.loop_monitor.dump(args.loop_monitor or None)
+                print(f"[LOOP] Latencias guardadas en {path}")
+            except Exception as e:
+                print(f"[ERROR] No se pudieron guardar las latencias: {e}")
+            self.loop_monitor = None
+        self.ultrasonic.close()
+        if self.recorder:
+            self.recorder.close()
+            print(f"[REPLAY] Sesiones grabadas en {self.recorder.path}")
+        # Detener el hilo de hardware (silencia el buzzer) antes de parar los PWM
+        if self.gpio_driver:
+            self.gpio_driver.stop()
+        self.hardware.stop()
+        print(f"[HARDWARE] {self.hardware.stats()}")
         if GPIO_AVAILABLE:
             # Detener PWM del servo
             if self.servo_pwm:
@@ -1239,6 +1638,12 @@ class TestDaltonismoCompleto:
                 self.buzzer_pwm.stop()
             GPIO.cleanup()
             print("[OK] GPIO, servo y buzzer limpiados")
+        if GPIO_TRACER:
+            try:
+                path = GPIO_TRACER.dump(args.gpio_trace or None)
+                print(f"[GPIO] Traza guardada en {path}")
+            except Exception as e:
+                print(f"[ERROR] No se pudo guardar la traza de GPIO: {e}")
     
     def toggle_fullscreen(self):
         """Alternar entre pantalla completa y ventana"""
@@ -1255,7 +1660,13 @@ class TestDaltonismoCompleto:
             # Forzar actualización de geometría para pantalla completa
             self.root.update_idletasks()
             self.root.geometry(f"{self.screen_width}x{self.screen_height}+0+0")
-            self.root.protocol("WM_DELETE_WINDOW", self.cleanup)
+            # Primer pintado de la pantalla de espera antes de cargar nada pesado
+            self.root.update_idletasks()
+            PROFILER.mark("primer_pintado")
+            self.start_background_boot()
+            # Cerrar la ventana sale del mainloop, igual que Escape; la limpieza
+            # se hace una sola vez en el finally
+            self.root.protocol("WM_DELETE_WINDOW", self.root.quit)
             self.root.mainloop()
         finally:
             self.cleanup()
@@ -0,0 +1,112 @@
+"""
+Planificador central de animaciones de la interfaz Tk.
+
+Un único reloj de fotogramas (un solo ``root.after`` pendiente) avanza todas
+las animaciones activas a ritmo fijo y se detiene cuando no queda ninguna.
+Cada animación se identifica por (widget, canal): iniciar otra en el mismo
+canal sustituye a la anterior, de modo que dos desvanecimientos del mismo
+texto nunca se solapan. El progreso se calcula con el tiempo transcurrido y
+no contando pasos, así que si el bucle va atrasado se saltan fotogramas
+intermedios en lugar de alargar la animación.
+"""
+
+import time
+
+DEFAULT_FPS = 30
+
+
+class Animator:
+    """Reloj de fotogramas compartido por todas las animaciones"""
+
+    def __init__(self, root, fps: int = DEFAULT_FPS, clock=time.perf_counter):
+        self.root = root
+        self.interval = 1.0 / fps
+        self.clock = clock
+        self.animations = {}
+        self._timer = None
+        self._next_frame = 0.0
+        self.frames = 0
+        self.dropped = 0
+
+    def animate(self, widget, channel: str, duration: float, step=None, on_done=None):
+        """
+        Inicia (o sustituye) una animación.
+
+        Args:
+            widget: Widget animado (parte de la clave de coalescencia)
+            channel: Propiedad animada, p. ej. "fg" o "relief"
+            duration: Duración en segundos
+            step: step(progreso) con progreso en [0, 1), llamado en cada fotograma
+            on_done: Llamado al terminar (o al cancelar con finish=True)
+        """
+        self.animations[(widget, channel)] = (self.clock(), duration, step, on_done)
+        self._ensure_running()
+
+    def later(self, widget, channel: str, delay: float, action):
+        """Ejecuta action tras `delay` segundos dentro del reloj común"""
+        self.animate(widget, channel, delay, on_done=action)
+
+    def cancel(self, widget=None, finish: bool = False):
+        """
+        Cancela las animaciones de un widget (o todas si widget es None).
+
+        Con finish=True se aplica su estado final antes de quitarlas, para no
+        dejar widgets a medio animar al cambiar de pantalla.
+        """
+        keys = [key for key in self.animations if widget is None or key[0] is widget]
+        for key in keys:
+            _, _, _, on_done = self.animations.pop(key)
+            if finish and on_done:
+                self._call(key, on_done)
+        if not self.animations:
+            self._stop()
+
+    def cancel_all(self, finish: bool = True):
+        self.cancel(None, finish)
+
+    def _ensure_running(self):
+        if self._timer is None:
+            self._next_frame = self.clock()
+            self._timer = self.root.after(0, self._tick)
+
+    def _stop(self):
+        if self._timer is not None:
+            try:
+                self.root.after_cancel(self._timer)
+            except Exception:
+                pass
+            self._timer = None
+
+    def _tick(self):
+        self._timer = None
+        now = self.clock()
+        self.frames += 1
+        for key, (start, duration, step, on_done) in list(self.animations.items()):
+            if self.animations.get(key, (None,))[0] != start:
+                continue  # Sustituida por otra durante este fotograma
+            progress = (now - start) / duration if duration > 0 else 1.0
+            if progress >= 1.0:
+                del self.animations[key]
+                if on_done:
+                    self._call(key, on_done)
+            elif step:
+                self._call(key, step, progress)
+
+        if not self.animations:
+            return
+        self._next_frame += self.interval
+        if self._next_frame < now:
+            # Bucle atrasado: descartar los fotogramas perdidos y seguir desde ahora
+            missed = int((now - self._next_frame) / self.interval) + 1
+            self.dropped += missed
+            self._next_frame += missed * self.interval
+        delay_ms = max(1, int((self._next_frame - self.clock()) * 1000))
+        self._timer = self.root.after(delay_ms, self._tick)
+
+    def _call(self, key, func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            # Widget destruido u otro error: se descarta la animación
+            print(f"[ANIMACION] Error en {key[1]}: {e}")
+            self.animations.pop(key, None)
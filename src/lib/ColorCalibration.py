@@ -0,0 +1,153 @@
+"""
+Calibración de color por pantalla mediante una LUT 3D.
+
+Cada kiosco guarda en ``~/.config/daltonismo/calibration.npz`` (o en la ruta
+de ``DALTONISMO_CALIBRATION``) una tabla N x N x N x 3 que corrige el sRGB
+enviado a su panel. La LUT se aplica a imágenes completas con interpolación
+trilineal vectorizada y se integra en PlateRenderCache: las láminas se
+hornean ya corregidas y la huella de la LUT forma parte de la clave, de modo
+que durante el test no hay ningún coste por ronda.
+
+La LUT se ajusta a partir de parches medidos (scripts/calibrar_pantalla.py):
+se modela el panel como una transformación afín en RGB lineal, se invierte
+para cada nodo de la rejilla y se corrige el residuo con una interpolación
+por distancia inversa de los errores de los parches.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+from PIL import Image
+
+from lib.PlateGenerator import linear_to_srgb, srgb_to_linear
+
+DEFAULT_CALIBRATION_PATH = os.path.join(
+    os.environ.get("XDG_CONFIG_HOME", os.path.join(os.path.expanduser("~"), ".config")),
+    "daltonismo",
+    "calibration.npz",
+)
+
+DEFAULT_LUT_SIZE = 17
+
+
+def patch_targets(steps: int = 5):
+    """Colores sRGB (0-255) a mostrar y medir: rejilla steps x steps x steps"""
+    levels = np.round(np.linspace(0, 255, steps)).astype(int)
+    r, g, b = np.meshgrid(levels, levels, levels, indexing="ij")
+    return np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1).tolist()
+
+
+class ColorLUT:
+    """LUT 3D sRGB -> sRGB corregido, con valores en [0, 1]"""
+
+    def __init__(self, table):
+        table = np.asarray(table, dtype=np.float32)
+        if table.ndim != 4 or table.shape[3] != 3 or len(set(table.shape[:3])) != 1:
+            raise ValueError(f"Forma de LUT inválida: {table.shape}")
+        self.table = np.clip(table, 0.0, 1.0)
+        self.size = table.shape[0]
+        # Huella corta para las claves de la caché de láminas
+        self.fingerprint = hashlib.sha256(self.table.tobytes()).hexdigest()[:12]
+
+    @classmethod
+    def identity(cls, size: int = DEFAULT_LUT_SIZE):
+        grid = np.linspace(0.0, 1.0, size, dtype=np.float32)
+        r, g, b = np.meshgrid(grid, grid, grid, indexing="ij")
+        return cls(np.stack([r, g, b], axis=-1))
+
+    @classmethod
+    def load(cls, path: str = None):
+        """Carga la calibración del dispositivo, o None si no hay ninguna"""
+        path = path or os.environ.get("DALTONISMO_CALIBRATION", DEFAULT_CALIBRATION_PATH)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return cls(data["lut"])
+        except Exception as e:
+            print(f"[CALIBRACION] Error cargando {path}: {e}")
+            return None
+
+    def save(self, path: str = None):
+        path = path or os.environ.get("DALTONISMO_CALIBRATION", DEFAULT_CALIBRATION_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, lut=self.table)
+        os.replace(tmp_path, path)
+        return path
+
+    def apply(self, rgb):
+        """
+        Corrige un array (..., 3) sRGB en [0, 1] con interpolación trilineal.
+
+        Returns:
+            Array float32 de la misma forma
+        """
+        n = self.size - 1
+        pos = np.clip(np.asarray(rgb, dtype=np.float32), 0.0, 1.0) * n
+        lo = np.minimum(pos.astype(np.intp), n - 1)
+        frac = pos - lo
+        r0, g0, b0 = lo[..., 0], lo[..., 1], lo[..., 2]
+        fr, fg, fb = frac[..., 0:1], frac[..., 1:2], frac[..., 2:3]
+        t = self.table
+
+        c00 = t[r0, g0, b0] * (1 - fr) + t[r0 + 1, g0, b0] * fr
+        c01 = t[r0, g0, b0 + 1] * (1 - fr) + t[r0 + 1, g0, b0 + 1] * fr
+        c10 = t[r0, g0 + 1, b0] * (1 - fr) + t[r0 + 1, g0 + 1, b0] * fr
+        c11 = t[r0, g0 + 1, b0 + 1] * (1 - fr) + t[r0 + 1, g0 + 1, b0 + 1] * fr
+        c0 = c00 * (1 - fg) + c10 * fg
+        c1 = c01 * (1 - fg) + c11 * fg
+        return c0 * (1 - fb) + c1 * fb
+
+    def apply_image(self, img: Image.Image) -> Image.Image:
+        """Devuelve una copia RGB de la imagen con la LUT aplicada"""
+        rgb = np.asarray(img.convert("RGB"), dtype=np.float32) / 255.0
+        return Image.fromarray(np.round(self.apply(rgb) * 255.0).astype(np.uint8))
+
+    def apply_hex(self, hex_code: str) -> str:
+        """Corrige un color '#RRGGBB' de la paleta de la UI"""
+        rgb = np.array([int(hex_code[i:i + 2], 16) for i in (1, 3, 5)], dtype=np.float32) / 255.0
+        r, g, b = np.round(self.apply(rgb) * 255.0).astype(int)
+        return f"#{r:02X}{g:02X}{b:02X}"
+
+
+def fit_lut(targets, measured, size: int = DEFAULT_LUT_SIZE, power: float = 4.0) -> ColorLUT:
+    """
+    Ajusta una LUT de corrección a partir de parches medidos.
+
+    Args:
+        targets: Colores sRGB (0-255) enviados al panel, forma (K, 3)
+        measured: Colores sRGB (0-255) medidos en el panel, forma (K, 3)
+        size: Nodos por eje de la LUT
+        power: Exponente de la interpolación por distancia inversa del residuo
+
+    Returns:
+        ColorLUT tal que mostrar lut(c) en el panel reproduce c
+    """
+    targets = srgb_to_linear(np.asarray(targets, dtype=np.float64) / 255.0)
+    measured = srgb_to_linear(np.asarray(measured, dtype=np.float64) / 255.0)
+    if targets.shape != measured.shape or targets.ndim != 2 or len(targets) < 4:
+        raise ValueError("Se necesitan al menos 4 parches con objetivo y medida")
+
+    # Modelo afín del panel en RGB lineal: medido ~= [objetivo, 1] @ model
+    design = np.hstack([targets, np.ones((len(targets), 1))])
+    model = np.linalg.lstsq(design, measured, rcond=None)[0]
+    matrix, offset = model[:3], model[3]
+
+    def invert(colors):
+        return np.linalg.solve(matrix.T, (colors - offset).T).T
+
+    # Residuo del modelo en el espacio de entrada, por parche
+    residual = targets - invert(measured)
+
+    grid = np.linspace(0.0, 1.0, size)
+    r, g, b = np.meshgrid(grid, grid, grid, indexing="ij")
+    nodes = srgb_to_linear(np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1))
+    dist = np.sqrt(((nodes[:, None, :] - measured[None, :, :]) ** 2).sum(-1))
+    weights = 1.0 / np.maximum(dist, 1e-6) ** power
+    weights /= weights.sum(axis=1, keepdims=True)
+    corrected = invert(nodes) + weights @ residual
+
+    table = linear_to_srgb(corrected).reshape(size, size, size, 3)
+    return ColorLUT(table)
@@ -0,0 +1,290 @@
+"""
+Simulación vectorizada de deficiencias de visión del color (CVD) sobre láminas.
+
+Se aplican los modelos de Brettel et al. (1997), Viénot et al. (1999) y
+Machado et al. (2009, severidad 1.0) a imágenes completas como arrays NumPy,
+siempre en RGB lineal. Para cada lámina se separan los puntos de la figura y
+del fondo (agrupando la cromaticidad en visión normal) y se mide el contraste
+ΔE entre ambos grupos en visión normal y en cada simulación: una lámina de
+diagnóstico debe verse en visión normal y quedar oculta para al menos una
+deficiencia; una lámina de control (la 12) debe seguir viéndose con todas.
+Las láminas que no cumplen se informan como no válidas; los umbrales no se
+ajustan a ningún juego concreto.
+
+Las matrices de Brettel y Viénot son las precalculadas para sRGB lineal por
+libDaltonLens (conos de Smith & Pokorny).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from lib.PlateGenerator import number_segments, srgb_to_linear
+from lib.PlateStore import decode_for_size
+
+DEFICIENCIES = ("protan", "deutan", "tritan")
+MODELS = ("brettel", "vienot", "machado")
+
+# Lado al que se reduce cada lámina antes de analizarla
+ANALYSIS_SIZE = 256
+
+# Umbrales de ΔE (CIE76) entre la media de la figura y la del fondo, en
+# múltiplos de la diferencia apenas perceptible (JND ≈ 2.3). Los puntos
+# varían de luminancia entre sí mucho más que eso, así que por debajo de
+# ~2.5 JND la figura no se separa del fondo y por encima de ~5 JND se lee.
+JND_DELTA_E = 2.3
+HIDDEN_DELTA_E = 6.0
+VISIBLE_DELTA_E = 12.0
+
+MACHADO = {
+    "protan": np.array([
+        [0.152286, 1.052583, -0.204868],
+        [0.114503, 0.786281, 0.099216],
+        [-0.003882, -0.048116, 1.051998],
+    ]),
+    "deutan": np.array([
+        [0.367322, 0.860646, -0.227968],
+        [0.280085, 0.672501, 0.047413],
+        [-0.011820, 0.042940, 0.968881],
+    ]),
+    "tritan": np.array([
+        [1.255528, -0.076749, -0.178779],
+        [-0.078411, 0.930809, 0.147602],
+        [0.004733, 0.691367, 0.303900],
+    ]),
+}
+
+VIENOT = {
+    "protan": np.array([
+        [0.11238, 0.88762, 0.00000],
+        [0.11238, 0.88762, 0.00000],
+        [0.00401, -0.00401, 1.00000],
+    ]),
+    "deutan": np.array([
+        [0.29275, 0.70725, 0.00000],
+        [0.29275, 0.70725, 0.00000],
+        [-0.02234, 0.02234, 1.00000],
+    ]),
+    "tritan": np.array([
+        [1.00000, 0.14461, -0.14461],
+        [0.00000, 0.85924, 0.14076],
+        [0.00000, 0.85924, 0.14076],
+    ]),
+}
+
+# Brettel: dos semiplanos de proyección y la normal del plano que los separa
+BRETTEL = {
+    "protan": (
+        np.array([[0.14980, 1.19548, -0.34528], [0.10764, 0.84864, 0.04372], [0.00384, -0.00540, 1.00156]]),
+        np.array([[0.14570, 1.16172, -0.30742], [0.10816, 0.85291, 0.03892], [0.00386, -0.00524, 1.00139]]),
+        np.array([0.00048, 0.00393, -0.00441]),
+    ),
+    "deutan": (
+        np.array([[0.36477, 0.86381, -0.22858], [0.26294, 0.64245, 0.09462], [-0.02006, 0.02728, 0.99278]]),
+        np.array([[0.37298, 0.88166, -0.25464], [0.25954, 0.63506, 0.10540], [-0.01980, 0.02784, 0.99196]]),
+        np.array([-0.00281, -0.00611, 0.00892]),
+    ),
+    "tritan": (
+        np.array([[1.01277, 0.13548, -0.14826], [-0.01243, 0.86812, 0.14431], [0.07589, 0.80500, 0.11911]]),
+        np.array([[0.93678, 0.18979, -0.12657], [0.06154, 0.81526, 0.12320], [-0.37562, 1.12767, 0.24796]]),
+        np.array([0.03901, -0.02788, -0.01113]),
+    ),
+}
+
+# RGB lineal (sRGB, D65) -> XYZ
+RGB_TO_XYZ = np.array([
+    [0.4124, 0.3576, 0.1805],
+    [0.2126, 0.7152, 0.0722],
+    [0.0193, 0.1192, 0.9505],
+])
+WHITE_D65 = np.array([0.95047, 1.0, 1.08883])
+
+
+def simulate(linear_rgb, deficiency: str, model: str = "brettel"):
+    """
+    Simula una deficiencia sobre un array (..., 3) de RGB lineal en [0, 1].
+
+    Returns:
+        Array de la misma forma, recortado a [0, 1]
+    """
+    if model == "machado":
+        out = linear_rgb @ MACHADO[deficiency].T
+    elif model == "vienot":
+        out = linear_rgb @ VIENOT[deficiency].T
+    elif model == "brettel":
+        first, second, normal = BRETTEL[deficiency]
+        side = (linear_rgb @ normal)[..., None] >= 0
+        out = np.where(side, linear_rgb @ first.T, linear_rgb @ second.T)
+    else:
+        raise ValueError(f"Modelo desconocido: {model}")
+    return np.clip(out, 0.0, 1.0)
+
+
+def linear_to_lab(linear_rgb):
+    """RGB lineal a CIELAB (D65)"""
+    xyz = (linear_rgb @ RGB_TO_XYZ.T) / WHITE_D65
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+
+def split_figure(lab, iterations: int = 12):
+    """
+    Separa los píxeles de puntos en dos grupos por cromaticidad (a*, b*).
+
+    Args:
+        lab: Array (N, 3) de los píxeles de puntos en visión normal
+
+    Returns:
+        Máscara booleana (N,) de la figura (el grupo minoritario)
+    """
+    ab = lab[:, 1:]
+    centered = ab - ab.mean(axis=0)
+    # Semillas en los extremos del eje principal de cromaticidad
+    axis = np.linalg.svd(centered, full_matrices=False)[2][0]
+    projection = centered @ axis
+    centers = np.stack([ab[projection <= np.percentile(projection, 10)].mean(axis=0),
+                        ab[projection >= np.percentile(projection, 90)].mean(axis=0)])
+    for _ in range(iterations):
+        labels = ((ab[:, None, :] - centers[None]) ** 2).sum(-1).argmin(axis=1)
+        for k in range(2):
+            if np.any(labels == k):
+                centers[k] = ab[labels == k].mean(axis=0)
+    figure = labels == 1
+    return figure if figure.sum() <= len(figure) / 2 else ~figure
+
+
+def digit_region(number: int, size: int, margin: float = 0.5):
+    """Caja (x0, y0, x1, y1) donde debe estar el número, con margen relativo"""
+    segs, thickness = number_segments(number, size)
+    x0, y0 = segs[..., 0].min(), segs[..., 1].min()
+    x1, y1 = segs[..., 0].max(), segs[..., 1].max()
+    pad_x = (x1 - x0) * margin + thickness
+    pad_y = (y1 - y0) * margin + thickness
+    return x0 - pad_x, y0 - pad_y, x1 + pad_x, y1 + pad_y
+
+
+def plate_metrics(image, correct=None, generated: bool = False) -> dict:
+    """
+    Contraste figura/fondo de una lámina en visión normal y simulada.
+
+    El contraste se mide siempre sobre la máscara de la figura obtenida por
+    cromaticidad, sin suponer dónde está el número.
+
+    Args:
+        image: Array uint8 (alto, ancho, 3) en sRGB
+        correct: Respuesta correcta de la lámina
+        generated: La lámina sale de IshiharaPlateGenerator; solo entonces se
+            comprueba que la figura caiga en la zona de sus segmentos (las
+            láminas reales no comparten esa disposición)
+
+    Returns:
+        Dict con figure_fraction, digit_region_ok (None si no se comprueba),
+        normal (ΔE), simulated ({deficiencia: {modelo: ΔE}}), visible_normal,
+        hidden_for y visible_for
+    """
+    image = np.asarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+    # Píxeles de puntos: todo lo que no sea fondo blanco o casi gris claro
+    spread = image.max(axis=-1).astype(np.int16) - image.min(axis=-1)
+    dots = (spread > 20) | (image.max(axis=-1) < 200)
+    linear = srgb_to_linear(image[dots] / 255.0)
+    if len(linear) < 16:
+        raise ValueError("La lámina no tiene puntos de color")
+
+    figure = split_figure(linear_to_lab(linear))
+
+    def contrast(rgb):
+        lab = linear_to_lab(rgb)
+        return float(np.linalg.norm(lab[figure].mean(axis=0) - lab[~figure].mean(axis=0)))
+
+    digit_ok = None
+    if generated and isinstance(correct, int):
+        ys, xs = np.nonzero(dots)
+        cx = xs[figure].mean() * ANALYSIS_SIZE / width
+        cy = ys[figure].mean() * ANALYSIS_SIZE / height
+        x0, y0, x1, y1 = digit_region(correct, ANALYSIS_SIZE)
+        digit_ok = bool(x0 <= cx <= x1 and y0 <= cy <= y1)
+
+    normal = contrast(linear)
+    simulated = {
+        deficiency: {model: contrast(simulate(linear, deficiency, model)) for model in MODELS}
+        for deficiency in DEFICIENCIES
+    }
+    return {
+        "figure_fraction": float(figure.mean()),
+        "digit_region_ok": digit_ok,
+        "normal": normal,
+        "simulated": simulated,
+        "visible_normal": normal >= VISIBLE_DELTA_E,
+        # Una deficiencia oculta la lámina si ningún modelo conserva contraste
+        "hidden_for": [d for d in DEFICIENCIES if max(simulated[d].values()) < HIDDEN_DELTA_E],
+        # Deficiencias con las que todos los modelos siguen viendo la figura
+        "visible_for": [d for d in DEFICIENCIES if min(simulated[d].values()) >= VISIBLE_DELTA_E],
+    }
+
+
+def plate_ok(result: dict) -> bool:
+    """
+    True si la lámina cumple su papel: visible en visión normal y, según sea
+    de control o de diagnóstico, visible para todas las deficiencias u
+    oculta para al menos una.
+    """
+    if "error" in result or not result["visible_normal"] or result["digit_region_ok"] is False:
+        return False
+    if result.get("control"):
+        return len(result["visible_for"]) == len(DEFICIENCIES)
+    return bool(result["hidden_for"])
+
+
+def plate_task(plate: dict, size: int = ANALYSIS_SIZE) -> dict:
+    """
+    Tarea serializable para un dict de lámina del IshiharaImageLoader.
+
+    Las láminas con archivo se decodifican en el proceso trabajador; las de un
+    paquete (sin archivo propio) se envían ya decodificadas.
+    """
+    source = plate["path"]
+    if not os.path.exists(source):
+        source = np.asarray(plate["image"].get(size))
+    return {"name": plate["filename"], "correct": plate["correct_answer"], "source": source, "size": size,
+            "control": plate.get("control", False), "generated": plate.get("generated", False)}
+
+
+def analyze_plate(task: dict) -> dict:
+    """Analiza una tarea de plate_task (función de nivel de módulo para el pool)"""
+    result = {"name": task["name"], "correct": task["correct"], "control": task.get("control", False)}
+    try:
+        source = task["source"]
+        if isinstance(source, str):
+            source = np.asarray(decode_for_size(source, task["size"]))
+        result.update(plate_metrics(source, task["correct"], task.get("generated", False)))
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def analyze_library(tasks, workers: int = None):
+    """
+    Analiza un conjunto de láminas repartiéndolas en un pool de procesos.
+
+    Args:
+        tasks: Tareas de plate_task
+        workers: Número de procesos (None = núcleos disponibles, 1 = en serie)
+
+    Returns:
+        Lista de resultados en el mismo orden que tasks
+    """
+    tasks = list(tasks)
+    if workers == 1 or len(tasks) <= 1:
+        return [analyze_plate(task) for task in tasks]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(analyze_plate, tasks))
+    except Exception as e:
+        print(f"[CVD] Pool de procesos no disponible, analizando en serie: {e}")
+        return [analyze_plate(task) for task in tasks]
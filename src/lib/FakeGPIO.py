@@ -0,0 +1,337 @@
+"""
+RPi.GPIO emulado con reloj virtual, para probar el flujo del kiosco sin
+Raspberry Pi y sin esperas reales.
+
+- VirtualClock: reloj en segundos que solo avanza cuando se le pide
+  (``advance``/``sleep``), disparando en orden los temporizadores vencidos.
+  Se usa como ``clock=`` de HardwareWorker y UltrasonicSensor.
+- FakeGPIO: misma interfaz que el módulo RPi.GPIO (setmode, setup, output,
+  input, add_event_detect, PWM, cleanup) y registro de cada transición de
+  pin en ``transitions`` para poder comprobarlas.
+- HCSR04: sensor ultrasónico emulado: al bajar TRIG (tras un pulso de al
+  menos 10 µs) sube y baja ECHO según la distancia.
+- run_virtual: hace avanzar un HardwareWorker sin hilo, saltando el reloj de
+  paso en paso, así que una sesión completa (melodías, servo, LED) tarda
+  milisegundos.
+- RealtimeDriver: para la interfaz con ``--fake-gpio``: un hilo lleva el reloj
+  virtual al ritmo real y ejecuta en él las órdenes del HardwareWorker, así
+  que sensor, buzzer, LED y servo comparten una única línea de tiempo.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+SPEED_OF_SOUND_CM_S = 34300
+
+
+class VirtualClock:
+    """Reloj manual con temporizadores; clock() devuelve el instante actual"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self._timers = []
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def call_at(self, when: float, callback, *args):
+        with self._lock:
+            heapq.heappush(self._timers, (when, next(self._seq), callback, args))
+
+    def call_later(self, delay: float, callback, *args):
+        self.call_at(self.now + delay, callback, *args)
+
+    def advance_to(self, when: float):
+        """Avanza hasta `when` disparando los temporizadores vencidos en orden"""
+        with self._lock:
+            while self._timers and self._timers[0][0] <= when:
+                at, _, callback, args = heapq.heappop(self._timers)
+                self.now = max(self.now, at)
+                callback(*args)
+            self.now = max(self.now, when)
+
+    def advance(self, seconds: float):
+        self.advance_to(self.now + seconds)
+
+    # Sustituye a time.sleep
+    sleep = advance
+
+
+def run_virtual(worker, clock: VirtualClock, until: float = None):
+    """
+    Ejecuta un HardwareWorker sin hilo sobre un reloj virtual hasta que se
+    queda sin órdenes (o hasta `until`).
+
+    Returns:
+        Segundos virtuales transcurridos
+    """
+    start = clock()
+    while True:
+        deadline = worker.pump()
+        if deadline is None:
+            break
+        if until is not None and deadline > until:
+            clock.advance_to(until)
+            break
+        clock.advance_to(deadline)
+    return clock() - start
+
+
+class RealtimeDriver:
+    """Hilo que avanza un VirtualClock al ritmo real y bombea un HardwareWorker sin hilo"""
+
+    def __init__(self, clock: VirtualClock, worker=None, tick: float = 0.005, realtime=time.monotonic):
+        """
+        Args:
+            clock: Reloj virtual compartido con el GPIO emulado y el worker
+            worker: HardwareWorker creado con clock=clock y sin start()
+            tick: Segundos reales máximos entre pasos (latencia de una orden nueva)
+            realtime: Reloj real que se sigue
+        """
+        self.clock = clock
+        self.worker = worker
+        self.tick = tick
+        self.realtime = realtime
+        self._offset = clock() - realtime()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def step(self) -> float:
+        """
+        Avanza el reloj hasta el instante real (nunca hacia atrás; el sensor
+        emulado también lo empuja) y ejecuta los pasos vencidos.
+
+        Returns:
+            Segundos hasta el siguiente paso previsto, como mucho `tick`
+        """
+        self.clock.advance_to(self.realtime() + self._offset)
+        deadline = self.worker.pump() if self.worker is not None else None
+        if deadline is None:
+            return self.tick
+        return min(self.tick, max(0.0, deadline - self.clock()))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._stop.wait(self.step())
+
+
+class FakePWM:
+    """Objeto PWM de FakeGPIO; anota arranque, duty, frecuencia y parada"""
+
+    def __init__(self, gpio, pin: int, frequency: float):
+        if gpio._direction.get(pin) != gpio.OUT:
+            raise RuntimeError("You must setup() the GPIO channel as an output first")
+        self.gpio = gpio
+        self.pin = pin
+        self.frequency = frequency
+        self.duty = None
+        self.running = False
+
+    def start(self, duty: float):
+        self._check_duty(duty)
+        self.running = True
+        self.duty = duty
+        self.gpio._record(self.pin, "pwm_start", duty)
+
+    def ChangeDutyCycle(self, duty: float):
+        self._check_duty(duty)
+        self.duty = duty
+        self.gpio._record(self.pin, "duty", duty)
+
+    def ChangeFrequency(self, frequency: float):
+        if frequency <= 0:
+            raise ValueError("frequency must be greater than 0.0")
+        self.frequency = frequency
+        self.gpio._record(self.pin, "freq", frequency)
+
+    def stop(self):
+        self.running = False
+        self.gpio._record(self.pin, "pwm_stop", None)
+
+    @staticmethod
+    def _check_duty(duty):
+        if not 0.0 <= duty <= 100.0:
+            raise ValueError("dutycycle must have a value from 0.0 to 100.0")
+
+
+class HCSR04:
+    """HC-SR04 emulado sobre FakeGPIO"""
+
+    ECHO_DELAY = 0.0005     # Ráfaga de 8 pulsos antes de subir ECHO
+    LOST_ECHO = 0.038       # Sin eco, ECHO baja a los ~38 ms
+    MIN_TRIGGER = 0.00001   # Pulso mínimo de disparo (10 µs)
+
+    def __init__(self, gpio, trig_pin: int, echo_pin: int, distance=30.0):
+        """
+        Args:
+            distance: cm fijos, o función sin argumentos que devuelve cm
+                (None = eco perdido)
+        """
+        self.gpio = gpio
+        self.trig_pin = trig_pin
+        self.echo_pin = echo_pin
+        self.distance = distance
+        self.triggers = 0
+        self._rise = None
+
+    def on_trigger(self, level: int):
+        clock = self.gpio.clock
+        if level:
+            self._rise = clock()
+            return
+        if self._rise is None or clock() - self._rise < self.MIN_TRIGGER - 1e-9:
+            return
+        self._rise = None
+        self.triggers += 1
+        distance = self.distance() if callable(self.distance) else self.distance
+        width = self.LOST_ECHO if distance is None else distance * 2 / SPEED_OF_SOUND_CM_S
+        rise = clock() + self.ECHO_DELAY
+        clock.call_at(rise, self.gpio.set_input, self.echo_pin, 1)
+        clock.call_at(rise + width, self.gpio.set_input, self.echo_pin, 0)
+        if self.echo_pin in self.gpio._edge_callbacks:
+            # Quien mide solo espera los flancos: entregarlos ya
+            clock.advance_to(rise + width)
+
+
+class FakeGPIO:
+    """Sustituto del módulo RPi.GPIO (mismas constantes y funciones)"""
+
+    BOARD = 10
+    BCM = 11
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+
+    def __init__(self, clock: VirtualClock = None, history: int = None, input_cost: float = 0.000002):
+        """
+        Args:
+            clock: Reloj virtual compartido (se crea uno si no se da)
+            history: Máximo de transiciones guardadas (None = todas)
+            input_cost: Segundos virtuales que tarda cada input(), para que
+                los bucles de sondeo avancen
+        """
+        self.clock = clock or VirtualClock()
+        self.input_cost = input_cost
+        self.mode = None
+        self.transitions = deque(maxlen=history)    # (t, pin, tipo, valor)
+        self.devices = []
+        self._direction = {}
+        self._level = {}
+        self._edge_callbacks = {}   # pin -> (flanco, [callbacks])
+        self._trigger_hooks = {}
+
+    def _record(self, pin, kind, value):
+        self.transitions.append((self.clock(), pin, kind, value))
+
+    def history(self, pin: int, kind: str = "level"):
+        """[(t, valor)] de un pin y tipo de transición"""
+        return [(t, value) for t, p, k, value in self.transitions if p == pin and k == kind]
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def getmode(self):
+        return self.mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, channel, direction, pull_up_down=None, initial=None):
+        if self.mode is None:
+            raise RuntimeError("Please set pin numbering mode using GPIO.setmode(GPIO.BOARD) or GPIO.setmode(GPIO.BCM)")
+        for pin in (channel if isinstance(channel, (list, tuple)) else [channel]):
+            self._direction[pin] = direction
+            level = self.HIGH if pull_up_down == self.PUD_UP else self.LOW
+            if direction == self.OUT and initial is not None:
+                level = int(bool(initial))
+            self._level[pin] = level
+
+    def output(self, channel, value):
+        for pin in (channel if isinstance(channel, (list, tuple)) else [channel]):
+            if self._direction.get(pin) != self.OUT:
+                raise RuntimeError("The GPIO channel has not been set up as an OUTPUT")
+            self._set_level(pin, int(bool(value)))
+            hook = self._trigger_hooks.get(pin)
+            if hook:
+                hook(self._level[pin])
+
+    def input(self, channel) -> int:
+        if channel not in self._direction:
+            raise RuntimeError("You must setup() the GPIO channel first")
+        self.clock.advance(self.input_cost)
+        return self._level[channel]
+
+    def set_input(self, pin: int, value: int):
+        """Cambia el nivel de una entrada desde fuera (sensor, prueba)"""
+        previous = self._level.get(pin, self.LOW)
+        value = int(bool(value))
+        self._set_level(pin, value)
+        if value == previous or pin not in self._edge_callbacks:
+            return
+        edge, callbacks = self._edge_callbacks[pin]
+        if edge == self.BOTH or (edge == self.RISING) == bool(value):
+            for callback in list(callbacks):
+                callback(pin)
+
+    def _set_level(self, pin, value):
+        if self._level.get(pin) != value:
+            self._level[pin] = value
+            self._record(pin, "level", value)
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None):
+        if self._direction.get(channel) != self.IN:
+            raise RuntimeError("You must setup() the GPIO channel as an input first")
+        if channel in self._edge_callbacks:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        self._edge_callbacks[channel] = (edge, [callback] if callback else [])
+
+    def add_event_callback(self, channel, callback):
+        if channel not in self._edge_callbacks:
+            raise RuntimeError("Add event detection using add_event_detect first before adding a callback")
+        self._edge_callbacks[channel][1].append(callback)
+
+    def remove_event_detect(self, channel):
+        self._edge_callbacks.pop(channel, None)
+
+    def PWM(self, channel, frequency):
+        return FakePWM(self, channel, frequency)
+
+    def cleanup(self, channel=None):
+        pins = [channel] if channel is not None else list(self._direction)
+        for pin in pins:
+            self._direction.pop(pin, None)
+            self._level.pop(pin, None)
+            self._edge_callbacks.pop(pin, None)
+        if channel is None:
+            self.mode = None
+
+    def attach_hcsr04(self, trig_pin: int, echo_pin: int, distance=30.0) -> HCSR04:
+        """Conecta un HC-SR04 emulado a los pines dados"""
+        sensor = HCSR04(self, trig_pin, echo_pin, distance)
+        self._trigger_hooks[trig_pin] = sensor.on_trigger
+        self.devices.append(sensor)
+        return sensor
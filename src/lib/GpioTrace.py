@@ -0,0 +1,164 @@
+"""
+Traza de las llamadas a RPi.GPIO: cuántas, cuánto tardan y cada cuánto.
+
+GpioTracer.wrap(GPIO) devuelve un sustituto del módulo que mide cada
+llamada (output, input, setup, eventos) y la de los objetos PWM que crea
+(start, ChangeDutyCycle, ChangeFrequency, stop), así como los flancos que
+entrega la detección de eventos. Por pin y operación guarda:
+
+- count: número de llamadas
+- duration: ms dentro de la llamada
+- interval: ms desde la llamada anterior de la misma operación en el pin
+  (el jitter del PWM por software y de las rampas se ve aquí)
+
+Las muestras van a LatencyHistogram (cubetas fijas, memoria constante). Sin
+traza no se envuelve nada: el módulo GPIO se usa tal cual y el coste es cero.
+"""
+
+import json
+import os
+import threading
+import time
+
+from lib.LoopMonitor import DEFAULT_LATENCY_LOG, LatencyHistogram
+
+DEFAULT_TRACE_LOG = os.path.join(os.path.dirname(DEFAULT_LATENCY_LOG), "gpio_trace.json")
+
+
+class OpStats:
+    """Contadores e histogramas de una operación en un pin"""
+
+    __slots__ = ("count", "duration", "interval", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = LatencyHistogram()
+        self.interval = LatencyHistogram()
+        self.last = None
+
+    def summary(self) -> dict:
+        return {"count": self.count, "duration_ms": self.duration.summary(), "interval_ms": self.interval.summary()}
+
+
+class GpioTracer:
+    """Acumula la traza de un módulo GPIO envuelto con wrap()"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.stats = {}     # (pin, operación) -> OpStats
+        self._lock = threading.Lock()
+
+    def wrap(self, gpio):
+        return TracedGPIO(gpio, self)
+
+    def record(self, pin, op: str, start: float, end: float):
+        key = (pin, op)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = OpStats()
+            stats.count += 1
+            stats.duration.record((end - start) * 1000.0)
+            if stats.last is not None:
+                stats.interval.record((start - stats.last) * 1000.0)
+            stats.last = start
+
+    def call(self, pin, op: str, func, *args, **kwargs):
+        start = self.clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.record(pin, op, start, self.clock())
+
+    def report(self) -> dict:
+        """{pin: {operación: {count, duration_ms, interval_ms}}}"""
+        with self._lock:
+            items = sorted(self.stats.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+            report = {}
+            for (pin, op), stats in items:
+                report.setdefault("-" if pin is None else str(pin), {})[op] = stats.summary()
+            return report
+
+    def dump(self, path: str = None) -> str:
+        """Escribe el informe en JSON y devuelve la ruta"""
+        path = path or os.environ.get("DALTONISMO_GPIO_TRACE", DEFAULT_TRACE_LOG)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "pins": self.report()}, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+
+def _pin(channel):
+    return tuple(channel) if isinstance(channel, list) else channel
+
+
+class TracedPWM:
+    """Objeto PWM con cada llamada medida"""
+
+    def __init__(self, pwm, pin, tracer: GpioTracer):
+        self._pwm = pwm
+        self._pin = pin
+        self._tracer = tracer
+
+    def start(self, duty):
+        return self._tracer.call(self._pin, "pwm_start", self._pwm.start, duty)
+
+    def ChangeDutyCycle(self, duty):
+        return self._tracer.call(self._pin, "duty", self._pwm.ChangeDutyCycle, duty)
+
+    def ChangeFrequency(self, frequency):
+        return self._tracer.call(self._pin, "freq", self._pwm.ChangeFrequency, frequency)
+
+    def stop(self):
+        return self._tracer.call(self._pin, "pwm_stop", self._pwm.stop)
+
+    def __getattr__(self, name):
+        return getattr(self._pwm, name)
+
+
+class TracedGPIO:
+    """Sustituto del módulo GPIO; lo que no se mide pasa tal cual"""
+
+    def __init__(self, gpio, tracer: GpioTracer):
+        self._gpio = gpio
+        self._tracer = tracer
+
+    def __getattr__(self, name):
+        # Constantes (BCM, OUT, BOTH...) y funciones sin pin
+        return getattr(self._gpio, name)
+
+    def setup(self, channel, *args, **kwargs):
+        return self._tracer.call(_pin(channel), "setup", self._gpio.setup, channel, *args, **kwargs)
+
+    def output(self, channel, value):
+        return self._tracer.call(_pin(channel), "output", self._gpio.output, channel, value)
+
+    def input(self, channel):
+        return self._tracer.call(channel, "input", self._gpio.input, channel)
+
+    def PWM(self, channel, frequency):
+        pwm = self._tracer.call(channel, "pwm", self._gpio.PWM, channel, frequency)
+        return TracedPWM(pwm, channel, self._tracer)
+
+    def add_event_detect(self, channel, edge, callback=None, **kwargs):
+        if callback is not None:
+            callback = self._traced_callback(channel, callback)
+        return self._tracer.call(channel, "add_event_detect", self._gpio.add_event_detect,
+                                 channel, edge, callback=callback, **kwargs)
+
+    def add_event_callback(self, channel, callback):
+        return self._gpio.add_event_callback(channel, self._traced_callback(channel, callback))
+
+    def remove_event_detect(self, channel):
+        return self._tracer.call(channel, "remove_event_detect", self._gpio.remove_event_detect, channel)
+
+    def cleanup(self, *args):
+        return self._tracer.call(None, "cleanup", self._gpio.cleanup, *args)
+
+    def _traced_callback(self, channel, callback):
+        # "edge": intervalo entre flancos y tiempo dentro del callback
+        def traced(pin):
+            return self._tracer.call(channel, "edge", callback, pin)
+        return traced
@@ -0,0 +1,473 @@
+"""
+Hilo único de actuadores: buzzer, tira RGB y servo.
+
+Antes cada pip, melodía o parpadeo lanzaba su propio ``threading.Thread`` y
+varios hilos tocaban a la vez el mismo PWM (pips solapados al responder
+rápido). Ahora HardwareWorker es el único dueño de los PWM (PwmOutputs) y
+consume órdenes (Command): listas de pasos (acción, argumentos, espera) por
+canal. Los canales avanzan a la vez dentro del mismo hilo, cada uno con una
+orden activa:
+
+- una orden de prioridad igual o mayor que la activa la interrumpe (un pip
+  nuevo corta el anterior; la melodía de resultado corta cualquier pip);
+- una de prioridad menor espera su turno, salvo que caduque antes
+  (``max_delay``), para no sonar fuera de contexto;
+- ``cancel`` vacía un canal o todos.
+
+submit y cancel solo cambian el estado: dejar el canal en reposo y avisar
+``on_done(False)`` se encolan para el hilo de hardware, así que nunca tocan
+los PWM desde el hilo de la interfaz. Cada canal lleva una generación que
+cambia al interrumpir su orden; un paso ya sacado de la orden interrumpida
+que aún no se haya ejecutado se descarta, y el reposo se aplica después de
+él, así que el buzzer no puede quedarse sonando sin orden activa.
+
+Las esperas se cuentan desde el instante previsto de cada paso, no desde
+que terminó el anterior, así que las duraciones no acumulan retraso (un paso
+que sale tarde no retrasa los siguientes). El retraso de cada paso respecto a
+su instante previsto se acumula en ``lateness``.
+
+La tira RGB reproduce efectos de lib/LedEffects.py (led_effect): fotogramas
+a ritmo fijo, con un paso solo cuando el fotograma cambia. PwmOutputs aplica
+la corrección gamma y no reescribe los canales que no cambian.
+
+El servo se mueve con perfiles (servo_profile): rampas suavizadas desde el
+ángulo real en que esté al empezar la orden, esperas en cada posición y un
+aviso ``on_done(completada)`` al terminar o al ser interrumpida.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+from lib import LedEffects
+from lib.LoopMonitor import LatencyHistogram
+from lib.Melody import DEFAULT_GAP, compile_schedule, parse
+
+PRIORITY_IDLE = 0       # Tono de inicio
+PRIORITY_FEEDBACK = 1   # Pips de respuesta, parpadeos
+PRIORITY_RESULT = 2     # Melodía, color y servo del resultado
+
+CHANNELS = ("buzzer", "led", "servo")
+
+# Acción que deja cada canal en reposo si se interrumpe su orden
+CHANNEL_RESET = {"buzzer": ("silence", ())}
+
+SERVO_SPEED = 180.0     # Grados por segundo en las rampas (MG996R sin carga: ~350)
+SERVO_STEP = 0.02       # Segundos entre posiciones intermedias (un periodo de 50 Hz)
+SERVO_SETTLE = 0.3      # Espera con señal al llegar, para que asiente
+
+
+class Command:
+    """Orden para un canal: pasos (acción, args, espera en s)"""
+
+    __slots__ = ("channel", "priority", "steps", "name", "max_delay", "on_done", "submitted")
+
+    def __init__(self, channel: str, steps, priority: int = PRIORITY_FEEDBACK, name: str = "",
+                 max_delay: float = None, on_done=None):
+        """
+        Args:
+            channel: "buzzer", "led" o "servo"
+            steps: [(acción, args, espera)]; acción es el nombre de un método
+                de PwmOutputs o una función. También puede ser una función
+                steps(outputs) que los planifica al empezar la orden; si
+                devuelve un generador, los pasos se piden según vencen (efectos
+                sin fin)
+            priority: Mayor valor, mayor prioridad
+            name: Descripción para los logs
+            max_delay: Segundos que puede esperar en cola (None = sin límite)
+            on_done: on_done(completada) al terminar (True) o al ser
+                interrumpida, cancelada o caducada (False); corre en el hilo
+                de hardware
+        """
+        if channel not in CHANNELS:
+            raise ValueError(f"Canal desconocido: {channel}")
+        self.channel = channel
+        self.priority = priority
+        self.steps = steps if callable(steps) else list(steps)
+        self.name = name or channel
+        self.max_delay = max_delay
+        self.on_done = on_done
+        self.submitted = None
+
+
+def tone(frequency: float, duration: float, priority: int = PRIORITY_FEEDBACK, on_start=None, max_delay: float = 0.2):
+    """Tono único; on_start() se llama justo al empezar a sonar"""
+    return melody([(frequency, duration)], 0, priority, f"tono {frequency}Hz", on_start, max_delay)
+
+
+def melody(notes, gap: float = DEFAULT_GAP, priority: int = PRIORITY_RESULT, name: str = "melodía",
+           on_start=None, max_delay: float = None):
+    """
+    Melodía compilada a eventos con instante absoluto (lib/Melody.py).
+
+    Args:
+        notes: Texto en el formato de lib/Melody.py o [(frecuencia, duración en s)]
+        gap: Silencio entre notas en segundos
+        on_start: on_start() justo al sonar la primera nota
+    """
+    if isinstance(notes, str):
+        notes = parse(notes, gap)
+    else:
+        spaced = []
+        for frequency, duration in notes:
+            if spaced and gap:
+                spaced.append((None, gap))
+            spaced.append((frequency, duration))
+        notes = spaced
+    events, _ = compile_schedule(notes)
+    steps = []
+    for i, (t, frequency) in enumerate(events):
+        hold = events[i + 1][0] - t if i + 1 < len(events) else 0.0
+        steps.append(("tone", (frequency,), hold) if frequency else ("silence", (), hold))
+    if on_start and steps:
+        action, args, hold = steps[0]
+        steps[0:1] = [(action, args, 0.0), (on_start, (), hold)]
+    return Command("buzzer", steps, priority, name, max_delay)
+
+
+def led_color(red, green, blue, priority: int = PRIORITY_FEEDBACK):
+    return Command("led", [("led", (red, green, blue), 0.0)], priority, f"color {red}/{green}/{blue}")
+
+
+def effect_steps(frames, tick: float = LedEffects.TICK, max_hold: float = 1.0):
+    """
+    Fotogramas a ritmo fijo -> pasos ("led_frame", color, espera), uno por
+    cambio. Una meseta se reemite cada `max_hold` s como mucho, para no leer
+    por adelantado un efecto sin fin que deje de cambiar.
+    """
+    last, hold = None, 0.0
+    for frame in frames:
+        if frame != last or hold >= max_hold:
+            if last is not None:
+                yield ("led_frame", last, round(hold, 6))
+            last, hold = frame, 0.0
+        hold += tick
+    if last is not None:
+        yield ("led_frame", last, 0.0)
+
+
+def led_effect(frames, priority: int = PRIORITY_FEEDBACK, name: str = "efecto LED", on_done=None):
+    """
+    Efecto de lib/LedEffects.py; `frames` puede no tener fin (modo atracción)
+    y solo se recorre a medida que avanza la orden.
+    """
+    return Command("led", lambda outputs: effect_steps(frames), priority, name, on_done=on_done)
+
+
+def led_blink(color, times: int = 3, period: float = 0.4, priority: int = PRIORITY_FEEDBACK):
+    """Parpadeo: apagado y `color` alternos, terminando en `color`"""
+    return led_effect(LedEffects.blink(color, times, period), priority, f"parpadeo x{times}")
+
+
+def servo_ramp(start: float, target: float, speed: float = SERVO_SPEED):
+    """Pasos de start a target con aceleración y frenada suaves (smoothstep)"""
+    duration = abs(target - start) / speed
+    count = max(1, int(round(duration / SERVO_STEP)))
+    steps = []
+    for i in range(1, count + 1):
+        x = i / count
+        angle = start + (target - start) * x * x * (3 - 2 * x)
+        steps.append(("servo", (round(angle, 1),), duration / count))
+    # Al llegar, mantener la señal un momento para que asiente
+    steps[-1] = ("servo", (target,), steps[-1][2] + SERVO_SETTLE)
+    return steps
+
+
+def servo_profile(positions, priority: int = PRIORITY_RESULT, name: str = "servo", speed: float = SERVO_SPEED,
+                  start_delay: float = 0.0, on_done=None):
+    """
+    Perfil de movimiento: rampa a cada (ángulo, espera en s), sin señal durante
+    las esperas. Se planifica al empezar, desde el ángulo actual del servo, así
+    que una secuencia interrumpida a medio camino continúa sin saltos.
+    """
+    def plan(outputs):
+        steps = [("servo_release", (), start_delay)] if start_delay else []
+        angle = outputs.servo_angle
+        for target, hold in positions:
+            steps.extend(servo_ramp(angle, target, speed))
+            steps.append(("servo_release", (), hold))
+            angle = target
+        return steps
+    return Command("servo", plan, priority, name, on_done=on_done)
+
+
+class PwmOutputs:
+    """Canales PWM físicos; con PWM None se simulan con un log"""
+
+    def __init__(self, buzzer_pwm=None, rgb_pwms=(None, None, None), servo_pwm=None):
+        self.buzzer_pwm = buzzer_pwm
+        self.rgb_pwms = tuple(rgb_pwms)
+        self.servo_pwm = servo_pwm
+        self.servo_angle = 90
+        self.led_writes = 0
+        self._led_duties = [None, None, None]
+
+    def tone(self, frequency):
+        if self.buzzer_pwm is None:
+            print(f"[BUZZER-SIM] Simulando tono {frequency}Hz")
+            return
+        self.buzzer_pwm.ChangeFrequency(frequency)
+        self.buzzer_pwm.ChangeDutyCycle(50)  # 50% duty cycle
+
+    def silence(self):
+        if self.buzzer_pwm is not None:
+            self.buzzer_pwm.ChangeDutyCycle(0)
+
+    def led(self, red, green, blue):
+        """Color fijo, brillo percibido 0-100 por canal"""
+        if not all(self.rgb_pwms):
+            print(f"[RGB-SIM] Simulando color RGB: R={red}% G={green}% B={blue}%")
+            return
+        self.led_frame(red, green, blue)
+
+    def led_frame(self, red, green, blue):
+        """
+        Fotograma de un efecto (sin log). Corrección gamma por tabla y solo
+        se escriben los canales cuyo duty cambia; tira de ánodo común (lógica
+        invertida).
+        """
+        for i, (pwm, level) in enumerate(zip(self.rgb_pwms, (red, green, blue))):
+            duty = 100 - LedEffects.GAMMA_LUT[min(100, max(0, int(round(level))))]
+            if pwm is None or duty == self._led_duties[i]:
+                continue
+            pwm.ChangeDutyCycle(duty)
+            self._led_duties[i] = duty
+            self.led_writes += 1
+
+    def servo(self, angle):
+        """0° = 2.5% de duty, 90° = 7.5%, 180° = 12.5%"""
+        self.servo_angle = angle
+        if self.servo_pwm is None:
+            print(f"[SERVO-SIM] Simulando movimiento a {angle}°")
+            return
+        self.servo_pwm.ChangeDutyCycle(2.5 + (angle / 180.0) * 10.0)
+
+    def servo_release(self):
+        """Sin señal el servo no vibra ni consume al mantener la posición"""
+        if self.servo_pwm is not None:
+            self.servo_pwm.ChangeDutyCycle(0)
+
+
+class HardwareWorker:
+    """Único hilo que maneja los actuadores"""
+
+    def __init__(self, outputs: PwmOutputs, clock=time.monotonic, on_submit=None):
+        """
+        Args:
+            outputs: Salidas PWM
+            clock: Reloj monótono en segundos
+            on_submit: on_submit(orden) por cada orden recibida (grabación de sesiones)
+        """
+        self.outputs = outputs
+        self.clock = clock
+        self.on_submit = on_submit
+        self.executed = 0
+        self.preempted = 0
+        self.expired = 0
+        self.errors = 0
+        self.lateness = LatencyHistogram()  # ms de retraso de cada paso sobre su instante previsto
+        self._active = {}       # canal -> [orden, iterador de pasos, instante previsto]
+        self._pending = {channel: [] for channel in CHANNELS}
+        self._generation = dict.fromkeys(CHANNELS, 0)
+        self._deferred = []     # (canal, generación, acción, args) de reposos y avisos para el hilo
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(target=self._worker, daemon=True)
+                self._thread.start()
+        return self
+
+    def submit(self, command: Command):
+        """Encola una orden (no bloquea)"""
+        if self.on_submit:
+            self.on_submit(command)
+        with self._cond:
+            now = self.clock()
+            command.submitted = now
+            active = self._active.get(command.channel)
+            if active is None:
+                self._activate(command, now)
+            elif command.priority >= active[0].priority:
+                self.preempted += 1
+                self._interrupt(command.channel, active[0])
+                self._activate(command, now)
+            else:
+                heapq.heappush(self._pending[command.channel], (-command.priority, next(self._seq), command))
+            self._cond.notify()
+
+    def cancel(self, channel: str = None):
+        """Interrumpe la orden activa y vacía la cola de un canal (o de todos)"""
+        with self._cond:
+            for name in ([channel] if channel else CHANNELS):
+                for _, _, command in self._pending[name]:
+                    self._finish(command, False)
+                self._pending[name].clear()
+                active = self._active.pop(name, None)
+                if active is not None:
+                    self._interrupt(name, active[0])
+            self._cond.notify()
+
+    def idle(self) -> bool:
+        """True sin órdenes activas, en cola ni reposos/avisos por ejecutar"""
+        with self._cond:
+            return not self._active and not any(self._pending.values()) and not self._deferred
+
+    def busy(self, channel: str) -> bool:
+        """True si el canal tiene una orden activa o en cola"""
+        with self._cond:
+            return channel in self._active or bool(self._pending[channel])
+
+    def stop(self, timeout: float = 1.0):
+        """Cancela todo, deja los canales en reposo y termina el hilo"""
+        self.cancel()
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            # El hilo aplica los reposos pendientes antes de salir
+            self._thread.join(timeout)
+            self._thread = None
+        else:
+            with self._cond:
+                deferred, self._deferred = self._deferred, []
+            self._execute(deferred)
+
+    def stats(self) -> dict:
+        return {"executed": self.executed, "preempted": self.preempted,
+                "expired": self.expired, "errors": self.errors,
+                "late_p95_ms": round(self.lateness.percentile(95), 3),
+                "led_writes": getattr(self.outputs, "led_writes", 0)}
+
+    def pump(self):
+        """
+        Ejecuta en el hilo que llama los pasos vencidos, sin hilo propio (reloj
+        virtual, ver lib/FakeGPIO.run_virtual).
+
+        Returns:
+            Próximo instante previsto, o None si no quedan órdenes
+        """
+        with self._cond:
+            due = self._due_steps(self.clock())
+        self._execute(due)
+        with self._cond:
+            if self._deferred:
+                return self.clock()
+            deadlines = [active[2] for active in self._active.values()]
+            return min(deadlines) if deadlines else None
+
+    def _activate(self, command, now):
+        steps = command.steps
+        if callable(steps):
+            try:
+                steps = steps(self.outputs)
+            except Exception as e:
+                self.errors += 1
+                print(f"[HARDWARE] Error planificando {command.name}: {e}")
+                steps = []
+        self._active[command.channel] = [command, iter(steps), now]
+
+    def _next_step(self, command, steps):
+        try:
+            return next(steps, None)
+        except Exception as e:
+            self.errors += 1
+            print(f"[HARDWARE] Error planificando {command.name}: {e}")
+            return None
+
+    def _finish(self, command, completed):
+        """Encola on_done para el hilo de hardware (con el cerrojo tomado)"""
+        if command.on_done:
+            self._deferred.append((None, 0, command.on_done, (completed,)))
+
+    def _interrupt(self, channel, command):
+        """
+        Corta la orden activa de un canal (con el cerrojo tomado): invalida
+        sus pasos ya sacados y encola el reposo del canal y su on_done(False).
+        """
+        self._generation[channel] += 1
+        reset = CHANNEL_RESET.get(channel)
+        if reset:
+            self._deferred.append((None, 0) + reset)
+        self._finish(command, False)
+
+    def _next_pending(self, channel, now):
+        queue = self._pending[channel]
+        while queue:
+            _, _, command = heapq.heappop(queue)
+            if command.max_delay is not None and now - command.submitted > command.max_delay:
+                self.expired += 1
+                self._finish(command, False)
+                continue
+            self._activate(command, now)
+            return
+
+    def _due_steps(self, now):
+        """Reposos y avisos encolados y pasos vencidos de todos los canales (con el cerrojo tomado)"""
+        due, self._deferred = self._deferred, []
+        for channel in CHANNELS:
+            while True:
+                active = self._active.get(channel)
+                if active is None or active[2] > now:
+                    break
+                command, steps, when = active
+                step = self._next_step(command, steps)
+                if step is None:
+                    # Terminó la espera del último paso: siguiente orden en cola
+                    del self._active[channel]
+                    if command.on_done:
+                        due.append((None, 0, command.on_done, (True,)))
+                    self._next_pending(channel, now)
+                    # Avisos de órdenes caducadas en la cola
+                    due.extend(self._deferred)
+                    self._deferred = []
+                    continue
+                action, args, hold = step
+                due.append((channel, self._generation[channel], action, args))
+                self.lateness.record((now - when) * 1000.0)
+                active[2] = when + hold
+        return due
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                running = self._running
+                if running:
+                    now = self.clock()
+                    due = self._due_steps(now)
+                    if not due:
+                        deadlines = [active[2] for active in self._active.values()]
+                        timeout = max(0.0, min(deadlines) - now) if deadlines else None
+                        self._cond.wait(timeout)
+                        continue
+                else:
+                    # Al parar solo quedan los reposos y avisos de cancel()
+                    due, self._deferred = self._deferred, []
+            self._execute(due)
+            if not running:
+                return
+
+    def _execute(self, due):
+        for channel, generation, action, args in due:
+            if channel is not None:
+                with self._cond:
+                    # Paso de una orden interrumpida después de sacarlo: se descarta
+                    if generation != self._generation[channel]:
+                        continue
+            if isinstance(action, str):
+                action = getattr(self.outputs, action)
+            self._run(action, args)
+
+    def _run(self, action, args):
+        try:
+            action(*args)
+            self.executed += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"[HARDWARE] Error en {getattr(action, '__name__', action)}: {e}")
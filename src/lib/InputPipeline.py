@@ -0,0 +1,161 @@
+"""
+Entrada táctil de las rondas del test: antirrebote, bloqueo y latencias.
+
+Cada pulsación se sella con el instante del evento Tk (``press`` en
+``<ButtonPress-1>``), no con el de su manejador: si el bucle de eventos va
+atrasado, ese retraso cuenta en las latencias y no mueve la ventana de
+antirrebote. Solo se acepta una
+respuesta por ronda: la ronda se abre cuando la interfaz la muestra
+(``open_round``) y queda bloqueada en cuanto se acepta una pulsación, así que
+los toques repetidos durante la transición a la ronda siguiente (600 ms en
+colores, 1500 ms en Ishihara) se descartan en lugar de puntuar dos veces.
+Además, cualquier pulsación a menos de ``debounce_ms`` de la última aceptada
+se descarta como rebote, aunque ya haya empezado otra ronda.
+
+Por cada pulsación aceptada se miden dos latencias:
+
+- tap_visual: hasta que Tk redibuja la respuesta (doble ``after_idle``)
+- tap_buzzer: hasta que el buzzer empieza a sonar (desde su hilo)
+
+Se guardan en LatencyHistogram por pantalla; si se pasa ``histogram`` (p. ej.
+``EventLoopMonitor.histogram``) van al mismo volcado JSON que el resto de
+latencias de la interfaz.
+"""
+
+import threading
+import time
+
+from lib.LoopMonitor import LatencyHistogram
+
+DEFAULT_DEBOUNCE_MS = 250
+
+
+class Tap:
+    """Pulsación aceptada: instante de llegada, pantalla y ronda"""
+
+    __slots__ = ("t", "screen", "round")
+
+    def __init__(self, t, screen, round_key):
+        self.t = t
+        self.screen = screen
+        self.round = round_key
+
+
+class InputPipeline:
+    """Filtra las pulsaciones de las rondas y mide su latencia de respuesta"""
+
+    def __init__(self, root=None, debounce_ms: int = DEFAULT_DEBOUNCE_MS, clock=time.perf_counter, histogram=None):
+        """
+        Args:
+            root: Ventana Tk (para medir el redibujado); None en pruebas sin Tk
+            debounce_ms: Separación mínima entre dos pulsaciones aceptadas
+            clock: Reloj monótono en segundos
+            histogram: histogram(pantalla, métrica) -> LatencyHistogram; por
+                defecto histogramas propios
+        """
+        self.root = root
+        self.debounce = debounce_ms / 1000.0
+        self.clock = clock
+        self.histograms = {}
+        self.histogram = histogram or self._own_histogram
+        self.accepted = 0
+        self.locked = 0     # Descartadas: ronda ya respondida o no abierta
+        self.bounced = 0    # Descartadas: demasiado cerca de la anterior
+        self._round = None
+        self._last_accept = None
+        self._pressed = None
+        self._event_ms = None
+        self._event_offset = None
+        self._lock = threading.Lock()
+
+    def _own_histogram(self, screen, metric):
+        key = (screen, metric)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        return histogram
+
+    def open_round(self, round_key):
+        """La ronda `round_key` ya está en pantalla y admite una respuesta"""
+        self._round = round_key
+
+    def close(self):
+        """Ninguna ronda admite respuestas (espera, resultados)"""
+        self._round = None
+
+    def event_time(self, event=None) -> float:
+        """
+        Instante de un evento Tk en el reloj de la tubería.
+
+        event.time es el reloj del servidor X en ms, con otro origen. La menor
+        diferencia observada entre clock() y event.time es la de un evento
+        atendido sin espera, así que se usa como desfase entre ambos relojes.
+        Sin event.time válido se devuelve clock().
+        """
+        now = self.clock()
+        ms = getattr(event, "time", None)
+        if not isinstance(ms, int) or ms <= 0:
+            return now
+        if self._event_ms is not None and ms < self._event_ms:
+            self._event_offset = None  # El reloj del servidor dio la vuelta
+        self._event_ms = ms
+        offset = now - ms / 1000.0
+        if self._event_offset is None or offset < self._event_offset:
+            self._event_offset = offset
+        return ms / 1000.0 + self._event_offset
+
+    def press(self, event=None):
+        """Manejador de <ButtonPress-1>: sella la pulsación en el instante del evento"""
+        self._pressed = self.event_time(event)
+
+    def take_press(self):
+        """Instante de la última pulsación sellada (None si no hay) y la consume"""
+        pressed, self._pressed = self._pressed, None
+        return pressed
+
+    def accept(self, screen: str, round_key, t: float = None):
+        """
+        Registra una pulsación.
+
+        Args:
+            screen: Pantalla de la ronda
+            round_key: Ronda a la que responde la pulsación
+            t: Instante del evento (take_press); None = ahora
+
+        Returns:
+            Tap si debe procesarse, o None si se descarta
+        """
+        now = self.clock() if t is None else t
+        if self._last_accept is not None and now - self._last_accept < self.debounce:
+            self.bounced += 1
+            return None
+        if round_key is None or round_key != self._round:
+            self.locked += 1
+            return None
+        self._round = None  # Bloqueada hasta que se abra la siguiente
+        self._last_accept = now
+        self.accepted += 1
+        return Tap(now, screen, round_key)
+
+    def visual_done(self, tap):
+        """Llamar tras aplicar el cambio visual; mide cuando Tk lo haya redibujado"""
+        if tap is None:
+            return
+        if self.root is None:
+            self._record(tap, "tap_visual")
+            return
+        # Doble after_idle: el segundo corre tras los redibujados pendientes
+        self.root.after_idle(lambda: self.root.after_idle(lambda: self._record(tap, "tap_visual")))
+
+    def buzzer_started(self, tap):
+        """Llamar desde el hilo del buzzer justo al empezar a sonar"""
+        if tap is not None:
+            self._record(tap, "tap_buzzer")
+
+    def _record(self, tap, metric):
+        ms = (self.clock() - tap.t) * 1000.0
+        with self._lock:
+            self.histogram(tap.screen, metric).record(ms)
+
+    def stats(self) -> dict:
+        return {"accepted": self.accepted, "locked": self.locked, "bounced": self.bounced}
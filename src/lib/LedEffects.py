@@ -0,0 +1,81 @@
+"""
+Efectos de la tira RGB: sólido, parpadeo, respiración, fundido y pulso.
+
+Cada efecto es un generador de fotogramas (r, g, b) con brillo percibido
+0-100 a ritmo fijo (TICK). El hilo de hardware los reproduce con
+``Hardware.led_effect``, que solo emite un paso cuando el fotograma cambia,
+y PwmOutputs convierte el brillo en duty con GAMMA_LUT (precalculada) y no
+reescribe los canales que no cambian. Un efecto de reposo largo (modo
+atracción) cuesta unas pocas escrituras PWM por segundo.
+"""
+
+import math
+
+TICK = 0.02             # 50 fotogramas por segundo
+GAMMA = 2.2
+
+# Brillo percibido (0-100) -> duty cycle (0-100)
+GAMMA_LUT = tuple(round(100 * (level / 100) ** GAMMA, 2) for level in range(101))
+
+# Un periodo de respiración (0 -> 1 -> 0), muestreado una vez por efecto
+_BREATH_SAMPLES = 256
+BREATH_LUT = tuple((1 - math.cos(2 * math.pi * i / _BREATH_SAMPLES)) / 2 for i in range(_BREATH_SAMPLES))
+
+OFF = (0, 0, 0)
+
+
+def quantize(color):
+    """Fotograma a enteros 0-100 (la resolución de GAMMA_LUT)"""
+    return tuple(min(100, max(0, int(round(c)))) for c in color)
+
+
+def _scale(color, factor):
+    return quantize(c * factor for c in color)
+
+
+def _ticks(seconds):
+    return max(1, int(round(seconds / TICK)))
+
+
+def solid(color):
+    yield quantize(color)
+
+
+def blink(color, times: int = 3, period: float = 0.4):
+    """Apagado y `color` alternos, terminando en `color`"""
+    half = _ticks(period / 2)
+    color = quantize(color)
+    for _ in range(times):
+        for _ in range(half):
+            yield OFF
+        for _ in range(half):
+            yield color
+
+
+def breathe(color, period: float = 4.0, floor: float = 0.1, cycles: int = None):
+    """
+    Respiración suave entre `floor` y el brillo completo.
+
+    Args:
+        cycles: Número de respiraciones (None = infinitas, modo atracción)
+    """
+    count = _ticks(period)
+    frames = [_scale(color, floor + (1 - floor) * BREATH_LUT[i * _BREATH_SAMPLES // count]) for i in range(count)]
+    done = 0
+    while cycles is None or done < cycles:
+        yield from frames
+        done += 1
+
+
+def fade(start, end, duration: float = 0.5):
+    """Fundido lineal (en brillo percibido) de `start` a `end`"""
+    count = _ticks(duration)
+    for i in range(1, count + 1):
+        x = i / count
+        yield quantize(a + (b - a) * x for a, b in zip(start, end))
+
+
+def result_pulse(color, pulses: int = 3, period: float = 0.6):
+    """Pulsos rápidos del color del resultado y luego fijo"""
+    yield from breathe(color, period, floor=0.0, cycles=pulses)
+    yield quantize(color)
@@ -0,0 +1,167 @@
+"""
+Instrumentación de latencia del bucle de eventos de Tk.
+
+EventLoopMonitor envuelve ``root.after`` de la ventana principal y mide, por
+pantalla (waiting, colors, ishihara, results):
+
+- lag: retraso entre la hora programada de un ``after`` y su ejecución real
+- callback: duración de cada callback programado con ``after``
+- tap_idle: tiempo desde que se suelta un botón hasta que Tk vuelve a quedar
+  ocioso (comando ejecutado y pantalla redibujada)
+
+Un latido periódico mide el lag aunque la aplicación no tenga nada
+programado. Las muestras van a histogramas de cubetas logarítmicas fijas:
+registrar una muestra es O(1) y la memoria no crece, así que puede quedar
+activo en producción. Al cerrar se vuelcan p50/p95/p99 a un archivo JSON.
+"""
+
+import json
+import math
+import os
+import time
+
+DEFAULT_LATENCY_LOG = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "daltonismo",
+    "loop_latency.json",
+)
+
+HEARTBEAT_MS = 250
+
+
+class LatencyHistogram:
+    """Histograma de latencias en ms con cubetas logarítmicas (0.01 ms a ~100 s)"""
+
+    MIN_MS = 0.01
+    BUCKETS_PER_DECADE = 20
+    DECADES = 7
+
+    def __init__(self):
+        self.counts = [0] * (self.BUCKETS_PER_DECADE * self.DECADES + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms: float):
+        if ms <= self.MIN_MS:
+            index = 0
+        else:
+            index = int(math.log10(ms / self.MIN_MS) * self.BUCKETS_PER_DECADE) + 1
+            index = min(index, len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p: float) -> float:
+        """Límite superior de la cubeta que contiene el percentil p (0-100)"""
+        if not self.count:
+            return 0.0
+        target = math.ceil(self.count * p / 100)
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                upper = self.MIN_MS * 10 ** (index / self.BUCKETS_PER_DECADE)
+                return min(upper, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "p99": round(self.percentile(99), 3),
+            "max": round(self.max, 3),
+        }
+
+
+class EventLoopMonitor:
+    """Mide la latencia del bucle de Tk por pantalla"""
+
+    METRICS = ("lag", "callback", "tap_idle")
+
+    def __init__(self, root, screen, heartbeat_ms: int = HEARTBEAT_MS, clock=time.perf_counter):
+        """
+        Args:
+            root: Ventana tk.Tk a instrumentar
+            screen: Función sin argumentos que devuelve la pantalla actual
+            heartbeat_ms: Periodo del latido (0 = sin latido)
+            clock: Reloj en segundos
+        """
+        self.root = root
+        self.screen = screen
+        self.heartbeat_ms = heartbeat_ms
+        self.clock = clock
+        self.histograms = {}
+        self._original_after = None
+
+    def histogram(self, screen: str, metric: str) -> LatencyHistogram:
+        key = (screen, metric)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        return histogram
+
+    def install(self):
+        """Envuelve root.after y engancha la suelta de los tk.Button"""
+        if self._original_after is not None:
+            return
+        self._original_after = self.root.after
+        self.root.after = self.after
+
+        # El script propio va antes del de la clase Button, que ejecuta el comando
+        command = self.root.register(self._on_button_release)
+        existing = self.root.bind_class("Button", "<ButtonRelease-1>")
+        self.root.bind_class("Button", "<ButtonRelease-1>", f"{command}\n{existing}")
+
+        if self.heartbeat_ms:
+            self.after(self.heartbeat_ms, self._heartbeat)
+
+    def after(self, ms, func=None, *args):
+        """Sustituto de root.after que mide lag y duración del callback"""
+        if func is None:
+            return self._original_after(ms)
+        due = self.clock() + int(ms) / 1000.0
+
+        def timed(*call_args):
+            start = self.clock()
+            screen = self.screen()
+            try:
+                return func(*call_args)
+            finally:
+                end = self.clock()
+                self.histogram(screen, "lag").record(max(0.0, start - due) * 1000.0)
+                self.histogram(screen, "callback").record((end - start) * 1000.0)
+
+        return self._original_after(ms, timed, *args)
+
+    def _heartbeat(self):
+        self.after(self.heartbeat_ms, self._heartbeat)
+
+    def _on_button_release(self):
+        start = self.clock()
+        screen = self.screen()
+        # Doble after_idle: el segundo corre tras los redibujados que encole el comando
+        self.root.after_idle(lambda: self.root.after_idle(lambda: self._record_tap(screen, start)))
+
+    def _record_tap(self, screen, start):
+        self.histogram(screen, "tap_idle").record((self.clock() - start) * 1000.0)
+
+    def report(self) -> dict:
+        """{pantalla: {métrica: {count, mean, p50, p95, p99, max}}} en ms"""
+        report = {}
+        for (screen, metric), histogram in sorted(self.histograms.items()):
+            report.setdefault(screen, {})[metric] = histogram.summary()
+        return report
+
+    def dump(self, path: str = None) -> str:
+        """Escribe el informe en JSON y devuelve la ruta"""
+        path = path or os.environ.get("DALTONISMO_LATENCY_LOG", DEFAULT_LATENCY_LOG)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "screens": self.report()}, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,87 @@
+"""
+Melodías del buzzer como datos.
+
+Formato de texto: notas separadas por espacios, cada una ``NOTA/ms``:
+
+- NOTA es un nombre con octava (``C5``, ``F#4``, ``Bb3``), una frecuencia
+  en Hz (``1200``) o ``R`` para un silencio
+- ms es la duración en milisegundos
+
+Entre notas consecutivas se inserta un silencio de ``gap`` segundos (50 ms
+por defecto, como las melodías originales), salvo que la nota ya sea un
+silencio. ``compile_schedule`` convierte la melodía en eventos con instante
+absoluto desde el inicio, que el hilo de hardware reproduce contra un reloj
+monótono: el retraso de una nota no se arrastra a las siguientes.
+"""
+
+import re
+
+DEFAULT_GAP = 0.05
+
+NOTE_OFFSETS = {"C": -9, "D": -7, "E": -5, "F": -4, "G": -2, "A": 0, "B": 2}
+A4_HZ = 440.0
+
+# Melodías del test (ver TestDaltonismoCompleto.play_melody)
+MELODIES = {
+    "inicio": "C5/100 E5/100 G5/150",                                   # Do-Mi-Sol
+    "pip_correcto": "1200/100",
+    "pip_incorrecto": "400/150",
+    "resultado_bueno": "C5/150 E5/150 G5/150 C6/200 G5/150 C6/300",     # Do-Mi-Sol-Do alto-Sol-Do alto
+    "resultado_malo": "G5/200 E5/200 C5/200 G4/400",                    # Descendente
+}
+
+_TOKEN = re.compile(r"^(?:(?P<name>[A-G])(?P<accidental>[#b]?)(?P<octave>\d)|(?P<hz>\d+(?:\.\d+)?)|(?P<rest>R))/(?P<ms>\d+(?:\.\d+)?)$")
+
+
+def note_frequency(name: str, accidental: str = "", octave: int = 4) -> int:
+    """Frecuencia redondeada en Hz de una nota temperada (A4 = 440 Hz)"""
+    semitones = NOTE_OFFSETS[name] + (1 if accidental == "#" else -1 if accidental == "b" else 0)
+    semitones += (octave - 4) * 12
+    return int(round(A4_HZ * 2 ** (semitones / 12)))
+
+
+def parse(text: str, gap: float = DEFAULT_GAP):
+    """
+    Texto -> [(frecuencia o None, duración en s)], con los silencios entre notas.
+
+    Raises:
+        ValueError: si alguna nota no tiene el formato NOTA/ms
+    """
+    notes = []
+    for token in text.split():
+        match = _TOKEN.match(token)
+        if not match:
+            raise ValueError(f"Nota no válida: {token!r}")
+        duration = float(match["ms"]) / 1000.0
+        if match["rest"]:
+            frequency = None
+        elif match["hz"]:
+            frequency = int(round(float(match["hz"])))
+        else:
+            frequency = note_frequency(match["name"], match["accidental"], int(match["octave"]))
+        if notes and gap and frequency is not None and notes[-1][0] is not None:
+            notes.append((None, gap))
+        notes.append((frequency, duration))
+    return notes
+
+
+def compile_schedule(notes):
+    """
+    Notas -> eventos [(instante en s desde el inicio, frecuencia o None)].
+
+    Cada evento cambia el buzzer (None = silencio); el último es siempre un
+    silencio al final de la melodía. Notas iguales seguidas sin silencio se
+    funden en una.
+
+    Returns:
+        (eventos, duración total en s)
+    """
+    events = []
+    t = 0.0
+    for frequency, duration in notes:
+        if not events or events[-1][1] != frequency:
+            events.append((round(t, 6), frequency))
+        t += duration
+    if not events or events[-1][1] is not None:
+        events.append((round(t, 6), None))
+    return events, round(t, 6)
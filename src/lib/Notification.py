@@ -322,6 +322,7 @@ class DaltonismReportGenerator:
                 - ishihara_attempts: int
                 - timestamp: str (optional)
                 - patient_id: str (optional)
+                - plate_thumbnails: list of image paths (optional)
             output_path (str): Path where to save the PDF. If None, saves to /tmp/
         
         Returns:
@@ -436,6 +437,19 @@ class DaltonismReportGenerator:
             story.append(results_table)
             story.append(Spacer(1, 0.4 * inch))
             
+            # Miniaturas de las láminas presentadas (nivel menor de la pirámide)
+            thumbnails = [
+                Image(path, width=0.75*inch, height=0.75*inch)
+                for path in test_results.get('plate_thumbnails', [])
+                if os.path.exists(path)
+            ]
+            if thumbnails:
+                story.append(Paragraph("Láminas presentadas", heading_style))
+                thumbnails_table = Table([thumbnails], colWidths=[0.85*inch] * len(thumbnails))
+                thumbnails_table.setStyle(TableStyle([('ALIGN', (0, 0), (-1, -1), 'CENTER')]))
+                story.append(thumbnails_table)
+                story.append(Spacer(1, 0.3 * inch))
+            
             # Evaluation
             evaluation_heading = Paragraph("Evaluación", heading_style)
             story.append(evaluation_heading)
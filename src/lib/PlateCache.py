@@ -0,0 +1,213 @@
+"""
+Caché persistente en disco de láminas Ishihara ya escaladas.
+
+Las láminas se guardan como PPM binario (P6), un formato que Tk carga
+directamente con ``tk.PhotoImage(data=..., format="ppm")`` sin pasar por
+PIL ni por ``ImageTk``. La clave de cada entrada es
+(hash SHA-256 del archivo fuente, tamaño en px, filtro de remuestreo), de
+modo que si cambia la imagen en ``assets/images`` o el tamaño calculado por
+``calculate_scaling`` la entrada vieja deja de coincidir y se regenera.
+Si el kiosco tiene una LUT de calibración de color, se aplica al hornear y
+su huella se añade a la clave.
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+
+from PIL import Image
+
+from lib.PlateStore import LazyPlateImage, decode_for_size, fit_to_size, to_rgb
+
+# Directorio por defecto (sobrescribible con DALTONISMO_CACHE_DIR)
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "daltonismo",
+    "plates",
+)
+
+# Porcentaje del lado corto de la pantalla que ocupa la lámina
+IMAGE_SCREEN_PERCENTAGE = 0.70
+MIN_IMAGE_SIZE = 300
+
+
+def image_size_for_screen(screen_width: int, screen_height: int) -> int:
+    """
+    Calcula el tamaño de lámina para una pantalla (misma regla que calculate_scaling).
+
+    Args:
+        screen_width: Ancho de pantalla en px
+        screen_height: Alto de pantalla en px
+
+    Returns:
+        Lado de la lámina en px
+    """
+    max_dimension = min(screen_width, screen_height)
+    return max(MIN_IMAGE_SIZE, int(max_dimension * IMAGE_SCREEN_PERCENTAGE))
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 16) -> str:
+    """Calcula el SHA-256 de un archivo leyendo por bloques"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode_ppm(img: Image.Image) -> bytes:
+    """Codifica una imagen PIL como PPM binario (P6) listo para Tk"""
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, format="PPM")
+    return buffer.getvalue()
+
+
+class PlateRenderCache:
+    """Caché de láminas escaladas, persistente entre sesiones y reinicios"""
+
+    EXTENSION = ".ppm"
+
+    def __init__(self, cache_dir: str = None, resample=Image.LANCZOS, lut=None):
+        self.cache_dir = cache_dir or os.environ.get("DALTONISMO_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.resample = int(resample)
+        self.lut = lut  # ColorLUT de calibración de la pantalla (opcional)
+        # Hashes ya calculados en esta ejecución: path -> (mtime, tamaño, sha)
+        self._hashes = {}
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def source_hash(self, source_path: str) -> str:
+        """Devuelve el SHA-256 del archivo fuente, recalculándolo solo si cambió"""
+        stat = os.stat(source_path)
+        cached = self._hashes.get(source_path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        sha = file_sha256(source_path)
+        self._hashes[source_path] = (stat.st_mtime_ns, stat.st_size, sha)
+        return sha
+
+    def variant(self, size: int) -> str:
+        """Parte de la clave común a todas las láminas de un tamaño, filtro y LUT"""
+        variant = f"{int(size)}_{self.resample}"
+        if self.lut is not None:
+            variant += f"_{self.lut.fingerprint}"
+        return variant
+
+    def key(self, source_path: str, size: int, digest: str = None) -> str:
+        """Clave de caché para (hash de fuente, tamaño, filtro[, LUT])"""
+        return f"{digest or self.source_hash(source_path)}_{self.variant(size)}"
+
+    def entry_path(self, key: str) -> str:
+        """Ruta en disco de una entrada"""
+        return os.path.join(self.cache_dir, key + self.EXTENSION)
+
+    def render(self, source, size: int) -> bytes:
+        """Escala una lámina (ruta, LazyPlateImage o imagen PIL) y la codifica como PPM"""
+        if isinstance(source, str):
+            img = decode_for_size(source, size, self.resample)
+        elif isinstance(source, LazyPlateImage):
+            img = source.get(size, self.resample)
+        else:
+            img = fit_to_size(to_rgb(source), size, self.resample)
+        if self.lut is not None:
+            img = self.lut.apply_image(img)
+        return encode_ppm(img)
+
+    def get(self, source_path: str, size: int, image=None, digest: str = None) -> bytes:
+        """
+        Obtiene los bytes PPM de una lámina escalada, generándolos si faltan.
+
+        Args:
+            source_path: Ruta al archivo original en assets/images
+            size: Lado de la lámina en px
+            image: LazyPlateImage o imagen PIL (opcional, evita reabrir el archivo)
+            digest: SHA-256 de la fuente si ya se conoce (p. ej. desde un pack)
+
+        Returns:
+            Bytes PPM aptos para tk.PhotoImage(data=..., format="ppm")
+        """
+        path = self.entry_path(self.key(source_path, size, digest))
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            self.hits += 1
+            return data
+        except OSError:
+            pass
+
+        self.misses += 1
+        data = self.render(image if image is not None else source_path, size)
+        self._write_atomic(path, data)
+        return data
+
+    def get_plate(self, plate: dict, size: int) -> bytes:
+        """Atajo de get() para un dict de lámina del IshiharaImageLoader"""
+        return self.get(plate["path"], size, image=plate.get("image"), digest=plate.get("digest"))
+
+    def warm(self, sources, size: int) -> int:
+        """
+        Genera las entradas que falten y elimina las obsoletas.
+
+        Se llama al arrancar (o desde scripts/generar_cache_laminas.py y
+        scripts/calibrar_pantalla.py). Solo se borran las entradas del mismo
+        tamaño, filtro y LUT cuyo hash ya no corresponde a ninguna fuente:
+        las de otros tamaños o calibraciones (otra pantalla, un horneado de
+        prueba) se conservan.
+
+        Args:
+            sources: Rutas de archivo o dicts de lámina del IshiharaImageLoader
+            size: Lado de la lámina en px
+
+        Returns:
+            Número de láminas renderizadas en esta llamada
+        """
+        rendered = 0
+        valid = set()
+        for source in sources:
+            plate = source if isinstance(source, dict) else {"path": source}
+            try:
+                key = self.key(plate["path"], size, plate.get("digest"))
+                valid.add(key + self.EXTENSION)
+                if not os.path.exists(self.entry_path(key)):
+                    self._write_atomic(self.entry_path(key), self.render(plate.get("image") or plate["path"], size))
+                    rendered += 1
+            except Exception as e:
+                print(f"[CACHE] Error preparando {plate['path']}: {e}")
+        self.prune(valid, self.variant(size))
+        return rendered
+
+    def prune(self, valid_names, variant: str) -> int:
+        """Elimina las entradas de la variante dada que no estén en valid_names"""
+        removed = 0
+        suffix = variant + self.EXTENSION
+        for name in os.listdir(self.cache_dir):
+            # El hash nunca contiene "_": lo que sigue al primero es la variante
+            if name.partition("_")[2] == suffix and name not in valid_names:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def _write_atomic(self, path: str, data: bytes):
+        """
+        Escribe a un temporal y renombra para no dejar entradas a medias. El
+        temporal es único por llamada: el hilo de arranque, el de precarga y
+        el de Tk pueden escribir la misma clave a la vez.
+        """
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=os.path.basename(path) + ".", suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[CACHE] No se pudo escribir {path}: {e}")
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
@@ -0,0 +1,260 @@
+"""
+Generador procedural y vectorizado de láminas pseudoisocromáticas.
+
+Cada lámina es una rejilla de puntos con posición y radio aleatorios. Los
+puntos que caen sobre el número (dibujado con segmentos) se desplazan en el
+espacio de conos LMS a lo largo de una línea de confusión: solo cambia la
+respuesta del cono que le falta al tipo de daltonismo evaluado, de modo que
+una persona con visión normal ve el número y un dicrómata no. Todo el cálculo
+se hace sobre arrays NumPy completos, sin bucles por punto ni por píxel.
+"""
+
+import json
+import os
+import re
+import time
+
+import numpy as np
+from PIL import Image
+
+# Cambiar al modificar el algoritmo para invalidar la caché de láminas generadas
+GENERATOR_VERSION = 2
+
+# Archivos de un juego: v{versión}_{deficiencia}_{semilla}_{tamaño}_{n}_ + índice o lámina
+GENERATED_NAME = re.compile(r"^v\d+_[a-z]+_\d+_\d+_\d+_(?:index\.json|\d+_\d+\.png)$")
+
+DEFAULT_GENERATED_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "daltonismo",
+    "generated",
+)
+
+# RGB lineal -> LMS (Smith & Pokorny, usada por Viénot et al. 1999)
+RGB_TO_LMS = np.array([
+    [17.8824, 43.5161, 4.11935],
+    [3.45565, 27.1554, 3.86714],
+    [0.0299566, 0.184309, 1.46709],
+])
+LMS_TO_RGB = np.linalg.inv(RGB_TO_LMS)
+
+# Cono cuya respuesta varía entre fondo y figura según la deficiencia evaluada
+CONFUSION_AXIS = {"protan": 0, "deutan": 1, "tritan": 2}
+
+# Desplazamiento relativo sobre el eje de confusión según dificultad
+DIFFICULTY_DELTA = {"easy": 0.40, "medium": 0.26, "hard": 0.16}
+
+# Tonos base del fondo (sRGB), cálidos y de luminancia media como en las láminas reales
+BACKGROUND_PALETTE = np.array([
+    [214, 150, 92],
+    [196, 132, 78],
+    [222, 176, 110],
+    [184, 142, 96],
+], dtype=np.float64)
+
+# Segmentos de un display de 7 segmentos en una caja de 1 x 2
+_SEGMENTS = {
+    "a": ((0, 0), (1, 0)), "b": ((1, 0), (1, 1)), "c": ((1, 1), (1, 2)),
+    "d": ((0, 2), (1, 2)), "e": ((0, 1), (0, 2)), "f": ((0, 0), (0, 1)),
+    "g": ((0, 1), (1, 1)),
+}
+_DIGIT_SEGMENTS = {
+    "0": "abcdef", "1": "bc", "2": "abged", "3": "abgcd", "4": "fgbc",
+    "5": "afgcd", "6": "afgedc", "7": "abc", "8": "abcdefg", "9": "abcdfg",
+}
+
+
+def srgb_to_linear(c):
+    """sRGB en [0, 1] a RGB lineal"""
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(c):
+    """RGB lineal a sRGB en [0, 1]"""
+    c = np.clip(c, 0.0, 1.0)
+    return np.where(c <= 0.0031308, c * 12.92, 1.055 * np.power(c, 1 / 2.4) - 0.055)
+
+
+def number_segments(number: int, size: int):
+    """
+    Segmentos (K, 2, 2) en píxeles que dibujan `number` centrado en la lámina.
+
+    Returns:
+        (segmentos, grosor del trazo en px)
+    """
+    text = str(number)
+    digit_w = size * 0.17
+    gap = digit_w * 0.55
+    total_w = len(text) * digit_w + (len(text) - 1) * gap
+    x0 = (size - total_w) / 2
+    y0 = (size - 2 * digit_w) / 2
+    segments = []
+    for i, ch in enumerate(text):
+        ox = x0 + i * (digit_w + gap)
+        for name in _DIGIT_SEGMENTS[ch]:
+            (ax, ay), (bx, by) = _SEGMENTS[name]
+            segments.append(((ox + ax * digit_w, y0 + ay * digit_w), (ox + bx * digit_w, y0 + by * digit_w)))
+    return np.array(segments, dtype=np.float64), digit_w * 0.34
+
+
+def points_in_number(points, number: int, size: int):
+    """Máscara booleana de qué puntos (N, 2) caen sobre el trazo del número"""
+    segs, thickness = number_segments(number, size)
+    a = segs[None, :, 0, :]
+    ab = segs[None, :, 1, :] - a
+    ap = points[:, None, :] - a
+    t = np.clip((ap * ab).sum(-1) / np.maximum((ab * ab).sum(-1), 1e-9), 0.0, 1.0)
+    closest = a + t[..., None] * ab
+    dist = np.sqrt(((points[:, None, :] - closest) ** 2).sum(-1)).min(axis=1)
+    return dist <= thickness / 2
+
+
+class IshiharaPlateGenerator:
+    """Genera láminas pseudoisocromáticas como arrays RGB"""
+
+    def __init__(self, size: int, seed=None, deficiency: str = "deutan", dots_across: int = 38):
+        if deficiency not in CONFUSION_AXIS:
+            raise ValueError(f"Deficiencia desconocida: {deficiency}")
+        self.size = int(size)
+        self.seed = seed
+        self.deficiency = deficiency
+        self.pitch = max(6, self.size // dots_across)
+        self.rng = np.random.default_rng(seed)
+
+    def _dot_layout(self):
+        """Centros, radios y validez de un punto por celda de la rejilla"""
+        p = self.pitch
+        cells = -(-self.size // p)
+        radius = (p / 2) * self.rng.uniform(0.55, 0.95, (cells, cells))
+        slack = p / 2 - radius
+        base = (np.arange(cells) + 0.5) * p
+        cy = base[:, None] + self.rng.uniform(-1, 1, (cells, cells)) * slack
+        cx = base[None, :] + self.rng.uniform(-1, 1, (cells, cells)) * slack
+        center = self.size / 2
+        plate_radius = center * 0.96
+        valid = np.hypot(cx - center, cy - center) + radius <= plate_radius
+        return cx, cy, radius, valid
+
+    def _dot_colors(self, figure, number_of_dots, difficulty):
+        """Color sRGB (N, 3) en [0, 255] para cada punto, figura o fondo"""
+        base = BACKGROUND_PALETTE[self.rng.integers(0, len(BACKGROUND_PALETTE), number_of_dots)]
+        lms = srgb_to_linear(base / 255.0) @ RGB_TO_LMS.T
+        # Variación de luminancia por punto para que el brillo no delate la figura
+        lms *= self.rng.uniform(0.72, 1.12, (number_of_dots, 1))
+        axis = CONFUSION_AXIS[self.deficiency]
+        delta = DIFFICULTY_DELTA[difficulty]
+        # Solo cambia el cono "ciego": figura y fondo difieren sobre la línea
+        # de confusión y el dicrómata no puede distinguirlos
+        lms[figure, axis] *= 1.0 - delta
+        rgb = linear_to_srgb(lms @ LMS_TO_RGB.T)
+        return np.round(rgb * 255.0)
+
+    def generate(self, number: int, difficulty: str = "medium") -> np.ndarray:
+        """
+        Genera una lámina con el número indicado.
+
+        Args:
+            number: Número a mostrar (1 o 2 dígitos)
+            difficulty: "easy", "medium" o "hard"
+
+        Returns:
+            Array uint8 de forma (size, size, 3)
+        """
+        cx, cy, radius, valid = self._dot_layout()
+        points = np.stack([cx.ravel(), cy.ravel()], axis=1)
+        figure = points_in_number(points, number, self.size)
+        colors = self._dot_colors(figure, len(points), difficulty).reshape(cx.shape + (3,))
+
+        p = self.pitch
+        ys, xs = np.ogrid[:self.size, :self.size]
+        iy = np.broadcast_to(ys // p, (self.size, self.size))
+        ix = np.broadcast_to(xs // p, (self.size, self.size))
+        dx = xs - cx[iy, ix]
+        dy = ys - cy[iy, ix]
+        inside = (dx * dx + dy * dy <= radius[iy, ix] ** 2) & valid[iy, ix]
+
+        plate = np.full((self.size, self.size, 3), 255, dtype=np.uint8)
+        plate[inside] = colors[iy[inside], ix[inside]]
+        return plate
+
+    def plate_options(self, number: int):
+        """Respuesta correcta más dos distractores verosímiles"""
+        text = str(number)
+        candidates = {int(text[::-1])} if len(text) == 2 and text[1] != "0" else set()
+        candidates.update(int(d) for d in (number + 1, number - 1, number + 10, number - 10) if 0 < d < 100)
+        candidates.discard(number)
+        distractors = self.rng.choice(sorted(candidates), size=2, replace=False)
+        return [number] + [int(d) for d in distractors] + ["No veo nada"]
+
+    def generate_set(self, count: int):
+        """
+        Genera un juego de láminas con números y dificultades variadas.
+
+        Returns:
+            Lista de dicts con number, difficulty, options e image (array)
+        """
+        difficulties = list(DIFFICULTY_DELTA)
+        plates = []
+        for i in range(count):
+            number = int(self.rng.integers(2, 100))
+            difficulty = difficulties[i % len(difficulties)]
+            plates.append({
+                "number": number,
+                "difficulty": difficulty,
+                "options": self.plate_options(number),
+                "image": self.generate(number, difficulty),
+            })
+        return plates
+
+
+class GeneratedPlateCache:
+    """Guarda juegos generados como PNG para servirlos igual que archivos"""
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir or os.environ.get("DALTONISMO_GENERATED_DIR", DEFAULT_GENERATED_DIR)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_set(self, count: int, size: int, seed=None, deficiency: str = "deutan"):
+        """
+        Devuelve un juego de láminas ya escritas en disco.
+
+        Con `seed` fijo se reutiliza el juego existente; sin semilla se genera
+        uno nuevo. Los juegos anteriores se eliminan para acotar el espacio.
+
+        Returns:
+            Lista de dicts con number, difficulty, options y path
+        """
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % (1 << 32))
+        prefix = f"v{GENERATOR_VERSION}_{deficiency}_{seed}_{size}_{count}_"
+        index_path = os.path.join(self.cache_dir, prefix + "index.json")
+
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                plates = json.load(f)
+        else:
+            start = time.perf_counter()
+            generator = IshiharaPlateGenerator(size, seed=seed, deficiency=deficiency)
+            plates = []
+            for i, plate in enumerate(generator.generate_set(count)):
+                path = os.path.join(self.cache_dir, f"{prefix}{i:02d}_{plate['number']}.png")
+                Image.fromarray(plate.pop("image")).save(path)
+                plate["path"] = path
+                plates.append(plate)
+            with open(index_path, "w", encoding="utf-8") as f:
+                json.dump(plates, f)
+            print(f"[GENERADOR] {count} láminas generadas en {time.perf_counter() - start:.2f}s (semilla {seed})")
+
+        self._prune(prefix)
+        return plates
+
+    def _prune(self, keep_prefix: str):
+        """
+        Elimina archivos de juegos distintos al actual. Solo toca nombres con
+        el patrón del generador: el directorio puede ser compartido.
+        """
+        for name in os.listdir(self.cache_dir):
+            if GENERATED_NAME.match(name) and not name.startswith(keep_prefix):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
@@ -0,0 +1,138 @@
+"""
+Manifiesto de láminas con hashes de contenido y validación incremental.
+
+``assets/images/manifest.json`` describe cada lámina (archivo, respuesta,
+opciones, dificultad y SHA-256). Al arrancar solo se hace ``stat`` de cada
+archivo: si tamaño y mtime coinciden con el índice local ya validado, la
+entrada se sirve desde el índice sin abrir ni hashear la imagen. Solo los
+archivos modificados se vuelven a hashear y comparar con el manifiesto.
+"""
+
+import json
+import os
+
+from PIL import Image
+
+from lib.PlateCache import file_sha256
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+DEFAULT_INDEX_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "daltonismo",
+    "manifest_index.json",
+)
+
+
+def read_manifest(path: str):
+    """Lee un manifiesto y devuelve su lista de entradas"""
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Versión de manifiesto no soportada: {manifest.get('version')}")
+    return manifest["plates"]
+
+
+def write_manifest(path: str, entries):
+    """Escribe un manifiesto de forma atómica"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "plates": entries}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+class PlateManifest:
+    """Manifiesto de un directorio de láminas con índice de validación local"""
+
+    def __init__(self, directory: str, index_path: str = None):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+        self.index_path = index_path or os.environ.get("DALTONISMO_MANIFEST_INDEX", DEFAULT_INDEX_PATH)
+        self.reused = 0
+        self.rehashed = 0
+        self.invalid = 0
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def validated_entries(self):
+        """
+        Entradas del manifiesto cuyo archivo existe y coincide con su hash.
+
+        Returns:
+            Lista de dicts de la entrada más path, sha256, width, height y format
+        """
+        index = self._load_index()
+        changed = False
+        valid = []
+
+        for entry in read_manifest(self.manifest_path):
+            path = os.path.abspath(os.path.join(self.directory, entry["file"]))
+            try:
+                stat = os.stat(path)
+            except OSError:
+                print(f"[MANIFIESTO] Falta {entry['file']}")
+                self.invalid += 1
+                continue
+
+            cached = index.get(path)
+            if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+                info = cached
+                self.reused += 1
+            else:
+                try:
+                    info = self._inspect(path, stat)
+                except Exception as e:
+                    print(f"[MANIFIESTO] Error leyendo {entry['file']}: {e}")
+                    self.invalid += 1
+                    continue
+                index[path] = info
+                changed = True
+                self.rehashed += 1
+
+            expected = entry.get("sha256")
+            if expected and expected != info["sha256"]:
+                print(f"[MANIFIESTO] Hash distinto para {entry['file']}, se omite")
+                self.invalid += 1
+                continue
+
+            valid.append(dict(entry, path=path, sha256=info["sha256"], width=info["width"],
+                              height=info["height"], format=info["format"]))
+
+        if changed:
+            self._save_index(index)
+        return valid
+
+    @staticmethod
+    def _inspect(path: str, stat) -> dict:
+        """Hashea un archivo y lee su cabecera de imagen"""
+        with Image.open(path) as img:
+            width, height = img.size
+            image_format = img.format
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_sha256(path),
+            "width": width,
+            "height": height,
+            "format": image_format,
+        }
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index: dict):
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": index}, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"[MANIFIESTO] No se pudo guardar el índice: {e}")
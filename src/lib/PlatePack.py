@@ -0,0 +1,224 @@
+"""
+Paquete único de láminas pre-decodificadas, abierto con mmap.
+
+Formato del archivo (little endian):
+
+    8 bytes   firma b"DLTPACK1"
+    4 bytes   longitud N de la cabecera JSON
+    N bytes   cabecera JSON: {"version": 1, "plates": [...]}
+    relleno   hasta múltiplo de 64
+    datos     arrays RGB uint8 (alto x ancho x 3), cada uno alineado a 64
+
+Cada entrada de "plates" lleva name, correct, options, difficulty, sha256
+(del archivo fuente), digest, width, height, offset (relativo a la zona de
+datos) y source: nombre, tamaño en bytes y mtime del archivo fuente al
+empaquetar. La cabecera guarda además el SHA-256 de manifest.json ("manifest",
+null si no había). Si un archivo fuente o el manifiesto cambian después de
+empaquetar, stale_reason() lo detecta y el cargador vuelve a los archivos.
+
+digest es el sha256 de la fuente si las láminas van a resolución original y
+"<sha256>-<ancho>x<alto>" si se pre-escalaron con --size, para que la caché de
+renderizado no confunda píxeles del paquete con los de la fuente.
+Al abrir el paquete solo se lee la cabecera; los píxeles son vistas NumPy de
+solo lectura sobre el mmap, por lo que el sistema operativo los trae del SD
+únicamente cuando se usan.
+"""
+
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+from PIL import Image
+
+from lib.PlateCache import file_sha256
+from lib.PlateManifest import MANIFEST_FILENAME
+from lib.PlateStore import LazyPlateImage, fit_to_size
+
+PACK_MAGIC = b"DLTPACK1"
+PACK_VERSION = 1
+PACK_ALIGN = 64
+PACK_FILENAME = "plates.dpk"
+
+
+def _align(offset: int) -> int:
+    return (offset + PACK_ALIGN - 1) // PACK_ALIGN * PACK_ALIGN
+
+
+def source_fingerprint(directory: str, file: str) -> dict:
+    """Huella barata (sin leer el contenido) de un archivo fuente relativo a `directory`"""
+    stat = os.stat(os.path.join(directory, file))
+    return {"file": file, "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_pack(output_path: str, plates, manifest_sha256: str = None, images=None) -> int:
+    """
+    Escribe un paquete de láminas sin tener más de una imagen en memoria.
+
+    La cabecera va antes que los píxeles, así que los offsets se calculan
+    primero con la forma de cada lámina y luego cada imagen se escribe en
+    cuanto `images` la produce.
+
+    Args:
+        output_path: Ruta del archivo .dpk
+        plates: Secuencia de dicts con name, correct, options, difficulty,
+            sha256, source (source_fingerprint), scaled (True si la imagen
+            se pre-escaló) y shape (alto, ancho, 3); si falta shape se toma
+            de image
+        manifest_sha256: Hash de manifest.json al empaquetar (None si no hay)
+        images: Iterable de arrays uint8 en el mismo orden que plates (por
+            defecto, el campo image de cada lámina)
+
+    Returns:
+        Número de láminas escritas
+    """
+    entries = []
+    offset = 0  # Relativo al inicio de la zona de datos
+    for plate in plates:
+        if "shape" in plate:
+            shape, dtype = tuple(plate["shape"]), np.dtype(plate.get("dtype", np.uint8))
+        else:
+            shape, dtype = plate["image"].shape, plate["image"].dtype
+        if len(shape) != 3 or shape[2] != 3 or dtype != np.uint8:
+            raise ValueError(f"Lámina {plate['name']}: se esperaba RGB uint8, no {shape} {dtype}")
+        height, width = int(shape[0]), int(shape[1])
+        digest = plate["sha256"]
+        if plate.get("scaled"):
+            digest = f"{digest}-{width}x{height}"
+        entries.append({
+            "name": plate["name"],
+            "correct": plate["correct"],
+            "options": plate["options"],
+            "difficulty": plate["difficulty"],
+            "control": plate.get("control", False),
+            "sha256": plate["sha256"],
+            "digest": digest,
+            "source": plate.get("source"),
+            "width": width,
+            "height": height,
+            "offset": offset,
+        })
+        offset = _align(offset + height * width * 3 * dtype.itemsize)
+    header = json.dumps({"version": PACK_VERSION, "manifest": manifest_sha256, "plates": entries}).encode("utf-8")
+    data_start = _align(len(PACK_MAGIC) + 4 + len(header))
+    if images is None:
+        images = (plate["image"] for plate in plates)
+
+    tmp_path = output_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(PACK_MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            # Sin zip: su tupla de resultado retendría la lámina anterior
+            images = iter(images)
+            for entry in entries:
+                image = next(images, None)
+                if image is None:
+                    raise ValueError(f"Falta la imagen de la lámina {entry['name']}")
+                image = np.asarray(image)
+                if image.shape != (entry["height"], entry["width"], 3) or image.dtype != np.uint8:
+                    raise ValueError(f"Lámina {entry['name']}: {image.shape} {image.dtype} no coincide con la cabecera")
+                f.write(b"\0" * (data_start + entry["offset"] - f.tell()))
+                f.write(np.ascontiguousarray(image).data)
+                del image  # Que la lámina se libere antes de decodificar la siguiente
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(entries)
+
+
+class PlatePack:
+    """Paquete de láminas mapeado en memoria"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        if self._mmap[:len(PACK_MAGIC)] != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"{path} no es un paquete de láminas")
+        header_len = struct.unpack_from("<I", self._mmap, len(PACK_MAGIC))[0]
+        start = len(PACK_MAGIC) + 4
+        header = json.loads(self._mmap[start:start + header_len].decode("utf-8"))
+        if header.get("version") != PACK_VERSION:
+            self.close()
+            raise ValueError(f"Versión de paquete no soportada: {header.get('version')}")
+        self.data_start = _align(start + header_len)
+        self.entries = header["plates"]
+        self.manifest = header.get("manifest")
+        self._by_name = {entry["name"]: entry for entry in self.entries}
+
+    def stale_reason(self, directory: str):
+        """
+        Motivo por el que el paquete ya no corresponde a `directory`, o None.
+
+        Solo hace stat de cada fuente y hashea manifest.json (unos KB).
+        Un paquete sin huellas de origen no se puede comprobar y se
+        considera desactualizado.
+        """
+        manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+        current = file_sha256(manifest_path) if os.path.exists(manifest_path) else None
+        if current != self.manifest:
+            return f"{MANIFEST_FILENAME} cambió"
+        for entry in self.entries:
+            source = entry.get("source")
+            if not source:
+                return f"{entry['name']} sin huella del archivo fuente"
+            try:
+                stat = os.stat(os.path.join(directory, source["file"]))
+            except OSError:
+                return f"falta {source['file']}"
+            if stat.st_size != source["bytes"] or stat.st_mtime_ns != source["mtime_ns"]:
+                return f"{source['file']} cambió"
+        return None
+
+    def array(self, name: str) -> np.ndarray:
+        """Vista de solo lectura (sin copia) de los píxeles RGB de una lámina"""
+        entry = self._by_name[name]
+        return np.frombuffer(
+            self._mmap,
+            dtype=np.uint8,
+            count=entry["width"] * entry["height"] * 3,
+            offset=self.data_start + entry["offset"],
+        ).reshape(entry["height"], entry["width"], 3)
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except (BufferError, ValueError):
+            # Aún hay vistas vivas; el mmap se libera al recolectarlas
+            pass
+        self._file.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PackedPlateImage(LazyPlateImage):
+    """LazyPlateImage respaldada por una vista del paquete en vez de un archivo"""
+
+    def __init__(self, pack: PlatePack, entry: dict, lru):
+        super().__init__(
+            f"{pack.path}#{entry['name']}", lru,
+            size=(entry["width"], entry["height"]), image_format="DPK"
+        )
+        self.pack = pack
+        self.name = entry["name"]
+
+    def get(self, size: int = None, resample=Image.LANCZOS) -> Image.Image:
+        key = (self.path, size, int(resample))
+        img = self.lru.get(key)
+        if img is None:
+            img = fit_to_size(Image.fromarray(self.pack.array(self.name)), size, resample)
+            self.lru.put(key, img)
+        return img
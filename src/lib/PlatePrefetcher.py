@@ -0,0 +1,127 @@
+"""
+Precarga en segundo plano de la siguiente lámina Ishihara.
+
+Mientras el usuario observa la lámina N, un hilo trabajador obtiene los bytes
+ya escalados de la lámina N+1 y los entrega al hilo de Tk con ``root.after``,
+donde se construye el ``PhotoImage``. Cuando llega el cambio de lámina solo
+hay que asignar la imagen ya preparada.
+"""
+
+import queue
+import threading
+
+
+class PlatePrefetcher:
+    """Hilo único que prepara láminas por adelantado"""
+
+    def __init__(self, root, fetch, build):
+        """
+        Args:
+            root: Ventana Tk usada para volver al hilo de la interfaz
+            fetch: Función (plate) -> datos, se ejecuta en el hilo trabajador
+            build: Función (datos) -> PhotoImage, se ejecuta en el hilo de Tk
+        """
+        self.root = root
+        self.fetch = fetch
+        self.build = build
+        self.hits = 0
+        self.misses = 0
+        self.late = 0  # Entregas que llegaron después de que la ronda ya las necesitó
+        self.errors = 0
+        self._generation = 0
+        self._ready = {}      # índice -> PhotoImage listo en el hilo de Tk
+        self._requested = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def request(self, index, plate):
+        """Solicita preparar la lámina `index` (idempotente por sesión)"""
+        with self._lock:
+            if index in self._requested or index in self._ready:
+                return
+            self._requested.add(index)
+            generation = self._generation
+        self._queue.put((generation, index, plate))
+
+    def take(self, index):
+        """
+        Devuelve la lámina preparada o None si aún no llegó.
+
+        Cuenta un acierto si la lámina estaba lista y un fallo si la ronda
+        tendrá que cargarla de forma síncrona.
+        """
+        with self._lock:
+            photo = self._ready.pop(index, None)
+            self._requested.discard(index)
+        if photo is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return photo
+
+    def reset(self):
+        """Descarta lo preparado para una sesión anterior"""
+        with self._lock:
+            self._generation += 1
+            self._ready.clear()
+            self._requested.clear()
+
+    def stats(self):
+        """Contadores para verificar que la precarga oculta la latencia"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "late": self.late,
+            "errors": self.errors,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def stop(self):
+        """Detiene el hilo trabajador"""
+        self._running = False
+        self._queue.put(None)
+
+    def _worker(self):
+        while self._running:
+            item = self._queue.get()
+            if item is None:
+                break
+            generation, index, plate = item
+            if generation != self._generation:
+                continue
+            try:
+                data = self.fetch(plate)
+            except Exception as e:
+                self.errors += 1
+                print(f"[PREFETCH] Error preparando lámina {index}: {e}")
+                with self._lock:
+                    self._requested.discard(index)
+                continue
+            try:
+                self.root.after(0, lambda g=generation, i=index, d=data: self._deliver(g, i, d))
+            except Exception:
+                # La ventana ya se cerró
+                break
+
+    def _deliver(self, generation, index, data):
+        """Construye el PhotoImage en el hilo de Tk"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            if index not in self._requested:
+                # La ronda ya pasó por aquí y cargó la lámina sin esperar
+                self.late += 1
+                return
+        try:
+            photo = self.build(data)
+        except Exception as e:
+            self.errors += 1
+            print(f"[PREFETCH] Error construyendo lámina {index}: {e}")
+            return
+        with self._lock:
+            if generation == self._generation and index in self._requested:
+                self._ready[index] = photo
@@ -0,0 +1,105 @@
+"""
+Pirámide multirresolución de láminas para distintas pantallas de kiosco.
+
+Cada lámina se pre-escala offline con LANCZOS a varios niveles fijos
+(``PYRAMID_LEVELS``). En tiempo de ejecución se elige el nivel más pequeño
+que cubra el tamaño pedido y se hace como mucho un ajuste final barato
+(bilineal, con factor siempre menor a 1.5). El nivel más pequeño sirve
+también como miniatura para el reporte PDF.
+
+Los archivos se nombran por el SHA-256 de la lámina original, de modo que
+una lámina modificada nunca reutiliza niveles viejos.
+"""
+
+import os
+
+from PIL import Image
+
+from lib.PlateStore import decode_for_size
+
+PYRAMID_LEVELS = (256, 384, 512, 768, 1024)
+PYRAMID_DIRNAME = "pyramid"
+
+
+def nearest_level(size: int, levels=PYRAMID_LEVELS) -> int:
+    """Nivel más pequeño >= size (o el mayor si size los supera a todos)"""
+    for level in levels:
+        if level >= size:
+            return level
+    return levels[-1]
+
+
+class PlatePyramid:
+    """Niveles pre-escalados de cada lámina, almacenados en un directorio"""
+
+    def __init__(self, directory: str, levels=PYRAMID_LEVELS):
+        self.directory = directory
+        self.levels = tuple(sorted(levels))
+
+    def available(self) -> bool:
+        return os.path.isdir(self.directory)
+
+    def level_path(self, digest: str, level: int) -> str:
+        return os.path.join(self.directory, f"{digest[:32]}_{level}.png")
+
+    def has(self, digest: str) -> bool:
+        """True si están todos los niveles de la lámina"""
+        return all(os.path.exists(self.level_path(digest, level)) for level in self.levels)
+
+    def build(self, source_path: str, digest: str) -> int:
+        """
+        Genera los niveles que falten para una lámina.
+
+        Returns:
+            Número de niveles escritos
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        written = 0
+        for level in self.levels:
+            path = self.level_path(digest, level)
+            if os.path.exists(path):
+                continue
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            decode_for_size(source_path, level).save(tmp_path, format="PNG")
+            os.replace(tmp_path, path)
+            written += 1
+        return written
+
+    def load(self, digest: str, size: int, resample=Image.BILINEAR):
+        """
+        Lámina a size x size desde el nivel más cercano, o None si no hay pirámide.
+
+        Args:
+            digest: SHA-256 de la lámina original
+            size: Lado pedido en px
+            resample: Filtro del ajuste final (barato: el factor es pequeño)
+        """
+        level = nearest_level(size, self.levels)
+        path = self.level_path(digest, level)
+        if not os.path.exists(path):
+            return None
+        with Image.open(path) as img:
+            img = img.convert("RGB")
+        if level == size:
+            return img
+        if size > level:
+            # Más grande que el mayor nivel: conviene el filtro de calidad
+            resample = Image.LANCZOS
+        return img.resize((size, size), resample)
+
+    def thumbnail_path(self, digest: str):
+        """Ruta de la miniatura (nivel más pequeño) o None si no existe"""
+        path = self.level_path(digest, self.levels[0])
+        return path if os.path.exists(path) else None
+
+    def prune(self, digests) -> int:
+        """Elimina niveles de láminas que ya no están en `digests`"""
+        if not self.available():
+            return 0
+        keep = {digest[:32] for digest in digests}
+        removed = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(".png") and name.split("_")[0] not in keep:
+                os.remove(os.path.join(self.directory, name))
+                removed += 1
+        return removed
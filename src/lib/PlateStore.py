@@ -0,0 +1,175 @@
+"""
+Carga perezosa y acotada en memoria de las láminas Ishihara.
+
+Cada lámina se representa con un ``LazyPlateImage`` que solo guarda la ruta y
+los datos de cabecera. Los píxeles se decodifican al primer uso, directamente
+al tamaño pedido cuando el formato lo permite (``draft`` en JPEG, ``reduce``
+en el resto), y se conservan en un LRU con presupuesto de bytes compartido.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+# Presupuesto por defecto para píxeles decodificados (sobrescribible con
+# la variable de entorno DALTONISMO_PLATE_MEMORY_MB)
+DEFAULT_MAX_DECODED_BYTES = int(os.environ.get("DALTONISMO_PLATE_MEMORY_MB", "16")) * 1024 * 1024
+
+
+# Respuestas correctas, opciones y dificultad de cada lámina de assets/images
+PLATES_CONFIG = {
+    "12": {"correct": 12, "options": [12, 17, 21, "No veo nada"], "difficulty": "easy", "control": True},
+    "13": {"correct": 73, "options": [73, 13, 78, "No veo nada"], "difficulty": "easy"},
+    "16": {"correct": 16, "options": [16, 19, 18, "No veo nada"], "difficulty": "medium"},
+    "29": {"correct": 29, "options": [29, 70, 20, "No veo nada"], "difficulty": "medium"},
+    "42": {"correct": 42, "options": [42, 24, 74, "No veo nada"], "difficulty": "hard"},
+    "5": {"correct": 5, "options": [5, 2, 8, "No veo nada"], "difficulty": "easy"},
+    "74": {"correct": 74, "options": [74, 21, 71, "No veo nada"], "difficulty": "hard"},
+    "8": {"correct": 8, "options": [8, 3, 6, "No veo nada"], "difficulty": "easy"}
+}
+
+# Extensiones buscadas para cada lámina, en orden de preferencia
+PLATE_EXTENSIONS = ['png', 'jpg', 'jpeg']
+
+
+def find_plate_file(directory: str, name: str):
+    """Ruta del archivo de una lámina según PLATE_EXTENSIONS, o None"""
+    for ext in PLATE_EXTENSIONS:
+        image_path = os.path.join(directory, f"{name}.{ext}")
+        if os.path.exists(image_path):
+            return image_path
+    return None
+
+
+def image_nbytes(img: Image.Image) -> int:
+    """Bytes que ocupan los píxeles de una imagen PIL ya decodificada"""
+    return img.width * img.height * len(img.getbands())
+
+
+def to_rgb(img: Image.Image) -> Image.Image:
+    """Convierte a RGB componiendo la transparencia sobre blanco (fondo de la UI)"""
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def decode_for_size(path: str, size: int = None, resample=Image.LANCZOS) -> Image.Image:
+    """
+    Decodifica una lámina evitando materializar la resolución original.
+
+    Args:
+        path: Ruta al archivo de imagen
+        size: Lado final en px (None para la resolución original)
+        resample: Filtro para el ajuste final al tamaño exacto
+
+    Returns:
+        Imagen RGB de size x size (o la original si size es None)
+    """
+    with Image.open(path) as img:
+        if size is not None and img.format == "JPEG":
+            # El decodificador JPEG escala por 1/2, 1/4 o 1/8 sin coste extra
+            img.draft("RGB", (size, size))
+        img = to_rgb(img)
+
+    return fit_to_size(img, size, resample)
+
+
+def fit_to_size(img: Image.Image, size: int = None, resample=Image.LANCZOS) -> Image.Image:
+    """Ajusta una imagen ya decodificada a size x size con reducción entera previa"""
+    if size is None or img.size == (size, size):
+        return img
+
+    factor = min(img.width, img.height) // size
+    if factor >= 2:
+        # Reducción entera rápida; el ajuste fino lo hace el filtro final
+        img = img.reduce(factor)
+    return img.resize((size, size), resample)
+
+
+class DecodedImageLRU:
+    """LRU de imágenes decodificadas con límite total en bytes"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_DECODED_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            img = self._entries.get(key)
+            if img is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return img
+
+    def put(self, key, img: Image.Image):
+        nbytes = image_nbytes(img)
+        if nbytes > self.max_bytes:
+            # No cabe ni sola: se usa y se descarta
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= image_nbytes(old)
+            self._entries[key] = img
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= image_nbytes(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LazyPlateImage:
+    """Referencia a una lámina que se decodifica solo cuando se necesita"""
+
+    def __init__(self, path: str, lru: DecodedImageLRU, size=None, image_format=None,
+                 digest: str = None, pyramid=None):
+        self.path = path
+        self.lru = lru
+        self.size = size      # Tamaño original leído de la cabecera
+        self.format = image_format
+        self.digest = digest
+        self.pyramid = pyramid  # PlatePyramid con niveles pre-escalados (opcional)
+
+    @classmethod
+    def probe(cls, path: str, lru: DecodedImageLRU):
+        """Valida la cabecera sin decodificar píxeles; lanza excepción si no es imagen"""
+        img = Image.open(path)
+        try:
+            return cls(path, lru, size=img.size, image_format=img.format)
+        finally:
+            img.close()
+
+    def get(self, size: int = None, resample=Image.LANCZOS) -> Image.Image:
+        """Imagen decodificada a `size` px (o a resolución original si es None)"""
+        key = (self.path, size, int(resample))
+        img = self.lru.get(key)
+        if img is None:
+            if size is not None and self.pyramid is not None and self.digest:
+                img = self.pyramid.load(self.digest, size)
+            if img is None:
+                img = decode_for_size(self.path, size, resample)
+            self.lru.put(key, img)
+        return img
+
+    def __repr__(self):
+        return f"LazyPlateImage({os.path.basename(self.path)!r}, size={self.size})"
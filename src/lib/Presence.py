@@ -0,0 +1,148 @@
+"""
+Detección de presencia frente al kiosco a partir del sensor ultrasónico.
+
+PresenceEstimator filtra las lecturas crudas (mediana de una ventana corta
+para descartar ecos espurios y EMA para suavizar) y decide la presencia con
+histéresis: el usuario entra al bajar de ``enter_cm`` y solo se considera
+que se fue si la distancia filtrada supera ``exit_cm`` de forma continuada
+durante ``exit_dwell`` segundos. Así una lectura suelta no aborta la sesión.
+
+El periodo de muestreo se adapta al estado: lento en reposo (sin nadie
+cerca), rápido cuando alguien se acerca o mientras se confirma una salida.
+
+``replay`` pasa una traza grabada (tiempo, distancia) por el estimador más
+rápido que el tiempo real, muestreándola en los mismos instantes en que lo
+haría el hilo del sensor (scripts/reproducir_presencia.py).
+"""
+
+import bisect
+import csv
+import statistics
+
+ENTER_CM = 50           # Presente al bajar de aquí (MIN_DISTANCE de dalton.py)
+EXIT_CM = 65            # Ausente al superar esto durante EXIT_DWELL
+APPROACH_CM = 120       # Alguien se acerca: muestreo rápido
+MAX_RANGE_CM = 400      # Valor usado para ecos perdidos
+MEDIAN_WINDOW = 5
+EMA_ALPHA = 0.5
+EXIT_DWELL = 2.0        # Segundos lejos antes de abortar la sesión
+
+IDLE_INTERVAL = 0.6     # Nadie cerca
+APPROACH_INTERVAL = 0.1  # Acercándose o confirmando una salida
+PRESENT_INTERVAL = 0.25  # Usuario delante
+
+
+class PresenceEstimator:
+    """Presencia filtrada con histéresis, permanencia y muestreo adaptativo"""
+
+    def __init__(self, enter_cm: float = ENTER_CM, exit_cm: float = EXIT_CM, window: int = MEDIAN_WINDOW,
+                 alpha: float = EMA_ALPHA, exit_dwell: float = EXIT_DWELL, approach_cm: float = APPROACH_CM):
+        self.enter_cm = enter_cm
+        self.exit_cm = max(exit_cm, enter_cm)
+        self.window = window
+        self.alpha = alpha
+        self.exit_dwell = exit_dwell
+        self.approach_cm = approach_cm
+        self.reset()
+
+    def reset(self, present: bool = False):
+        self.present = present
+        self.distance = None     # Distancia filtrada (cm)
+        self.readings = []
+        self.leaving_since = None
+        self.samples = 0
+
+    def update(self, distance, now: float) -> bool:
+        """
+        Añade una lectura cruda.
+
+        Args:
+            distance: Distancia en cm, o None si se perdió el eco
+            now: Instante de la lectura en segundos (reloj monótono)
+
+        Returns:
+            Presencia tras la lectura
+        """
+        self.samples += 1
+        if distance is None or distance > MAX_RANGE_CM:
+            distance = MAX_RANGE_CM
+        self.readings.append(distance)
+        if len(self.readings) > self.window:
+            del self.readings[0]
+
+        median = statistics.median(self.readings)
+        if self.distance is None:
+            self.distance = median
+        else:
+            self.distance += self.alpha * (median - self.distance)
+
+        if not self.present:
+            if self.distance < self.enter_cm:
+                self.present = True
+                self.leaving_since = None
+        elif self.distance > self.exit_cm:
+            if self.leaving_since is None:
+                self.leaving_since = now
+            elif now - self.leaving_since >= self.exit_dwell:
+                self.present = False
+                self.leaving_since = None
+        else:
+            self.leaving_since = None
+        return self.present
+
+    def interval(self) -> float:
+        """Segundos hasta la siguiente lectura"""
+        if self.leaving_since is not None:
+            return APPROACH_INTERVAL
+        if self.present:
+            return PRESENT_INTERVAL
+        if self.distance is not None and self.distance < self.approach_cm:
+            return APPROACH_INTERVAL
+        return IDLE_INTERVAL
+
+
+def load_trace(path: str):
+    """Traza CSV con columnas t,distance (distance vacía = eco perdido)"""
+    trace = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            value = row["distance"].strip()
+            trace.append((float(row["t"]), float(value) if value else None))
+    trace.sort(key=lambda sample: sample[0])
+    return trace
+
+
+def save_trace(path: str, trace):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["t", "distance"])
+        for t, distance in trace:
+            writer.writerow([f"{t:.3f}", "" if distance is None else f"{distance:.1f}"])
+
+
+def replay(trace, estimator, interval=None):
+    """
+    Reproduce una traza por el estimador sin esperar.
+
+    En cada paso se lee la muestra grabada más reciente y se avanza el tiempo
+    lo que pida el estimador (o `interval` fijo).
+
+    Returns:
+        (transiciones [(t, presente)], lecturas tomadas)
+    """
+    if not trace:
+        return [], 0
+    times = [t for t, _ in trace]
+    t, end = times[0], times[-1]
+    was_present = estimator.present
+    transitions = []
+    samples = 0
+    while t <= end:
+        index = bisect.bisect_right(times, t) - 1
+        present = estimator.update(trace[index][1], t)
+        samples += 1
+        if present != was_present:
+            transitions.append((t, present))
+            was_present = present
+        t += interval if interval else estimator.interval()
+    return transitions, samples
@@ -0,0 +1,168 @@
+"""
+Máquina de estados de una sesión del test, independiente de Tkinter.
+
+SessionEngine lleva las rondas de colores y de láminas Ishihara, la puntuación
+y la evaluación final. La interfaz Tk solo la consulta y le pasa las
+respuestas; también puede manejarse por programa (``run``) con respuestas
+guionizadas, lo que permite simular miles de sesiones por segundo sin
+pantalla, p. ej. para probar cambios de puntuación o cargar el envío de
+reportes.
+
+Fases: waiting -> colors -> ishihara -> results
+"""
+
+import random
+
+PHASES = ("waiting", "colors", "ishihara", "results")
+
+DEFAULT_COLOR_ATTEMPTS = 8
+
+# Umbrales sobre el porcentaje de aciertos
+PASS_THRESHOLD = 75     # Resultado satisfactorio (LED verde, servo) y etiquetas en verde
+NORMAL_THRESHOLD = 85   # Visión cromática normal
+MILD_THRESHOLD = 65     # Posible deficiencia leve; por debajo, consulta
+
+
+def percentage(score: int, attempts: int) -> float:
+    return (score / attempts) * 100 if attempts > 0 else 0.0
+
+
+def evaluate(overall_percentage: float) -> str:
+    """Evaluación final: "normal", "mild" o "consult" """
+    if overall_percentage >= NORMAL_THRESHOLD:
+        return "normal"
+    if overall_percentage >= MILD_THRESHOLD:
+        return "mild"
+    return "consult"
+
+
+class SessionEngine:
+    """Estado y puntuación de una sesión (colores + Ishihara)"""
+
+    def __init__(self, color_names, plates=(), color_attempts: int = DEFAULT_COLOR_ATTEMPTS, rng=None):
+        """
+        Args:
+            color_names: Nombres de los colores del test de colores
+            plates: Dicts de lámina con "correct_answer" y "options"
+            color_attempts: Rondas del test de colores
+            rng: random.Random para elegir colores (reproducible en pruebas)
+        """
+        self.color_names = list(color_names)
+        self.plates = list(plates)
+        self.color_attempts = color_attempts
+        self.rng = rng or random.Random()
+        self.phase = "waiting"
+        self._reset()
+
+    def _reset(self):
+        self.color_attempt = 0
+        self.color_score = 0
+        self.ishihara_attempt = 0
+        self.ishihara_score = 0
+        self.current_color = None
+        self.answers = []
+
+    @property
+    def ishihara_attempts(self) -> int:
+        return len(self.plates)
+
+    @property
+    def current_plate(self):
+        """Lámina de la ronda actual, o None fuera de la fase ishihara"""
+        if self.phase == "ishihara" and self.ishihara_attempt < len(self.plates):
+            return self.plates[self.ishihara_attempt]
+        return None
+
+    def set_plates(self, plates):
+        """Cambia el juego de láminas (solo entre sesiones)"""
+        self.plates = list(plates)
+
+    def start(self):
+        """Comienza una sesión nueva por el test de colores"""
+        self._reset()
+        self.phase = "colors"
+        self._next_color()
+
+    def abort(self):
+        """El usuario se fue: vuelve a la espera"""
+        self.phase = "waiting"
+        self.current_color = None
+
+    def answer(self, value) -> bool:
+        """
+        Registra la respuesta de la ronda actual y avanza a la siguiente.
+
+        Returns:
+            True si la respuesta es correcta
+        """
+        if self.phase == "colors":
+            expected = self.current_color
+            correct = value == expected
+            self.color_score += correct
+            self.color_attempt += 1
+            self.answers.append(("colors", expected, value, correct))
+            self._next_color()
+        elif self.phase == "ishihara":
+            expected = self.current_plate["correct_answer"]
+            correct = value == expected
+            self.ishihara_score += correct
+            self.answers.append(("ishihara", expected, value, correct))
+            self._next_plate()
+        else:
+            raise RuntimeError(f"No se esperan respuestas en la fase {self.phase}")
+        return correct
+
+    def skip(self):
+        """Salta la ronda actual sin puntuar (p. ej. lámina sin imagen)"""
+        if self.phase == "colors":
+            self.color_attempt += 1
+            self._next_color()
+        elif self.phase == "ishihara":
+            self._next_plate()
+
+    def _next_color(self):
+        if self.color_attempt < self.color_attempts:
+            self.current_color = self.rng.choice(self.color_names)
+            return
+        self.current_color = None
+        self.ishihara_attempt = 0
+        self.phase = "ishihara" if self.plates else "results"
+
+    def _next_plate(self):
+        self.ishihara_attempt += 1
+        if self.ishihara_attempt >= len(self.plates):
+            self.phase = "results"
+
+    def results(self) -> dict:
+        """Puntuaciones, porcentajes y evaluación (mismas claves que el reporte PDF)"""
+        overall = percentage(self.color_score + self.ishihara_score,
+                             self.color_attempts + self.ishihara_attempts)
+        return {
+            "color_score": self.color_score,
+            "color_attempts": self.color_attempts,
+            "ishihara_score": self.ishihara_score,
+            "ishihara_attempts": self.ishihara_attempts,
+            "color_percentage": percentage(self.color_score, self.color_attempts),
+            "ishihara_percentage": percentage(self.ishihara_score, self.ishihara_attempts),
+            "overall_percentage": overall,
+            "satisfactory": overall >= PASS_THRESHOLD,
+            "evaluation": evaluate(overall),
+        }
+
+    def run(self, color_answer, plate_answer) -> dict:
+        """
+        Ejecuta una sesión completa con respuestas guionizadas.
+
+        Args:
+            color_answer: color_answer(color_pedido) -> nombre elegido
+            plate_answer: plate_answer(lámina) -> opción elegida
+
+        Returns:
+            results() al terminar
+        """
+        self.start()
+        while self.phase == "colors":
+            self.answer(color_answer(self.current_color))
+        while self.phase == "ishihara":
+            self.answer(plate_answer(self.current_plate))
+        return self.results()
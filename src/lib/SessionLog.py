@@ -0,0 +1,405 @@
+"""
+Grabación y reproducción de la actividad del kiosco.
+
+SessionRecorder escribe en un log binario compacto la línea de tiempo de un
+día: lecturas del sensor, pulsaciones, callbacks de ``root.after``, órdenes
+al hilo de hardware y marcas de la sesión (rondas, láminas, abortos,
+resultados). Cada registro es un byte de tipo, el tiempo desde el registro
+anterior en µs (varint) y sus datos; los textos se guardan una sola vez y
+después se citan por número. Una lectura del sensor ocupa unos 7 bytes.
+
+SessionReplay reproduce un log sin pantalla con las mismas piezas que la
+interfaz (PresenceEstimator, InputPipeline, SessionEngine) sobre el tiempo
+grabado, lo más rápido posible o a ``speed`` veces el tiempo real, y compara
+los resultados obtenidos con los grabados (scripts/reproducir_sesiones.py).
+
+Las sesiones empiezan, se abortan y terminan donde lo hicieron en el kiosco:
+en las marcas start, abort y results. La marca start lleva la semilla con la
+que la sesión eligió los colores. Cada pulsación guarda el manejador que la
+recibió (colors, ishihara o restart) y la pantalla que mostraba la interfaz
+en ese momento, así que se filtra igual que en dalton.py: sin usuario
+delante, fuera de su pantalla o de su fase, o repetida en la misma ronda.
+Las lecturas del sensor solo sirven para saber si había alguien delante y
+para comprobar que las marcas start y abort concuerdan con la presencia.
+"""
+
+import json
+import math
+import os
+import random
+import struct
+import threading
+import time
+from collections import Counter, namedtuple
+
+from lib.InputPipeline import DEFAULT_DEBOUNCE_MS, InputPipeline
+from lib.LoopMonitor import DEFAULT_LATENCY_LOG
+from lib.Presence import PresenceEstimator
+from lib.Session import SessionEngine
+
+DEFAULT_SESSION_DIR = os.path.join(os.path.dirname(DEFAULT_LATENCY_LOG), "sesiones")
+
+MAGIC = b"DLOG"
+VERSION = 2     # v2: las pulsaciones llevan también la pantalla visible
+_HEADER = struct.Struct("<4sBdI")   # magic, versión, hora de inicio (epoch), semilla
+_FLOAT = struct.Struct("<f")
+
+# Tipos de registro
+STRING, DISTANCE, TAP, AFTER, COMMAND, MARK = range(6)
+KINDS = {DISTANCE: "distance", TAP: "tap", AFTER: "after", COMMAND: "command", MARK: "mark"}
+
+LogEvent = namedtuple("LogEvent", "t kind data")
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _read_varint(data, pos):
+    shift = result = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def default_log_path() -> str:
+    return os.path.join(DEFAULT_SESSION_DIR, time.strftime("%Y%m%d-%H%M%S") + ".dlog")
+
+
+class SessionRecorder:
+    """Escribe la línea de tiempo del kiosco (seguro entre hilos)"""
+
+    def __init__(self, path: str, clock=time.monotonic, seed: int = None):
+        """
+        Args:
+            path: Archivo .dlog (se crea el directorio si hace falta)
+            clock: Reloj monótono en segundos
+            seed: Semilla base de las sesiones (aleatoria si no se da)
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.clock = clock
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.sessions = 0
+        self.records = 0
+        self._origin = clock()
+        self._last_us = 0
+        self._strings = {}
+        self._lock = threading.Lock()
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, time.time(), self.seed))
+        self._original_after = None
+
+    def session_seed(self) -> int:
+        """Semilla de la siguiente sesión (la reproducción usa la misma)"""
+        with self._lock:
+            seed = self.seed + self.sessions
+            self.sessions += 1
+            return seed
+
+    def _string_id(self, text) -> bytes:
+        # Con el cerrojo tomado: define el texto la primera vez que aparece
+        text = str(text)
+        index = self._strings.get(text)
+        if index is None:
+            index = self._strings[text] = len(self._strings)
+            encoded = text.encode("utf-8")
+            self._file.write(bytes([STRING]) + _varint(index) + _varint(len(encoded)) + encoded)
+        return _varint(index)
+
+    def _write(self, kind, *parts, flush=False):
+        with self._lock:
+            if self._file is None:
+                return
+            t_us = int((self.clock() - self._origin) * 1_000_000)
+            delta = max(0, t_us - self._last_us)
+            self._last_us += delta
+            try:
+                payload = b"".join(part if isinstance(part, bytes) else self._string_id(part) for part in parts)
+                self._file.write(bytes([kind]) + _varint(delta) + payload)
+                self.records += 1
+                if flush:
+                    self._file.flush()
+            except OSError as e:
+                # Disco lleno o similar: dejar de grabar sin afectar al kiosco
+                print(f"[ERROR] Grabación de sesiones detenida: {e}")
+                self._file.close()
+                self._file = None
+
+    def distance(self, cm):
+        """Lectura del sensor en cm (None = eco perdido)"""
+        self._write(DISTANCE, _FLOAT.pack(math.nan if cm is None else cm))
+
+    def tap(self, handler: str, screen: str, value=None):
+        """
+        Pulsación tal como llega al manejador (antes de filtrarla).
+
+        Args:
+            handler: "colors", "ishihara" o "restart"
+            screen: Pantalla visible (current_test de la interfaz)
+            value: Respuesta elegida
+        """
+        # En JSON: las láminas mezclan respuestas numéricas y de texto
+        self._write(TAP, handler, screen, json.dumps(value))
+
+    def after(self, name: str):
+        self._write(AFTER, name)
+
+    def command(self, command):
+        """Orden enviada al hilo de hardware (lib/Hardware.py)"""
+        self._write(COMMAND, command.channel, _varint(max(0, command.priority)), command.name)
+
+    def mark(self, name: str, payload=""):
+        """Marca de la sesión; se vuelca a disco en el acto"""
+        self._write(MARK, name, payload, flush=True)
+
+    def install(self, root):
+        """Envuelve root.after para anotar cada callback al ejecutarse"""
+        if self._original_after is not None:
+            return
+        self._original_after = root.after
+
+        def after(ms, func=None, *args):
+            if func is None:
+                return self._original_after(ms)
+            name = getattr(func, "__name__", "callback")
+
+            def recorded(*call_args):
+                self.after(name)
+                return func(*call_args)
+            return self._original_after(ms, recorded, *args)
+        root.after = after
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_log(path: str):
+    """
+    Lee un log completo.
+
+    Returns:
+        (cabecera {"start", "seed"}, [LogEvent(t en s, tipo, datos)])
+
+    Raises:
+        ValueError: si el archivo no es un log de sesiones
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Log de sesiones no válido: {path}")
+    magic, version, start, seed = _HEADER.unpack_from(data)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"Log de sesiones no válido: {path}")
+
+    strings = {}
+    events = []
+    pos = _HEADER.size
+    t_us = 0
+    try:
+        while pos < len(data):
+            kind = data[pos]
+            pos += 1
+            if kind == STRING:
+                index, pos = _read_varint(data, pos)
+                length, pos = _read_varint(data, pos)
+                strings[index] = data[pos:pos + length].decode("utf-8")
+                pos += length
+                continue
+            delta, pos = _read_varint(data, pos)
+            t_us += delta
+            if kind == DISTANCE:
+                (cm,) = _FLOAT.unpack_from(data, pos)
+                pos += _FLOAT.size
+                fields = (None if math.isnan(cm) else cm,)
+            elif kind == TAP:
+                a, pos = _read_varint(data, pos)
+                screen = None   # v1 no guardaba la pantalla visible
+                if version >= 2:
+                    b, pos = _read_varint(data, pos)
+                    screen = strings[b]
+                c, pos = _read_varint(data, pos)
+                fields = (strings[a], screen, json.loads(strings[c]))
+            elif kind == MARK:
+                a, pos = _read_varint(data, pos)
+                b, pos = _read_varint(data, pos)
+                fields = (strings[a], strings[b])
+            elif kind == AFTER:
+                a, pos = _read_varint(data, pos)
+                fields = (strings[a],)
+            elif kind == COMMAND:
+                channel, pos = _read_varint(data, pos)
+                priority, pos = _read_varint(data, pos)
+                name, pos = _read_varint(data, pos)
+                fields = (strings[channel], priority, strings[name])
+            else:
+                raise ValueError(f"Tipo de registro desconocido: {kind}")
+            events.append(LogEvent(t_us / 1_000_000, KINDS[kind], fields))
+    except (IndexError, struct.error):
+        # Último registro cortado (corte de luz): se usa lo leído hasta ahí
+        print(f"[REPLAY] Log truncado en el byte {pos}: {path}")
+    return {"start": start, "seed": seed, "version": version}, events
+
+
+class SessionReplay:
+    """Reproduce un log con la lógica de la interfaz, sin pantalla ni hardware"""
+
+    def __init__(self, color_names, seed: int = 0, presence: PresenceEstimator = None,
+                 debounce_ms: int = DEFAULT_DEBOUNCE_MS, speed: float = None, sleep=time.sleep,
+                 realtime=time.monotonic):
+        """
+        Args:
+            color_names: Colores del test de colores (los de dalton.py)
+            seed: Semilla base de la cabecera del log (para marcas start sin semilla)
+            presence: Estimador de presencia (por defecto, el de la interfaz)
+            speed: Veces el tiempo real (None = lo más rápido posible)
+        """
+        self.now = 0.0
+        self.seed = seed
+        self.speed = speed
+        self.sleep = sleep
+        self.realtime = realtime
+        self.presence = presence or PresenceEstimator()
+        self.input = InputPipeline(debounce_ms=debounce_ms, clock=lambda: self.now)
+        self.session = SessionEngine(color_names)
+        self.screen = "waiting"     # current_test de la interfaz
+        self.sensor = False         # Sin lecturas (--no-sensor) siempre hay usuario
+        self.sessions = 0
+        self.aborted = 0
+        self.restarts = 0
+        self.results = []
+        self.gated = 0      # Pulsaciones sin usuario delante o fuera de su pantalla
+        self.presence_mismatches = 0    # start/abort que no concuerdan con la presencia reproducida
+        self.counts = Counter()
+        self.recorded = {"start": 0, "abort": 0, "results": []}
+
+    @property
+    def active(self) -> bool:
+        return self.session.phase in ("colors", "ishihara")
+
+    @property
+    def user_nearby(self) -> bool:
+        return self.presence.present if self.sensor else True
+
+    def run(self, events) -> dict:
+        """Reproduce los eventos en orden y devuelve summary()"""
+        wall_start = self.realtime()
+        t0 = events[0].t if events else 0.0
+        for event in events:
+            if self.speed:
+                wait = (event.t - t0) / self.speed - (self.realtime() - wall_start)
+                if wait > 0:
+                    self.sleep(wait)
+            self.feed(event)
+        summary = self.summary()
+        summary["virtual_s"] = round(events[-1].t - t0, 3) if events else 0.0
+        summary["wall_s"] = round(self.realtime() - wall_start, 3)
+        return summary
+
+    def feed(self, event: LogEvent):
+        """Aplica un evento (sin esperar)"""
+        self.now = event.t
+        self.counts[event.kind] += 1
+        getattr(self, f"_on_{event.kind}")(*event.data)
+
+    def _on_distance(self, cm):
+        self.sensor = True
+        self.presence.update(cm, self.now)
+
+    def _on_tap(self, handler, screen, value):
+        if handler == "restart":
+            # Botón de la pantalla de resultados: vuelve a la espera; sin
+            # sensor la interfaz empieza en el acto (llega una marca start)
+            self.restarts += 1
+            self.screen = "waiting"
+            self.input.close()
+            return
+        # Mismo filtro que los manejadores de dalton.py
+        screen = self.screen if screen is None else screen
+        if not self.user_nearby or screen != handler or self.session.phase != handler:
+            self.gated += 1
+            return
+        attempt = self.session.color_attempt if handler == "colors" else self.session.ishihara_attempt
+        if self.input.accept(handler, (handler, attempt)) is None:
+            return
+        self.session.answer(value)
+        if self.session.phase == "results":
+            self.results.append(self.session.results())
+
+    def _on_after(self, name):
+        pass
+
+    def _on_command(self, channel, priority, name):
+        self.counts[f"command:{channel}"] += 1
+
+    def _on_mark(self, name, payload):
+        if name == "start":
+            self.recorded["start"] += 1
+            if self.sensor and not self.presence.present:
+                self.presence_mismatches += 1
+            seed = int(payload) if payload else self.seed + self.sessions
+            self.session.rng.seed(seed)
+            self.sessions += 1
+            self.screen = "colors"
+        elif name == "plates":
+            # Se graba justo tras start y antes de empezar la sesión
+            self.session.set_plates(json.loads(payload))
+            self.session.start()
+        elif name == "round":
+            screen, attempt = payload.split(":")
+            self.screen = screen
+            self.input.open_round((screen, int(attempt)))
+        elif name == "skip":
+            self.session.skip()
+        elif name == "abort":
+            self.recorded["abort"] += 1
+            if self.sensor and self.presence.present:
+                self.presence_mismatches += 1
+            self.session.abort()
+            self.input.close()
+            self.screen = "waiting"
+            self.aborted += 1
+        elif name == "results":
+            self.recorded["results"].append(json.loads(payload))
+            self.input.close()
+            self.screen = "results"
+
+    def mismatches(self):
+        """Diferencias entre los resultados reproducidos y los grabados"""
+        found = []
+        recorded = self.recorded["results"]
+        for i in range(max(len(recorded), len(self.results))):
+            got = self.results[i] if i < len(self.results) else None
+            want = recorded[i] if i < len(recorded) else None
+            if got is None or want is None or any(got.get(key) != value for key, value in want.items()):
+                found.append({"index": i, "recorded": want, "replayed": got})
+        return found
+
+    def summary(self) -> dict:
+        return {
+            "sessions": self.sessions,
+            "completed": len(self.results),
+            "aborted": self.aborted,
+            "restarts": self.restarts,
+            "recorded_sessions": self.recorded["start"],
+            "recorded_aborts": self.recorded["abort"],
+            "recorded_completed": len(self.recorded["results"]),
+            "taps": self.counts["tap"],
+            "gated": self.gated,
+            "presence_mismatches": self.presence_mismatches,
+            "input": self.input.stats(),
+            "events": dict(self.counts),
+            "mismatches": self.mismatches(),
+        }
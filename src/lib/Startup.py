@@ -0,0 +1,125 @@
+"""
+Arranque progresivo: perfil de tiempos por fase e imports en segundo plano.
+
+La ventana y la pantalla de espera se muestran primero; lo pesado (numpy,
+carga de láminas, el módulo de reportes con reportlab/Telegram) llega
+después del primer pintado, en hilos aparte. StartupProfiler anota cuánto
+tarda cada fase (``--profile-startup`` en dalton.py) y BackgroundImport
+importa un módulo en un hilo para que nadie espere por él hasta que lo usa.
+"""
+
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Tiempos de las fases del arranque, relativos a un origen común"""
+
+    def __init__(self, enabled: bool = True, origin: float = None, clock=time.perf_counter):
+        """
+        Args:
+            enabled: Si es False, mark/phase no anotan nada
+            origin: Instante cero (por defecto, ahora)
+            clock: Reloj en segundos
+        """
+        self.enabled = enabled
+        self.clock = clock
+        self.origin = clock() if origin is None else origin
+        self.phases = []  # (nombre, inicio, duración) en segundos desde el origen
+        self._last_mark = self.origin
+        self._lock = threading.Lock()
+
+    def mark(self, name: str):
+        """Cierra una fase del hilo principal: desde la marca anterior hasta ahora"""
+        if not self.enabled:
+            return
+        now = self.clock()
+        self._record(name, self._last_mark, now)
+        self._last_mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mide un bloque, también desde otros hilos"""
+        if not self.enabled:
+            yield
+            return
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self._record(name, start, self.clock())
+
+    def _record(self, name, start, end):
+        with self._lock:
+            self.phases.append((name, start - self.origin, end - start))
+
+    def report(self) -> list:
+        """[{phase, start_ms, ms}] ordenado por inicio"""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        return [
+            {"phase": name, "start_ms": round(start * 1000, 1), "ms": round(duration * 1000, 1)}
+            for name, start, duration in phases
+        ]
+
+    def print_report(self):
+        if not self.enabled:
+            return
+        print("[STARTUP] Fase                    inicio    duración")
+        for entry in self.report():
+            print(f"[STARTUP] {entry['phase']:<22} {entry['start_ms']:>7.1f}ms {entry['ms']:>8.1f}ms")
+
+
+class BackgroundImport:
+    """Importa un módulo en un hilo aparte; get() espera solo si aún no terminó"""
+
+    def __init__(self, module_name: str, profiler: StartupProfiler = None):
+        self.module_name = module_name
+        self.profiler = profiler
+        self.module = None
+        self.error = None
+        self._thread = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Lanza la importación (idempotente)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._import, daemon=True)
+                self._thread.start()
+        return self
+
+    def _import(self):
+        try:
+            if self.profiler:
+                with self.profiler.phase(f"import {self.module_name}"):
+                    self.module = importlib.import_module(self.module_name)
+            else:
+                self.module = importlib.import_module(self.module_name)
+        except Exception as e:
+            self.error = e
+            print(f"[WARNING] Módulo {self.module_name} no disponible: {e}")
+        finally:
+            self._done.set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def failed(self) -> bool:
+        """True si la importación terminó con error"""
+        return self.done() and self.module is None
+
+    def get(self, timeout: float = None):
+        """
+        Devuelve el módulo, esperando a que termine de importarse.
+
+        Returns:
+            El módulo, o None si falló o no terminó dentro de `timeout`
+        """
+        self.start()
+        self._done.wait(timeout)
+        return self.module
@@ -0,0 +1,192 @@
+"""
+Medición de distancia con el sensor ultrasónico HC-SR04 sin espera activa.
+
+UltrasonicSensor registra los flancos del pin ECHO con la detección de
+eventos de RPi.GPIO: tras el pulso de disparo el hilo que mide se bloquea en
+un ``threading.Event`` (CPU prácticamente nula) hasta que llegan los dos
+flancos del eco o vence el tiempo límite. Cada muestra tarda como mucho
+``timeout`` segundos; un eco perdido devuelve None en lugar de colgar el
+hilo del sensor.
+
+Si el kernel no permite la detección de flancos en el pin se usa un sondeo
+acotado por el mismo tiempo límite.
+
+SimulatedUltrasonic ofrece la misma interfaz sin hardware (pruebas, modo
+``--no-sensor``).
+"""
+
+import threading
+import time
+
+SPEED_OF_SOUND_CM_S = 34300
+TRIGGER_PULSE_S = 0.00001
+# 30 ms: eco de ~5 m, por encima del alcance útil del HC-SR04 (4 m)
+DEFAULT_TIMEOUT = 0.03
+
+
+def pulse_to_cm(seconds: float) -> float:
+    """Distancia en cm para un pulso de eco (ida y vuelta)"""
+    return seconds * SPEED_OF_SOUND_CM_S / 2
+
+
+class UltrasonicSensor:
+    """HC-SR04 medido por flancos del pin ECHO, con tiempo límite por muestra"""
+
+    def __init__(self, gpio, trig_pin: int, echo_pin: int, timeout: float = DEFAULT_TIMEOUT,
+                 clock=time.perf_counter, sleep=time.sleep):
+        """
+        Args:
+            gpio: Módulo RPi.GPIO (ya en modo BCM y con los pines configurados)
+            trig_pin: Pin de disparo (salida)
+            echo_pin: Pin de eco (entrada)
+            timeout: Espera máxima del eco en segundos
+            clock: Reloj monótono en segundos
+            sleep: Función de espera (para el pulso de disparo)
+        """
+        self.gpio = gpio
+        self.trig_pin = trig_pin
+        self.echo_pin = echo_pin
+        self.timeout = timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.edge_detect = False
+        self.samples = 0
+        self.timeouts = 0
+        self._edges = []
+        self._armed = False
+        self._echo = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Activa la detección de flancos; si no es posible se usará sondeo"""
+        try:
+            self.gpio.add_event_detect(self.echo_pin, self.gpio.BOTH, callback=self._on_edge)
+            self.edge_detect = True
+        except Exception as e:
+            print(f"[SENSOR] Detección de flancos no disponible, usando sondeo acotado: {e}")
+            self.edge_detect = False
+        return self
+
+    def close(self):
+        if self.edge_detect:
+            try:
+                self.gpio.remove_event_detect(self.echo_pin)
+            except Exception:
+                pass
+            self.edge_detect = False
+
+    def _on_edge(self, channel):
+        # Hilo de eventos de RPi.GPIO: el primer flanco tras el disparo es la
+        # subida del eco y el segundo la bajada
+        now = self.clock()
+        with self._lock:
+            if not self._armed:
+                return
+            self._edges.append(now)
+            if len(self._edges) >= 2:
+                self._armed = False
+                self._echo.set()
+
+    def _trigger(self):
+        self.gpio.output(self.trig_pin, True)
+        self.sleep(TRIGGER_PULSE_S)
+        self.gpio.output(self.trig_pin, False)
+
+    def measure(self):
+        """
+        Toma una muestra.
+
+        Returns:
+            Distancia en cm, o None si no llegó el eco a tiempo
+        """
+        self.samples += 1
+        pulse = self._measure_edges() if self.edge_detect else self._measure_polled()
+        if pulse is None:
+            self.timeouts += 1
+            return None
+        return pulse_to_cm(pulse)
+
+    def _measure_edges(self):
+        with self._lock:
+            self._edges = []
+            self._armed = True
+            self._echo.clear()
+        self._trigger()
+        got_echo = self._echo.wait(self.timeout)
+        with self._lock:
+            self._armed = False
+            edges = self._edges
+        if not got_echo or len(edges) < 2:
+            return None
+        pulse = edges[1] - edges[0]
+        # Un eco más largo que el límite es el pulso de "sin eco" del sensor
+        return pulse if pulse <= self.timeout else None
+
+    def _measure_polled(self):
+        self._trigger()
+        deadline = self.clock() + self.timeout
+        start = self.clock()
+        while self.gpio.input(self.echo_pin) == 0:
+            start = self.clock()
+            if start > deadline:
+                return None
+        stop = start
+        while self.gpio.input(self.echo_pin) == 1:
+            stop = self.clock()
+            if stop > deadline:
+                return None
+        return stop - start
+
+
+class SimulatedUltrasonic:
+    """Sensor simulado: misma interfaz que UltrasonicSensor"""
+
+    def __init__(self, distances=30.0, timeout: float = DEFAULT_TIMEOUT, realtime: bool = False, sleep=time.sleep):
+        """
+        Args:
+            distances: Distancia fija, secuencia de distancias (se repite la
+                última al agotarse) o función sin argumentos. None en una
+                muestra simula un eco perdido.
+            timeout: Tiempo límite simulado para los ecos perdidos
+            realtime: Si es True, cada muestra tarda lo que tardaría el eco real
+            sleep: Función de espera
+        """
+        self.timeout = timeout
+        self.realtime = realtime
+        self.sleep = sleep
+        self.edge_detect = True
+        self.samples = 0
+        self.timeouts = 0
+        self._last = None
+        if callable(distances):
+            self._next = distances
+        elif isinstance(distances, (int, float)):
+            self._next = lambda: distances
+        else:
+            self._iter = iter(distances)
+            self._next = self._next_from_sequence
+
+    def _next_from_sequence(self):
+        try:
+            self._last = next(self._iter)
+        except StopIteration:
+            pass
+        return self._last
+
+    def start(self):
+        return self
+
+    def close(self):
+        pass
+
+    def measure(self):
+        self.samples += 1
+        distance = self._next()
+        if distance is None:
+            self.timeouts += 1
+            if self.realtime:
+                self.sleep(self.timeout)
+            return None
+        if self.realtime:
+            self.sleep(min(self.timeout, distance * 2 / SPEED_OF_SOUND_CM_S))
+        return float(distance)
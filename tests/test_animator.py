@@ -0,0 +1,104 @@
+"""
+Tests unitarios para el planificador central de animaciones.
+"""
+
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.Animator import Animator
+
+
+class FakeClock:
+    """Reloj manual en segundos"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRoot:
+    """Raíz mínima con un único temporizador ejecutable a demanda"""
+
+    def __init__(self):
+        self.timers = {}
+        self.next_id = 0
+
+    def after(self, ms, func):
+        self.next_id += 1
+        self.timers[self.next_id] = (ms, func)
+        return self.next_id
+
+    def after_cancel(self, timer_id):
+        self.timers.pop(timer_id, None)
+
+    def fire(self):
+        timer_id = min(self.timers)
+        _, func = self.timers.pop(timer_id)
+        func()
+
+
+class TestAnimator(unittest.TestCase):
+    """Tests para Animator."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.root = FakeRoot()
+        self.animator = Animator(self.root, fps=20, clock=self.clock)
+        self.widget = object()
+
+    def test_single_timer_for_many_animations(self):
+        """Varias animaciones comparten un único temporizador pendiente."""
+        for channel in ("fg", "relief", "font"):
+            self.animator.animate(self.widget, channel, 0.5, lambda p: None)
+        self.assertEqual(len(self.root.timers), 1)
+
+    def test_same_channel_replaces_previous(self):
+        """Un nuevo fade en el mismo canal sustituye al anterior."""
+        done = []
+        self.animator.animate(self.widget, "fg", 0.5, on_done=lambda: done.append("viejo"))
+        self.animator.animate(self.widget, "fg", 0.5, on_done=lambda: done.append("nuevo"))
+        self.clock.now = 1.0
+        self.root.fire()
+        self.assertEqual(done, ["nuevo"])
+        self.assertEqual(self.root.timers, {})  # Sin animaciones, el reloj se detiene
+
+    def test_progress_uses_elapsed_time_and_drops_frames(self):
+        """Con el bucle atrasado se salta al progreso real."""
+        progress = []
+        self.animator.animate(self.widget, "fg", 1.0, progress.append)
+        self.clock.now = 0.0
+        self.root.fire()
+        self.clock.now = 0.6  # 12 fotogramas tarde
+        self.root.fire()
+        self.assertAlmostEqual(progress[-1], 0.6)
+        self.assertGreater(self.animator.dropped, 0)
+
+    def test_cancel_with_finish_applies_final_state(self):
+        """Al cambiar de pantalla las animaciones terminan en su estado final."""
+        state = []
+        self.animator.later(self.widget, "style", 0.4, lambda: state.append("raised"))
+        self.animator.cancel_all(finish=True)
+        self.assertEqual(state, ["raised"])
+        self.assertEqual(self.root.timers, {})
+
+    def test_failing_step_is_dropped(self):
+        """Un widget destruido no detiene el resto de animaciones."""
+        def broken(progress):
+            raise RuntimeError("widget destruido")
+
+        other = []
+        self.animator.animate(self.widget, "fg", 1.0, broken)
+        self.animator.animate(self.widget, "font", 1.0, other.append)
+        self.clock.now = 0.1
+        self.root.fire()
+        self.assertEqual(list(self.animator.animations), [(self.widget, "font")])
+        self.assertEqual(len(other), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
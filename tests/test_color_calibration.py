@@ -0,0 +1,75 @@
+"""
+Tests unitarios para la calibración de color por LUT 3D.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.ColorCalibration import ColorLUT, fit_lut, patch_targets
+from lib.PlateCache import PlateRenderCache
+from lib.PlateGenerator import linear_to_srgb, srgb_to_linear
+
+# Panel simulado: cruce entre canales y gamma algo distinta a sRGB
+PANEL_MATRIX = np.array([[0.9, 0.08, 0.02], [0.05, 0.85, 0.1], [0.0, 0.05, 0.92]])
+
+
+def panel(rgb):
+    return linear_to_srgb(srgb_to_linear(rgb) ** 1.1 @ PANEL_MATRIX.T + 0.005)
+
+
+class TestColorLUT(unittest.TestCase):
+    """Tests para ColorLUT y fit_lut."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_identity_lut(self):
+        """La LUT identidad no altera imágenes ni colores de la paleta."""
+        lut = ColorLUT.identity()
+        pixels = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+        out = np.asarray(lut.apply_image(Image.fromarray(pixels)))
+        self.assertLessEqual(np.abs(out.astype(int) - pixels).max(), 1)
+        self.assertEqual(lut.apply_hex("#FFA500"), "#FFA500")
+
+    def test_save_and_load(self):
+        """La LUT guardada se recupera con la misma huella."""
+        path = os.path.join(self.temp_dir, "calibration.npz")
+        lut = ColorLUT.identity(9)
+        lut.save(path)
+        self.assertEqual(ColorLUT.load(path).fingerprint, lut.fingerprint)
+        self.assertIsNone(ColorLUT.load(os.path.join(self.temp_dir, "no_existe.npz")))
+
+    def test_fit_corrects_panel(self):
+        """La LUT ajustada compensa el panel simulado dentro de su gama."""
+        targets = np.array(patch_targets(5))
+        measured = np.round(panel(targets / 255.0) * 255.0)
+        lut = fit_lut(targets, measured)
+
+        colors = np.random.default_rng(1).uniform(0.3, 0.7, (500, 3))
+        before = np.abs(panel(colors) - colors).mean()
+        after = np.abs(panel(lut.apply(colors)) - colors).mean()
+        self.assertLess(after, before / 3)
+
+    def test_render_cache_key_includes_lut(self):
+        """Las láminas horneadas con otra LUT no reutilizan entradas."""
+        source = os.path.join(self.temp_dir, "12.png")
+        Image.new("RGB", (50, 50), (200, 100, 50)).save(source)
+        plain = PlateRenderCache(os.path.join(self.temp_dir, "cache"))
+        calibrated = PlateRenderCache(os.path.join(self.temp_dir, "cache"), lut=ColorLUT.identity())
+        self.assertNotEqual(plain.key(source, 40), calibrated.key(source, 40))
+        self.assertEqual(calibrated.warm([source], 40), 1)
+        self.assertEqual(calibrated.warm([source], 40), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests unitarios para el simulador de deficiencias de visión del color.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.CvdSimulation import (
+    ANALYSIS_SIZE, DEFICIENCIES, MODELS, analyze_library, analyze_plate, plate_metrics, plate_ok, simulate
+)
+from lib.PlateGenerator import IshiharaPlateGenerator
+from lib.PlateManifest import MANIFEST_FILENAME, read_manifest
+from lib.PlateStore import PLATES_CONFIG
+
+IMAGES_DIR = os.path.join(os.path.dirname(__file__), '..', 'assets', 'images')
+
+
+class TestCvdSimulation(unittest.TestCase):
+    """Tests para las simulaciones y métricas de contraste."""
+
+    def test_simulation_keeps_grays(self):
+        """Los grises no cambian con ningún modelo."""
+        grays = np.linspace(0, 1, 5)[:, None].repeat(3, axis=1)
+        for deficiency in DEFICIENCIES:
+            for model in MODELS:
+                np.testing.assert_allclose(simulate(grays, deficiency, model), grays, atol=0.03)
+
+    def test_simulation_preserves_shape(self):
+        """La simulación se aplica a la imagen completa."""
+        image = np.random.default_rng(0).uniform(size=(8, 9, 3))
+        self.assertEqual(simulate(image, "deutan", "brettel").shape, (8, 9, 3))
+        with self.assertRaises(ValueError):
+            simulate(image, "deutan", "otro")
+
+    def test_generated_plate_hidden_for_its_deficiency(self):
+        """Una lámina deutan se ve en visión normal y desaparece en deutan."""
+        image = IshiharaPlateGenerator(256, seed=3, deficiency="deutan").generate(42, "hard")
+        metrics = plate_metrics(image, 42, generated=True)
+        self.assertTrue(metrics["visible_normal"])
+        self.assertTrue(metrics["digit_region_ok"])
+        self.assertIn("deutan", metrics["hidden_for"])
+        self.assertNotIn("tritan", metrics["hidden_for"])
+
+    def test_generated_plates_hidden_at_every_difficulty(self):
+        """Protan y deutan desaparecen para su deficiencia en todas las dificultades."""
+        for deficiency in ("protan", "deutan"):
+            generator = IshiharaPlateGenerator(256, seed=3, deficiency=deficiency)
+            for difficulty in ("easy", "medium", "hard"):
+                metrics = plate_metrics(generator.generate(42, difficulty), 42)
+                self.assertIn(deficiency, metrics["hidden_for"], (deficiency, difficulty))
+
+    def test_generated_plate_validates(self):
+        """Una lámina generada valida como diagnóstico pero no como control."""
+        image = IshiharaPlateGenerator(256, seed=3, deficiency="deutan").generate(42, "hard")
+        metrics = plate_metrics(image, 42, generated=True)
+        self.assertTrue(plate_ok(metrics))
+        self.assertFalse(plate_ok(dict(metrics, control=True)))
+
+    def test_blank_plate_reports_error(self):
+        """Una imagen sin puntos de color se informa como error, sin excepción."""
+        result = analyze_plate({"name": "blanca", "correct": 5,
+                                "source": np.full((64, 64, 3), 255, np.uint8), "size": 64})
+        self.assertIn("error", result)
+
+
+class TestAnalyzeLibrary(unittest.TestCase):
+    """Tests para el análisis de un conjunto de archivos."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        generator = IshiharaPlateGenerator(128, seed=1, deficiency="protan")
+        self.tasks = []
+        for number in (12, 7):
+            path = os.path.join(self.temp_dir, f"{number}.png")
+            Image.fromarray(generator.generate(number, "easy")).save(path)
+            self.tasks.append({"name": str(number), "correct": number, "source": path, "size": 128})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pool_matches_serial(self):
+        """El pool de procesos devuelve lo mismo y en el mismo orden que en serie."""
+        serial = analyze_library(self.tasks, workers=1)
+        pooled = analyze_library(self.tasks, workers=2)
+        self.assertEqual([r["name"] for r in pooled], ["12", "7"])
+        for a, b in zip(serial, pooled):
+            self.assertAlmostEqual(a["normal"], b["normal"])
+
+
+class TestShippedLibrary(unittest.TestCase):
+    """Las láminas reales de assets/images se miden con los mismos umbrales fijos."""
+
+    def test_real_library_report(self):
+        """La 12 valida como control y el resto se juzga solo por ocultación."""
+        entries = read_manifest(os.path.join(IMAGES_DIR, MANIFEST_FILENAME))
+        tasks = [{"name": e["name"], "correct": e["correct"], "size": ANALYSIS_SIZE,
+                  "source": os.path.join(IMAGES_DIR, e["file"]), "control": e.get("control", False)}
+                 for e in entries]
+        results = {r["name"]: r for r in analyze_library(tasks, workers=1)}
+        self.assertEqual(len(results), len(PLATES_CONFIG))
+        self.assertTrue(PLATES_CONFIG["12"]["control"])
+        self.assertTrue(results["12"]["control"])
+        self.assertTrue(plate_ok(results["12"]))
+        for name, result in results.items():
+            # La disposición del generador no se aplica a las láminas reales
+            self.assertIsNone(result["digit_region_ok"], name)
+            self.assertTrue(result["visible_normal"], name)
+            if not result["control"]:
+                self.assertEqual(plate_ok(result), bool(result["hidden_for"]), name)
+
+
+if __name__ == '__main__':
+    unittest.main()
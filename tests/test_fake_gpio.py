@@ -0,0 +1,211 @@
+"""
+Tests unitarios para el GPIO emulado y el reloj virtual.
+"""
+
+import unittest
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib import LedEffects
+from lib.FakeGPIO import FakeGPIO, RealtimeDriver, VirtualClock, run_virtual
+from lib.Hardware import (HardwareWorker, PwmOutputs, PRIORITY_FEEDBACK, PRIORITY_IDLE, PRIORITY_RESULT,
+                          led_blink, led_effect, melody, servo_profile, tone)
+from lib.Melody import MELODIES, compile_schedule, parse
+from lib.Ultrasonic import UltrasonicSensor
+
+TRIG, ECHO = 17, 27
+SERVO, BUZZER, RED, GREEN, BLUE = 18, 23, 24, 25, 16
+
+
+class TestVirtualClock(unittest.TestCase):
+    """Tests para VirtualClock."""
+
+    def test_timers_fire_in_order(self):
+        clock = VirtualClock()
+        fired = []
+        clock.call_at(0.3, lambda: fired.append(("b", clock())))
+        clock.call_later(0.1, lambda: fired.append(("a", clock())))
+        clock.advance(0.2)
+        self.assertEqual(fired, [("a", 0.1)])
+        clock.sleep(1.0)
+        self.assertEqual(fired, [("a", 0.1), ("b", 0.3)])
+        self.assertAlmostEqual(clock(), 1.2)
+
+
+class TestFakeGPIO(unittest.TestCase):
+    """Tests para FakeGPIO."""
+
+    def setUp(self):
+        self.gpio = FakeGPIO()
+        self.gpio.setmode(self.gpio.BCM)
+
+    def test_requires_setup(self):
+        with self.assertRaises(RuntimeError):
+            self.gpio.output(5, True)
+        self.gpio.setup(5, self.gpio.IN)
+        with self.assertRaises(RuntimeError):
+            self.gpio.PWM(5, 50)
+
+    def test_records_transitions(self):
+        self.gpio.setup(5, self.gpio.OUT)
+        self.gpio.output(5, True)
+        self.gpio.clock.advance(0.5)
+        self.gpio.output(5, True)
+        self.gpio.output(5, False)
+        self.assertEqual(self.gpio.history(5), [(0.0, 1), (0.5, 0)])
+
+    def test_pwm_validates_duty(self):
+        self.gpio.setup(SERVO, self.gpio.OUT)
+        pwm = self.gpio.PWM(SERVO, 50)
+        pwm.start(0)
+        pwm.ChangeDutyCycle(7.5)
+        with self.assertRaises(ValueError):
+            pwm.ChangeDutyCycle(120)
+        self.assertEqual(self.gpio.history(SERVO, "duty"), [(0.0, 7.5)])
+
+    def test_edge_callbacks(self):
+        self.gpio.setup(ECHO, self.gpio.IN)
+        edges = []
+        self.gpio.add_event_detect(ECHO, self.gpio.RISING, callback=edges.append)
+        with self.assertRaises(RuntimeError):
+            self.gpio.add_event_detect(ECHO, self.gpio.BOTH)
+        self.gpio.set_input(ECHO, 1)
+        self.gpio.set_input(ECHO, 1)
+        self.gpio.set_input(ECHO, 0)
+        self.assertEqual(edges, [ECHO])
+
+
+class TestEmulatedSensor(unittest.TestCase):
+    """UltrasonicSensor sobre el HC-SR04 emulado."""
+
+    def make_sensor(self, distance, edge_detect=True):
+        gpio = FakeGPIO()
+        gpio.setmode(gpio.BCM)
+        gpio.setup(TRIG, gpio.OUT)
+        gpio.setup(ECHO, gpio.IN)
+        gpio.attach_hcsr04(TRIG, ECHO, distance)
+        sensor = UltrasonicSensor(gpio, TRIG, ECHO, clock=gpio.clock, sleep=gpio.clock.sleep)
+        return (sensor.start() if edge_detect else sensor), gpio
+
+    def test_edges(self):
+        sensor, _ = self.make_sensor(42.0)
+        self.assertAlmostEqual(sensor.measure(), 42.0, places=6)
+
+    def test_polling(self):
+        sensor, _ = self.make_sensor(42.0, edge_detect=False)
+        self.assertAlmostEqual(sensor.measure(), 42.0, delta=0.1)
+
+    def test_lost_echo(self):
+        """Sin eco el sensor mantiene ECHO ~38 ms: se descarta sin esperar de verdad"""
+        sensor, _ = self.make_sensor(None)
+        start = time.monotonic()
+        self.assertIsNone(sensor.measure())
+        self.assertLess(time.monotonic() - start, 0.02)
+        self.assertEqual(sensor.timeouts, 1)
+
+    def test_short_trigger_is_ignored(self):
+        sensor, gpio = self.make_sensor(42.0)
+        sensor.sleep = lambda seconds: None
+        sensor.timeout = 0.001
+        self.assertIsNone(sensor.measure())
+        self.assertEqual(gpio.devices[0].triggers, 0)
+
+
+class TestVirtualSession(unittest.TestCase):
+    """Sesión completa del kiosco (LED, pips, melodía y servo) sobre el reloj virtual."""
+
+    def setUp(self):
+        self.gpio = FakeGPIO()
+        self.gpio.setmode(self.gpio.BCM)
+        for pin in (SERVO, BUZZER, RED, GREEN, BLUE):
+            self.gpio.setup(pin, self.gpio.OUT)
+        pwms = {pin: self.gpio.PWM(pin, 100) for pin in (SERVO, BUZZER, RED, GREEN, BLUE)}
+        for pwm in pwms.values():
+            pwm.start(0)
+        self.worker = HardwareWorker(PwmOutputs(pwms[BUZZER], (pwms[RED], pwms[GREEN], pwms[BLUE]), pwms[SERVO]),
+                                     clock=self.gpio.clock)
+
+    def test_session_runs_in_virtual_time(self):
+        submit = self.worker.submit
+        submit(melody(MELODIES["inicio"], priority=PRIORITY_IDLE))
+        submit(led_effect(LedEffects.breathe((0, 0, 100)), PRIORITY_IDLE, "modo atracción"))
+        run_virtual(self.worker, self.gpio.clock, until=2.0)
+        submit(led_blink((0, 0, 100), 3))
+        for _ in range(5):
+            submit(melody(MELODIES["pip_correcto"], priority=PRIORITY_FEEDBACK))
+            run_virtual(self.worker, self.gpio.clock, until=self.gpio.clock() + 0.5)
+        result_start = self.gpio.clock()
+        done = []
+        submit(led_effect(LedEffects.result_pulse((0, 100, 0)), PRIORITY_RESULT))
+        submit(melody(MELODIES["resultado_bueno"]))
+        submit(servo_profile([(90, 0.5), (0, 2), (90, 0)], start_delay=1.0, on_done=done.append))
+
+        start = time.monotonic()
+        elapsed = run_virtual(self.worker, self.gpio.clock)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertGreater(elapsed, 4.0)
+        self.assertTrue(self.worker.idle())
+        self.assertEqual(done, [True])
+
+        # Servo: baja a 2.5% (0°), espera y vuelve a 7.5% (90°) sin señal al final
+        servo = [duty for t, duty in self.gpio.history(SERVO, "duty") if t >= result_start]
+        self.assertIn(2.5, servo)
+        self.assertEqual(servo[-2:], [7.5, 0])
+
+        # Melodía de resultado: frecuencias e instantes exactos del plan
+        events, _ = compile_schedule(parse(MELODIES["resultado_bueno"]))
+        freqs = [(round(t - result_start, 6), f) for t, f in self.gpio.history(BUZZER, "freq") if t >= result_start]
+        self.assertEqual(freqs, [(t, f) for t, f in events if f])
+
+        # LED: termina en verde fijo (ánodo común: duty invertido)
+        last = {pin: self.gpio.history(pin, "duty")[-1][1] for pin in (RED, GREEN, BLUE)}
+        self.assertEqual(last, {RED: 100, GREEN: 0, BLUE: 100})
+
+
+class TestRealtimeDriver(unittest.TestCase):
+    """Reloj virtual al ritmo real para la interfaz con --fake-gpio."""
+
+    def setUp(self):
+        self.gpio = FakeGPIO()
+        self.gpio.setmode(self.gpio.BCM)
+        self.gpio.setup(BUZZER, self.gpio.OUT)
+        self.buzzer = self.gpio.PWM(BUZZER, 1000)
+        self.worker = HardwareWorker(PwmOutputs(self.buzzer), clock=self.gpio.clock)
+        self.real = 100.0
+        self.driver = RealtimeDriver(self.gpio.clock, self.worker, realtime=lambda: self.real)
+
+    def test_worker_follows_real_time(self):
+        """El tono dura lo previsto en tiempo real, no lo que avance el sensor"""
+        self.worker.submit(tone(1000, 0.2))
+        self.assertAlmostEqual(self.driver.step(), self.driver.tick)
+        self.assertEqual(self.gpio.history(BUZZER, "duty"), [(0.0, 50)])
+        # El sensor empuja el reloj unos µs: el tono sigue sonando
+        self.gpio.clock.advance(0.001)
+        self.real += 0.1
+        self.assertAlmostEqual(self.driver.step(), self.driver.tick)
+        self.assertEqual(len(self.gpio.history(BUZZER, "duty")), 1)
+        self.real += 0.101
+        self.driver.step()
+        t, duty = self.gpio.history(BUZZER, "duty")[-1]
+        self.assertEqual(duty, 0)
+        self.assertAlmostEqual(t, 0.201)
+        self.assertTrue(self.worker.idle())
+
+    def test_thread_runs_commands(self):
+        """Con el hilo en marcha las órdenes se ejecutan sin llamar a step()"""
+        driver = RealtimeDriver(self.gpio.clock, self.worker).start()
+        try:
+            self.worker.submit(tone(1000, 0.02))
+            deadline = time.monotonic() + 2.0
+            while not self.worker.idle() and time.monotonic() < deadline:
+                time.sleep(0.005)
+            self.assertEqual([duty for _, duty in self.gpio.history(BUZZER, "duty")], [50, 0])
+        finally:
+            driver.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
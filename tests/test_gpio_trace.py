@@ -0,0 +1,88 @@
+"""
+Tests unitarios para la traza de llamadas GPIO.
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.FakeGPIO import FakeGPIO
+from lib.GpioTrace import GpioTracer
+from lib.Ultrasonic import UltrasonicSensor
+
+TRIG, ECHO, SERVO = 17, 27, 18
+
+
+class StepClock:
+    """Reloj que avanza 1 ms en cada lectura"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.001
+        return self.now
+
+
+class TestGpioTracer(unittest.TestCase):
+    """Tests para GpioTracer y TracedGPIO."""
+
+    def setUp(self):
+        self.fake = FakeGPIO()
+        self.tracer = GpioTracer(clock=StepClock())
+        self.gpio = self.tracer.wrap(self.fake)
+        self.gpio.setmode(self.gpio.BCM)
+
+    def test_constants_pass_through(self):
+        self.assertEqual(self.gpio.BCM, FakeGPIO.BCM)
+        self.assertEqual(self.fake.getmode(), FakeGPIO.BCM)
+
+    def test_counts_durations_and_intervals(self):
+        self.gpio.setup(SERVO, self.gpio.OUT)
+        pwm = self.gpio.PWM(SERVO, 50)
+        pwm.start(0)
+        for duty in (2.5, 7.5, 12.5):
+            pwm.ChangeDutyCycle(duty)
+        report = self.tracer.report()
+        duty = report[str(SERVO)]["duty"]
+        self.assertEqual(duty["count"], 3)
+        self.assertEqual(duty["duration_ms"]["count"], 3)
+        self.assertEqual(duty["interval_ms"]["count"], 2)
+        # Cada llamada lee el reloj dos veces: 1 ms dentro, 2 ms entre llamadas
+        self.assertAlmostEqual(duty["duration_ms"]["max"], 1.0)
+        self.assertAlmostEqual(duty["interval_ms"]["max"], 2.0)
+        self.assertEqual(self.fake.history(SERVO, "duty"), [(0.0, 2.5), (0.0, 7.5), (0.0, 12.5)])
+
+    def test_sensor_edges_are_traced(self):
+        self.gpio.setup(TRIG, self.gpio.OUT)
+        self.gpio.setup(ECHO, self.gpio.IN)
+        self.fake.attach_hcsr04(TRIG, ECHO, 40.0)
+        sensor = UltrasonicSensor(self.gpio, TRIG, ECHO, clock=self.fake.clock, sleep=self.fake.clock.sleep).start()
+        self.assertAlmostEqual(sensor.measure(), 40.0, places=6)
+        report = self.tracer.report()
+        self.assertEqual(report[str(ECHO)]["edge"]["count"], 2)
+        self.assertEqual(report[str(TRIG)]["output"]["count"], 2)
+
+    def test_errors_are_counted_and_raised(self):
+        with self.assertRaises(RuntimeError):
+            self.gpio.output(5, True)
+        self.assertEqual(self.tracer.report()["5"]["output"]["count"], 1)
+
+    def test_dump_json(self):
+        self.gpio.setup(SERVO, self.gpio.OUT)
+        self.gpio.cleanup()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.tracer.dump(os.path.join(tmp, "sub", "trace.json"))
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        self.assertIn("timestamp", data)
+        self.assertEqual(data["pins"]["-"]["cleanup"]["count"], 1)
+        self.assertEqual(data["pins"][str(SERVO)]["setup"]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
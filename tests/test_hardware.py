@@ -0,0 +1,283 @@
+"""
+Tests unitarios para el hilo de actuadores y su cola de órdenes.
+"""
+
+import unittest
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.Hardware import (Command, HardwareWorker, PwmOutputs, PRIORITY_FEEDBACK, PRIORITY_IDLE,
+                          PRIORITY_RESULT, led_blink, melody, servo_profile, servo_ramp, tone)
+from lib.LedEffects import GAMMA_LUT
+
+
+class FakePWM:
+    """PWM que anota los cambios de duty y frecuencia"""
+
+    def __init__(self, log, name):
+        self.log = log
+        self.name = name
+
+    def ChangeDutyCycle(self, duty):
+        self.log.append((self.name, "duty", duty))
+
+    def ChangeFrequency(self, frequency):
+        self.log.append((self.name, "freq", frequency))
+
+
+class RecordingOutputs:
+    """Salidas que registran las acciones con su hilo e instante"""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+        self.servo_angle = 90
+
+    def _record(self, *call):
+        self.threads.add(threading.current_thread())
+        self.calls.append((time.monotonic(),) + call)
+
+    def tone(self, frequency):
+        self._record("tone", frequency)
+
+    def silence(self):
+        self._record("silence")
+
+    def led(self, red, green, blue):
+        self._record("led", red, green, blue)
+
+    def led_frame(self, red, green, blue):
+        self._record("led_frame", red, green, blue)
+
+    def servo(self, angle):
+        self.servo_angle = angle
+        self._record("servo", angle)
+
+    def servo_release(self):
+        self._record("servo_release")
+
+    def names(self, *kinds):
+        return [c[1:] for c in self.calls if c[1] in kinds]
+
+
+class TestPwmOutputs(unittest.TestCase):
+    """Tests para PwmOutputs."""
+
+    def test_led_inverted_for_common_anode(self):
+        log = []
+        outputs = PwmOutputs(rgb_pwms=[FakePWM(log, c) for c in "rgb"])
+        outputs.led(100, 0, 25)
+        self.assertEqual(log, [("r", "duty", 0), ("g", "duty", 100), ("b", "duty", 100 - GAMMA_LUT[25])])
+
+    def test_led_skips_unchanged_channels(self):
+        """Solo se reescriben los canales cuyo duty cambia"""
+        log = []
+        outputs = PwmOutputs(rgb_pwms=[FakePWM(log, c) for c in "rgb"])
+        outputs.led(0, 0, 100)
+        outputs.led_frame(0, 0, 100)
+        outputs.led_frame(0, 50, 100)
+        self.assertEqual([entry[0] for entry in log], ["r", "g", "b", "g"])
+        self.assertEqual(outputs.led_writes, 4)
+
+    def test_servo_duty(self):
+        log = []
+        outputs = PwmOutputs(servo_pwm=FakePWM(log, "servo"))
+        outputs.servo(180)
+        outputs.servo_release()
+        self.assertEqual(log, [("servo", "duty", 12.5), ("servo", "duty", 0)])
+        self.assertEqual(outputs.servo_angle, 180)
+
+    def test_tone_and_silence(self):
+        log = []
+        outputs = PwmOutputs(buzzer_pwm=FakePWM(log, "bz"))
+        outputs.tone(440)
+        outputs.silence()
+        self.assertEqual(log, [("bz", "freq", 440), ("bz", "duty", 50), ("bz", "duty", 0)])
+
+
+class TestHardwareWorker(unittest.TestCase):
+    """Tests para HardwareWorker."""
+
+    def setUp(self):
+        self.outputs = RecordingOutputs()
+        self.worker = HardwareWorker(self.outputs).start()
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def wait_idle(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not self.worker.idle():
+            if time.monotonic() > deadline:
+                self.fail("El hilo de hardware no terminó")
+            time.sleep(0.005)
+
+    def test_single_thread_for_all_channels(self):
+        """Todas las acciones corren en el mismo hilo, distinto del que las pide"""
+        self.worker.submit(tone(1000, 0.01))
+        self.worker.submit(led_blink((0, 0, 100), times=2, period=0.02))
+        self.worker.submit(servo_profile([(0, 0.01)], speed=900))
+        self.wait_idle()
+        self.assertEqual(len(self.outputs.threads), 1)
+        self.assertNotIn(threading.current_thread(), self.outputs.threads)
+        self.assertEqual(self.outputs.names("servo")[-1], ("servo", 0))
+        self.assertEqual(self.outputs.names("led_frame")[-1], ("led_frame", 0, 0, 100))
+
+    def test_channels_run_concurrently(self):
+        """Una melodía larga no retrasa el LED"""
+        self.worker.submit(melody([(500, 0.2)]))
+        self.worker.submit(led_blink((0, 100, 0), times=1, period=0.02))
+        self.wait_idle()
+        led_end = [c[0] for c in self.outputs.calls if c[1] == "led_frame"][-1]
+        silence = [c[0] for c in self.outputs.calls if c[1] == "silence"][-1]
+        self.assertLess(led_end, silence)
+
+    def test_new_pip_preempts_previous(self):
+        """Respuestas rápidas: el pip nuevo corta el anterior, sin solaparse"""
+        self.worker.submit(tone(1200, 0.3))
+        time.sleep(0.05)
+        self.worker.submit(tone(400, 0.05))
+        self.wait_idle()
+        kinds = [c[1:] for c in self.outputs.calls if c[1] in ("tone", "silence")]
+        self.assertEqual(kinds, [("tone", 1200), ("silence",), ("tone", 400), ("silence",)])
+        self.assertEqual(self.worker.preempted, 1)
+
+    def test_lower_priority_waits_or_expires(self):
+        """Un pip durante la melodía de resultado caduca; el tono de reposo espera"""
+        self.worker.submit(melody([(523, 0.1)], priority=PRIORITY_RESULT))
+        self.worker.submit(tone(1200, 0.01, PRIORITY_FEEDBACK, max_delay=0.02))
+        self.worker.submit(melody([(784, 0.01)], priority=PRIORITY_IDLE))
+        self.wait_idle()
+        self.assertEqual(self.outputs.names("tone"), [("tone", 523), ("tone", 784)])
+        self.assertEqual(self.worker.expired, 1)
+
+    def test_cancel_silences(self):
+        self.worker.submit(melody([(523, 1.0)]))
+        time.sleep(0.02)
+        self.worker.cancel("buzzer")
+        self.assertFalse(self.worker.busy("buzzer"))
+        self.wait_idle()
+        self.assertEqual(self.outputs.calls[-1][1], "silence")
+        # El reposo lo aplica el hilo de hardware, no quien cancela
+        self.assertNotIn(threading.current_thread(), self.outputs.threads)
+
+    def blocking_command(self, priority=PRIORITY_FEEDBACK, on_done=None):
+        """Orden cuyos pasos vencen a la vez; el segundo bloquea hasta release"""
+        self.entered, self.release = threading.Event(), threading.Event()
+
+        def block():
+            self.entered.set()
+            self.release.wait(2.0)
+        return Command("buzzer", [("tone", (1200,), 0.0), (block, (), 0.0), ("tone", (1300,), 0.5)],
+                       priority, on_done=on_done)
+
+    def test_cancel_drops_steps_in_flight(self):
+        """Un paso ya sacado de una orden cancelada no vuelve a encender el buzzer"""
+        done = []
+        self.worker.submit(self.blocking_command(on_done=done.append))
+        self.assertTrue(self.entered.wait(1.0))
+        self.worker.cancel("buzzer")
+        self.assertEqual(done, [])
+        self.release.set()
+        self.wait_idle()
+        self.assertEqual(self.outputs.names("tone", "silence"), [("tone", 1200), ("silence",)])
+        self.assertEqual(done, [False])
+
+    def test_preempt_while_step_in_flight(self):
+        """Interrumpir durante un paso: reposo y orden nueva después de él, en el mismo hilo"""
+        self.worker.submit(self.blocking_command())
+        self.assertTrue(self.entered.wait(1.0))
+        self.worker.submit(tone(400, 0.02))
+        self.release.set()
+        self.wait_idle()
+        self.assertEqual(self.outputs.names("tone", "silence"),
+                         [("tone", 1200), ("silence",), ("tone", 400), ("silence",)])
+        self.assertEqual(len(self.outputs.threads), 1)
+        self.assertNotIn(threading.current_thread(), self.outputs.threads)
+
+    def test_on_start_callback(self):
+        started = threading.Event()
+        self.worker.submit(tone(1000, 0.01, on_start=started.set))
+        self.assertTrue(started.wait(1.0))
+
+    def test_errors_do_not_stop_worker(self):
+        def broken():
+            raise RuntimeError("PWM")
+        self.worker.submit(Command("led", [(broken, (), 0.0)]))
+        self.worker.submit(tone(1000, 0.01))
+        self.wait_idle()
+        self.assertEqual(self.worker.errors, 1)
+        self.assertEqual(self.outputs.names("tone"), [("tone", 1000)])
+
+    def test_melody_deadlines_do_not_drift(self):
+        """Las notas empiezan en instantes absolutos desde el inicio"""
+        notes = [(500, 0.03)] * 5
+        self.worker.submit(melody(notes, gap=0.01))
+        self.wait_idle()
+        starts = [c[0] for c in self.outputs.calls if c[1] == "tone"]
+        self.assertAlmostEqual(starts[-1] - starts[0], 4 * 0.04, delta=0.03)
+
+
+class TestServoProfile(unittest.TestCase):
+    """Tests para los perfiles de movimiento del servo."""
+
+    def setUp(self):
+        self.outputs = RecordingOutputs()
+        self.worker = HardwareWorker(self.outputs).start()
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def test_ramp_is_monotonic_and_eased(self):
+        """La rampa llega al destino sin retroceder y arranca despacio"""
+        steps = servo_ramp(90, 0, speed=180)
+        angles = [args[0] for _, args, _ in steps]
+        self.assertEqual(angles[-1], 0)
+        self.assertEqual(angles, sorted(angles, reverse=True))
+        self.assertLess(90 - angles[0], 90 / len(angles))
+        self.assertAlmostEqual(sum(hold for _, _, hold in steps), 0.5 + 0.3, places=6)
+
+    def test_profile_reports_completion(self):
+        """on_done(True) al completar centro -> resultado -> centro"""
+        done = []
+        finished = threading.Event()
+        self.worker.submit(servo_profile([(0, 0.01), (90, 0)], speed=3000,
+                                         on_done=lambda ok: (done.append(ok), finished.set())))
+        self.assertTrue(finished.wait(3.0))
+        self.assertEqual(done, [True])
+        self.assertEqual(self.outputs.names("servo")[-1], ("servo", 90))
+        self.assertEqual(self.outputs.servo_angle, 90)
+
+    def test_interrupt_continues_from_current_angle(self):
+        """Una secuencia interrumpida avisa con False y la nueva parte de donde quedó"""
+        done = []
+        self.worker.submit(servo_profile([(180, 1.0)], speed=180, on_done=done.append))
+        time.sleep(0.15)
+        self.worker.submit(servo_profile([(90, 0)], speed=3000))
+        deadline = time.monotonic() + 3.0
+        while self.worker.busy("servo") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(done, [False])
+        angles = [c[2] for c in self.outputs.calls if c[1] == "servo"]
+        peak = max(angles)
+        self.assertLess(peak, 180)
+        # Tras la interrupción vuelve al centro desde el pico, sin saltar a 180
+        self.assertEqual(angles[-1], 90)
+
+    def test_start_delay(self):
+        """start_delay retrasa el primer movimiento sin bloquear a quien lo pide"""
+        start = time.monotonic()
+        self.worker.submit(servo_profile([(0, 0)], speed=3000, start_delay=0.1))
+        self.assertLess(time.monotonic() - start, 0.05)
+        while self.worker.busy("servo"):
+            time.sleep(0.01)
+        first_move = [c[0] for c in self.outputs.calls if c[1] == "servo"][0]
+        self.assertGreaterEqual(first_move - start, 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Tests unitarios para el filtrado de pulsaciones y sus latencias.
+"""
+
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.InputPipeline import InputPipeline
+from lib.LoopMonitor import EventLoopMonitor
+
+
+class FakeClock:
+    """Reloj manual en segundos"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeEvent:
+    """Evento Tk con su marca del servidor en ms"""
+
+    def __init__(self, time):
+        self.time = time
+
+
+class FakeRoot:
+    """Raíz mínima: guarda los after_idle y los ejecuta a demanda"""
+
+    def __init__(self):
+        self.idle = []
+        self.after = lambda ms, func=None, *args: None
+
+    def after_idle(self, func):
+        self.idle.append(func)
+
+    def run_idle(self):
+        while self.idle:
+            self.idle.pop(0)()
+
+
+class TestInputPipeline(unittest.TestCase):
+    """Tests para InputPipeline."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.pipeline = InputPipeline(debounce_ms=250, clock=self.clock)
+
+    def test_one_answer_per_round(self):
+        """El doble toque en la misma ronda se descarta"""
+        self.pipeline.open_round(("colors", 0))
+        self.assertIsNotNone(self.pipeline.accept("colors", ("colors", 0)))
+        self.clock.now = 0.5
+        self.assertIsNone(self.pipeline.accept("colors", ("colors", 0)))
+        self.assertEqual(self.pipeline.stats(), {"accepted": 1, "locked": 1, "bounced": 0})
+
+    def test_round_must_be_open(self):
+        """Durante la transición la ronda siguiente aún no admite respuestas"""
+        self.pipeline.open_round(("ishihara", 0))
+        self.pipeline.accept("ishihara", ("ishihara", 0))
+        self.clock.now = 1.0
+        # La sesión ya avanzó a la lámina 1, pero todavía no se muestra
+        self.assertIsNone(self.pipeline.accept("ishihara", ("ishihara", 1)))
+        self.pipeline.open_round(("ishihara", 1))
+        self.assertIsNotNone(self.pipeline.accept("ishihara", ("ishihara", 1)))
+
+    def test_debounce_across_rounds(self):
+        """Un rebote justo después de abrir la ronda siguiente también se descarta"""
+        self.pipeline.open_round(("colors", 0))
+        self.pipeline.accept("colors", ("colors", 0))
+        self.pipeline.open_round(("colors", 1))
+        self.clock.now = 0.1
+        self.assertIsNone(self.pipeline.accept("colors", ("colors", 1)))
+        self.assertEqual(self.pipeline.bounced, 1)
+        self.clock.now = 0.3
+        self.assertIsNotNone(self.pipeline.accept("colors", ("colors", 1)))
+
+    def test_close_rejects(self):
+        """Tras close() no se acepta nada"""
+        self.pipeline.open_round(("colors", 0))
+        self.pipeline.close()
+        self.assertIsNone(self.pipeline.accept("colors", ("colors", 0)))
+
+    def test_buzzer_latency(self):
+        """tap_buzzer mide desde la llegada de la pulsación"""
+        self.pipeline.open_round(("colors", 0))
+        tap = self.pipeline.accept("colors", ("colors", 0))
+        self.clock.now = 0.012
+        self.pipeline.buzzer_started(tap)
+        self.pipeline.buzzer_started(None)
+        summary = self.pipeline.histograms[("colors", "tap_buzzer")].summary()
+        self.assertEqual(summary["count"], 1)
+        self.assertAlmostEqual(summary["max"], 12.0, places=3)
+
+    def test_visual_latency_after_redraw(self):
+        """tap_visual se registra tras los redibujados pendientes"""
+        root = FakeRoot()
+        pipeline = InputPipeline(root, clock=self.clock)
+        pipeline.open_round(("ishihara", 0))
+        tap = pipeline.accept("ishihara", ("ishihara", 0))
+        pipeline.visual_done(tap)
+        self.assertNotIn(("ishihara", "tap_visual"), pipeline.histograms)
+        self.clock.now = 0.03
+        root.run_idle()
+        self.assertAlmostEqual(pipeline.histograms[("ishihara", "tap_visual")].max, 30.0, places=3)
+
+    def test_event_time_removes_loop_delay(self):
+        """El sello es el instante del evento aunque el bucle lo atienda tarde"""
+        self.clock.now = 5.0
+        self.assertAlmostEqual(self.pipeline.event_time(FakeEvent(1000)), 5.0)
+        # Pulsado 500 ms después, atendido con 300 ms de retraso
+        self.clock.now = 5.8
+        self.assertAlmostEqual(self.pipeline.event_time(FakeEvent(1500)), 5.5)
+        self.assertAlmostEqual(self.pipeline.event_time(None), 5.8)
+
+    def test_latency_and_debounce_from_press(self):
+        """Latencia y antirrebote se miden desde la pulsación, no desde el manejador"""
+        self.clock.now = 1.0
+        self.pipeline.event_time(FakeEvent(100))
+        self.pipeline.open_round(("colors", 0))
+        self.clock.now = 1.1
+        self.pipeline.press(FakeEvent(200))
+        self.clock.now = 1.15  # El comando llega 50 ms después del evento
+        tap = self.pipeline.accept("colors", ("colors", 0), self.pipeline.take_press())
+        self.assertAlmostEqual(tap.t, 1.1)
+        self.assertIsNone(self.pipeline.take_press())
+        self.pipeline.buzzer_started(tap)
+        self.assertAlmostEqual(self.pipeline.histograms[("colors", "tap_buzzer")].max, 50.0, places=3)
+
+        # Segunda pulsación 260 ms después de la primera (210 ms después de
+        # atender a la primera): no es un rebote
+        self.pipeline.open_round(("colors", 1))
+        self.clock.now = 1.4
+        self.assertIsNotNone(self.pipeline.accept("colors", ("colors", 1), 1.36))
+        self.assertEqual(self.pipeline.stats()["bounced"], 0)
+
+    def test_shares_loop_monitor_dump(self):
+        """Con el monitor del bucle, las latencias salen en su informe"""
+        monitor = EventLoopMonitor(FakeRoot(), lambda: "colors", heartbeat_ms=0, clock=self.clock)
+        pipeline = InputPipeline(clock=self.clock, histogram=monitor.histogram)
+        pipeline.open_round(("colors", 0))
+        tap = pipeline.accept("colors", ("colors", 0))
+        pipeline.buzzer_started(tap)
+        pipeline.visual_done(tap)
+        report = monitor.report()
+        self.assertEqual(report["colors"]["tap_buzzer"]["count"], 1)
+        self.assertEqual(report["colors"]["tap_visual"]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
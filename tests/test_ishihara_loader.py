@@ -111,6 +111,75 @@ class TestIshiharaImageLoader(unittest.TestCase):
         loader = IshiharaImageLoader(self.temp_dir)
         self.assertEqual(len(loader.test_plates), 0)
 
+    def test_load_generated_plates(self):
+        """Las láminas generadas tienen la misma estructura que las de archivo."""
+        loader = IshiharaImageLoader(self.temp_dir)
+        plates = loader.load_generated_plates(2, 80, seed=1, cache_dir=self.temp_dir)
+        self.assertEqual(len(plates), 2)
+        for plate in plates:
+            for key in ('filename', 'path', 'image', 'correct_answer', 'options', 'difficulty'):
+                self.assertIn(key, plate)
+            self.assertIn(plate['correct_answer'], plate['options'])
+
+    def write_single_pack(self, scaled=False):
+        import numpy as np
+        from lib.PlatePack import PACK_FILENAME, source_fingerprint, write_pack
+        Image.new("RGB", (8, 8)).save(os.path.join(self.temp_dir, "29.png"))
+        write_pack(os.path.join(self.temp_dir, PACK_FILENAME), [{
+            "name": "29", "correct": 29, "options": [29, 70, 20, "No veo nada"],
+            "difficulty": "medium", "sha256": "0" * 64,
+            "source": source_fingerprint(self.temp_dir, "29.png"), "scaled": scaled,
+            "image": np.zeros((8, 8, 3), dtype=np.uint8),
+        }])
+
+    def test_prefers_plate_pack(self):
+        """Si existe plates.dpk se usa en lugar de los archivos sueltos."""
+        self.write_single_pack()
+        loader = IshiharaImageLoader(self.temp_dir)
+        self.assertEqual(len(loader.test_plates), 1)
+        self.assertEqual(loader.test_plates[0]['correct_answer'], 29)
+        self.assertEqual(loader.test_plates[0]['digest'], "0" * 64)
+        self.assertIn("#29", loader.test_plates[0]['path'])
+
+    def test_scaled_pack_digest_includes_size(self):
+        """Un paquete pre-escalado no comparte claves de caché con la fuente."""
+        self.write_single_pack(scaled=True)
+        loader = IshiharaImageLoader(self.temp_dir)
+        self.assertEqual(loader.test_plates[0]['digest'], "0" * 64 + "-8x8")
+
+    def test_stale_pack_falls_back_to_files(self):
+        """Si la fuente cambió tras empaquetar se cargan los archivos sueltos."""
+        self.write_single_pack()
+        Image.new("RGB", (16, 16), "red").save(os.path.join(self.temp_dir, "29.png"))
+        loader = IshiharaImageLoader(self.temp_dir)
+        self.assertEqual(len(loader.test_plates), 1)
+        self.assertEqual(loader.test_plates[0]['path'], os.path.join(self.temp_dir, "29.png"))
+
+    def test_pack_without_sources_is_stale(self):
+        """Un paquete sin huellas de origen no se puede comprobar y no se usa."""
+        import numpy as np
+        from lib.PlatePack import PACK_FILENAME, write_pack
+        write_pack(os.path.join(self.temp_dir, PACK_FILENAME), [{
+            "name": "29", "correct": 29, "options": [29, 70, 20, "No veo nada"],
+            "difficulty": "medium", "sha256": "0" * 64,
+            "image": np.zeros((8, 8, 3), dtype=np.uint8),
+        }])
+        loader = IshiharaImageLoader(self.temp_dir)
+        self.assertEqual(len(loader.test_plates), 0)
+
+    def test_loads_from_manifest(self):
+        """Con manifest.json las respuestas salen del manifiesto."""
+        from lib.PlateManifest import MANIFEST_FILENAME, write_manifest
+        Image.new("RGB", (8, 8)).save(os.path.join(self.temp_dir, "lamina.png"))
+        write_manifest(os.path.join(self.temp_dir, MANIFEST_FILENAME), [{
+            "name": "lamina", "file": "lamina.png", "correct": 3,
+            "options": [3, 8, "No veo nada"], "difficulty": "hard",
+        }])
+        loader = IshiharaImageLoader(self.temp_dir, index_path=os.path.join(self.temp_dir, "index.json"))
+        self.assertEqual(len(loader.test_plates), 1)
+        self.assertEqual(loader.test_plates[0]['correct_answer'], 3)
+        self.assertEqual(len(loader.test_plates[0]['digest']), 64)
+
     def test_options_shuffling(self):
         """Test de mezcla de opciones de respuesta."""
         # Este test requiere crear múltiples instancias y verificar
@@ -0,0 +1,113 @@
+"""
+Tests unitarios para los efectos de la tira RGB.
+"""
+
+import unittest
+import os
+import sys
+import itertools
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.Hardware import HardwareWorker, PwmOutputs, PRIORITY_FEEDBACK, PRIORITY_IDLE, effect_steps, led_effect
+from lib.LedEffects import GAMMA_LUT, OFF, TICK, blink, breathe, fade, result_pulse, solid
+
+
+class CountingPWM:
+    """PWM que cuenta las escrituras de duty"""
+
+    def __init__(self):
+        self.writes = 0
+        self.duty = None
+
+    def ChangeDutyCycle(self, duty):
+        self.writes += 1
+        self.duty = duty
+
+
+class TestEffects(unittest.TestCase):
+    """Tests para los generadores de fotogramas."""
+
+    def test_gamma_lut(self):
+        self.assertEqual(len(GAMMA_LUT), 101)
+        self.assertEqual((GAMMA_LUT[0], GAMMA_LUT[100]), (0, 100))
+        self.assertEqual(list(GAMMA_LUT), sorted(GAMMA_LUT))
+        self.assertLess(GAMMA_LUT[50], 25)
+
+    def test_blink_ends_on_color(self):
+        frames = list(blink((0, 0, 100), times=2, period=0.08))
+        self.assertEqual(len(frames), 8)
+        self.assertEqual(frames[0], OFF)
+        self.assertEqual(frames[-1], (0, 0, 100))
+
+    def test_breathe_range(self):
+        frames = list(breathe((0, 0, 100), period=1.0, floor=0.2, cycles=2))
+        self.assertEqual(len(frames), 2 * round(1.0 / TICK))
+        blues = [b for _, _, b in frames]
+        self.assertEqual((min(blues), max(blues)), (20, 100))
+
+    def test_breathe_without_end(self):
+        frames = list(itertools.islice(breathe((100, 0, 0)), 1000))
+        self.assertEqual(len(frames), 1000)
+
+    def test_fade_reaches_target(self):
+        frames = list(fade((100, 0, 0), (0, 100, 0), duration=0.1))
+        self.assertEqual(frames[-1], (0, 100, 0))
+        self.assertEqual([g for _, g, _ in frames], sorted(g for _, g, _ in frames))
+
+    def test_result_pulse_ends_solid(self):
+        self.assertEqual(list(result_pulse((0, 100, 0)))[-1], (0, 100, 0))
+        self.assertEqual(list(solid((10.4, 0, 200))), [(10, 0, 100)])
+
+
+class TestEffectSteps(unittest.TestCase):
+    """Tests para effect_steps y la supresión de cambios."""
+
+    def test_merges_repeated_frames(self):
+        """Un fotograma repetido no genera pasos nuevos; las esperas suman la duración"""
+        steps = list(effect_steps(blink((0, 0, 100), times=2, period=0.4)))
+        self.assertEqual([args for _, args, _ in steps], [OFF, (0, 0, 100), OFF, (0, 0, 100)])
+        self.assertAlmostEqual(sum(hold for _, _, hold in steps), 0.6)
+
+    def test_endless_plateau_is_bounded(self):
+        """Una meseta sin fin se reemite en vez de leerse entera por adelantado"""
+        steps = list(itertools.islice(effect_steps(itertools.repeat((0, 0, 50)), max_hold=0.1), 3))
+        self.assertEqual(len(steps), 3)
+
+    def test_breathe_writes_fewer_than_frames(self):
+        """Solo cambia un canal: los otros dos no se reescriben"""
+        pwms = [CountingPWM() for _ in range(3)]
+        outputs = PwmOutputs(rgb_pwms=pwms)
+        frames = list(breathe((0, 0, 100), period=4.0, cycles=1))
+        for _, args, _ in effect_steps(iter(frames)):
+            outputs.led_frame(*args)
+        self.assertEqual(pwms[0].writes, 1)
+        self.assertEqual(pwms[1].writes, 1)
+        self.assertLess(pwms[2].writes, len(frames))
+
+
+class TestLedEffectWorker(unittest.TestCase):
+    """Tests del efecto en el hilo de hardware."""
+
+    def test_attract_is_replaced_by_feedback(self):
+        """El modo atracción no termina solo y un efecto de mayor prioridad lo sustituye"""
+        pwms = [CountingPWM() for _ in range(3)]
+        worker = HardwareWorker(PwmOutputs(rgb_pwms=pwms)).start()
+        try:
+            done = []
+            worker.submit(led_effect(breathe((0, 0, 100), period=0.2), PRIORITY_IDLE, on_done=done.append))
+            time.sleep(0.1)
+            self.assertTrue(worker.busy("led"))
+            worker.submit(led_effect(solid((0, 100, 0)), PRIORITY_FEEDBACK))
+            deadline = time.monotonic() + 2.0
+            while worker.busy("led") and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(done, [False])
+            self.assertEqual([pwm.duty for pwm in pwms], [100, 0, 100])
+        finally:
+            worker.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
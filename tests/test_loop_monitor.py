@@ -0,0 +1,105 @@
+"""
+Tests unitarios para la instrumentación del bucle de eventos.
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.LoopMonitor import EventLoopMonitor, LatencyHistogram
+
+
+class FakeClock:
+    """Reloj manual en segundos"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRoot:
+    """Raíz mínima: guarda los after y los ejecuta a demanda"""
+
+    def __init__(self):
+        self.pending = []
+        self.after = self._after
+
+    def _after(self, ms, func=None, *args):
+        self.pending.append((ms, func, args))
+        return f"after#{len(self.pending)}"
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Tests para LatencyHistogram."""
+
+    def test_percentiles(self):
+        """Los percentiles quedan dentro del error de la cubeta (~12%)."""
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.record(float(ms))
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.percentile(50), 50, delta=50 * 0.13)
+        self.assertAlmostEqual(histogram.percentile(99), 99, delta=99 * 0.13)
+        self.assertEqual(histogram.percentile(100), 100)
+
+    def test_empty_and_tiny_values(self):
+        """Un histograma vacío devuelve 0 y los valores mínimos van a la primera cubeta."""
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.percentile(50), 0.0)
+        histogram.record(0.0)
+        self.assertEqual(histogram.counts[0], 1)
+
+
+class TestEventLoopMonitor(unittest.TestCase):
+    """Tests para EventLoopMonitor sin display."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.clock = FakeClock()
+        self.root = FakeRoot()
+        self.screen = "colors"
+        self.monitor = EventLoopMonitor(self.root, lambda: self.screen, heartbeat_ms=0, clock=self.clock)
+        self.monitor._original_after = self.root.after
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_after_records_lag_and_duration(self):
+        """Se mide el retraso respecto a la hora programada y la duración."""
+        def callback(value):
+            self.clock.now += 0.030
+            self.assertEqual(value, 7)
+
+        self.monitor.after(100, callback, 7)
+        ms, timed, call_args = self.root.pending.pop()
+        self.assertEqual(ms, 100)
+        self.clock.now = 0.150  # 50 ms tarde
+        timed(*call_args)
+
+        report = self.monitor.report()["colors"]
+        self.assertAlmostEqual(report["lag"]["max"], 50, places=3)
+        self.assertAlmostEqual(report["callback"]["max"], 30, places=3)
+
+    def test_sleep_form_passes_through(self):
+        """root.after(ms) sin función no se instrumenta."""
+        self.monitor.after(10)
+        self.assertEqual(self.root.pending[-1], (10, None, ()))
+
+    def test_dump_per_screen(self):
+        """El volcado agrupa las métricas por pantalla."""
+        self.monitor.histogram("ishihara", "tap_idle").record(12.0)
+        path = self.monitor.dump(os.path.join(self.temp_dir, "loop.json"))
+        with open(path) as f:
+            data = json.load(f)
+        self.assertEqual(data["screens"]["ishihara"]["tap_idle"]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests unitarios para el formato de melodías y su compilación.
+"""
+
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.Hardware import melody
+from lib.Melody import MELODIES, compile_schedule, note_frequency, parse
+
+
+class TestMelodyFormat(unittest.TestCase):
+    """Tests para parse y note_frequency."""
+
+    def test_note_frequencies_match_original_tones(self):
+        """Las notas dan las mismas frecuencias que los tonos originales"""
+        self.assertEqual([note_frequency("C", "", 5), note_frequency("E", "", 5), note_frequency("G", "", 5),
+                          note_frequency("C", "", 6), note_frequency("G", "", 4)], [523, 659, 784, 1047, 392])
+        self.assertEqual(note_frequency("A", "", 4), 440)
+        self.assertEqual(note_frequency("F", "#", 4), note_frequency("G", "b", 4))
+
+    def test_parse_inserts_gaps(self):
+        notes = parse("C5/100 1200/50 R/20 A4/10", gap=0.05)
+        self.assertEqual(notes, [(523, 0.1), (None, 0.05), (1200, 0.05), (None, 0.02), (440, 0.01)])
+
+    def test_parse_rejects_bad_tokens(self):
+        with self.assertRaises(ValueError):
+            parse("H5/100")
+        with self.assertRaises(ValueError):
+            parse("C5")
+
+    def test_builtin_melodies_parse(self):
+        for name, text in MELODIES.items():
+            self.assertTrue(parse(text), name)
+
+
+class TestCompileSchedule(unittest.TestCase):
+    """Tests para compile_schedule."""
+
+    def test_absolute_offsets(self):
+        """Instantes absolutos desde el inicio y silencio final"""
+        events, duration = compile_schedule(parse("C5/100 E5/100 G5/150"))
+        self.assertEqual(events, [(0.0, 523), (0.1, None), (0.15, 659), (0.25, None), (0.3, 784), (0.45, None)])
+        self.assertEqual(duration, 0.45)
+
+    def test_merges_repeated_events(self):
+        events, _ = compile_schedule([(440, 0.1), (440, 0.1), (None, 0.1), (None, 0.1)])
+        self.assertEqual(events, [(0.0, 440), (0.2, None)])
+
+    def test_hardware_steps_follow_schedule(self):
+        """Las esperas de los pasos suman exactamente los instantes del plan"""
+        command = melody(MELODIES["resultado_bueno"])
+        events, duration = compile_schedule(parse(MELODIES["resultado_bueno"]))
+        offsets, t = [], 0.0
+        for _, _, hold in command.steps:
+            offsets.append(round(t, 6))
+            t += hold
+        self.assertEqual(offsets, [t for t, _ in events])
+        self.assertAlmostEqual(t, duration)
+        self.assertEqual(command.steps[-1][0], "silence")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Tests unitarios para la caché de láminas escaladas.
+"""
+
+import unittest
+import io
+import os
+import sys
+import tempfile
+import shutil
+import threading
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.PlateCache import PlateRenderCache, image_size_for_screen
+
+
+class TestPlateRenderCache(unittest.TestCase):
+    """Tests para la clase PlateRenderCache."""
+
+    def setUp(self):
+        """Crear lámina de prueba y directorio de caché."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        self.source = os.path.join(self.temp_dir, "12.png")
+        Image.new("RGB", (64, 64), (200, 30, 30)).save(self.source)
+
+    def tearDown(self):
+        """Limpiar después de los tests."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_get_returns_scaled_ppm(self):
+        """La entrada es un PPM binario del tamaño pedido."""
+        cache = PlateRenderCache(self.cache_dir)
+        data = cache.get(self.source, 32)
+        self.assertTrue(data.startswith(b"P6"))
+        self.assertEqual(Image.open(self.source).size, (64, 64))
+        self.assertEqual(Image.open(io.BytesIO(data)).size, (32, 32))
+
+    def test_persists_between_instances(self):
+        """Una segunda instancia reutiliza lo escrito en disco."""
+        PlateRenderCache(self.cache_dir).get(self.source, 32)
+        cache = PlateRenderCache(self.cache_dir)
+        cache.get(self.source, 32)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_invalidation_on_source_change(self):
+        """Si cambia el archivo fuente, la clave cambia y se regenera."""
+        cache = PlateRenderCache(self.cache_dir)
+        old_key = cache.key(self.source, 32)
+        cache.warm([self.source], 32)
+
+        Image.new("RGB", (64, 64), (30, 200, 30)).save(self.source)
+        os.utime(self.source, ns=(1, 1))
+        new_key = cache.key(self.source, 32)
+        self.assertNotEqual(old_key, new_key)
+
+        self.assertEqual(cache.warm([self.source], 32), 1)
+        self.assertEqual(os.listdir(self.cache_dir), [new_key + ".ppm"])
+
+    def test_other_sizes_survive_warm(self):
+        """Hornear otro tamaño no borra las entradas del tamaño del kiosco."""
+        cache = PlateRenderCache(self.cache_dir)
+        cache.warm([self.source], 32)
+        cache.warm([self.source], 48)
+        self.assertEqual(sorted(os.listdir(self.cache_dir)),
+                         sorted([cache.key(self.source, 32) + ".ppm", cache.key(self.source, 48) + ".ppm"]))
+
+    def test_prune_only_same_variant(self):
+        """Solo se eliminan hashes obsoletos del mismo tamaño, filtro y LUT."""
+        cache = PlateRenderCache(self.cache_dir)
+        cache.warm([self.source], 32)
+        cache.warm([self.source], 48)
+        old_32 = cache.key(self.source, 32)
+
+        Image.new("RGB", (64, 64), (30, 200, 30)).save(self.source)
+        os.utime(self.source, ns=(1, 1))
+        cache.warm([self.source], 32)
+        names = os.listdir(self.cache_dir)
+        self.assertNotIn(old_32 + ".ppm", names)
+        self.assertIn(cache.key(self.source, 32) + ".ppm", names)
+        self.assertEqual(len([name for name in names if name.endswith("_48_" + str(cache.resample) + ".ppm")]), 1)
+
+    def test_concurrent_writes_of_same_key(self):
+        """Varios hilos escribiendo la misma clave dejan una entrada completa."""
+        cache = PlateRenderCache(self.cache_dir)
+        key = cache.key(self.source, 32)
+        data = cache.render(self.source, 32)
+        threads = [threading.Thread(target=lambda: [cache._write_atomic(cache.entry_path(key), data)
+                                                    for _ in range(5)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(os.listdir(self.cache_dir), [key + ".ppm"])
+        with open(cache.entry_path(key), "rb") as f:
+            self.assertEqual(f.read(), data)
+
+    def test_image_size_for_screen(self):
+        """Mismo cálculo que calculate_scaling."""
+        self.assertEqual(image_size_for_screen(800, 480), 336)
+        self.assertEqual(image_size_for_screen(1920, 1080), 756)
+        self.assertEqual(image_size_for_screen(320, 240), 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
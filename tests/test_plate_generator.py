@@ -0,0 +1,81 @@
+"""
+Tests unitarios para el generador procedural de láminas.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.PlateGenerator import GeneratedPlateCache, IshiharaPlateGenerator, points_in_number
+
+
+class TestPlateGenerator(unittest.TestCase):
+    """Tests para IshiharaPlateGenerator y GeneratedPlateCache."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_plate_shape(self):
+        """La lámina tiene el tamaño pedido y fondo blanco en las esquinas."""
+        plate = IshiharaPlateGenerator(120, seed=1).generate(42)
+        self.assertEqual(plate.shape, (120, 120, 3))
+        self.assertEqual(plate.dtype, np.uint8)
+        self.assertTrue((plate[0, 0] == 255).all())
+
+    def test_seeded_is_reproducible(self):
+        """Con la misma semilla se obtiene exactamente el mismo juego."""
+        a = IshiharaPlateGenerator(100, seed=7).generate_set(3)
+        b = IshiharaPlateGenerator(100, seed=7).generate_set(3)
+        for plate_a, plate_b in zip(a, b):
+            self.assertEqual(plate_a["number"], plate_b["number"])
+            self.assertTrue(np.array_equal(plate_a["image"], plate_b["image"]))
+
+    def test_options_include_answer(self):
+        """Las opciones contienen la respuesta, dos distractores y 'No veo nada'."""
+        plate = IshiharaPlateGenerator(100, seed=3).generate_set(1)[0]
+        self.assertEqual(plate["options"][0], plate["number"])
+        self.assertEqual(len(set(map(str, plate["options"]))), 4)
+        self.assertIn("No veo nada", plate["options"])
+
+    def test_number_mask(self):
+        """El centro del trazo de un 8 pertenece a la figura y la esquina no."""
+        points = np.array([[50.0, 50.0], [2.0, 2.0]])
+        self.assertEqual(points_in_number(points, 8, 100).tolist(), [True, False])
+
+    def test_seeded_set_is_cached(self):
+        """Un juego con semilla se reutiliza desde disco."""
+        cache = GeneratedPlateCache(self.temp_dir)
+        first = cache.get_set(2, 80, seed=5)
+        mtime = os.path.getmtime(first[0]["path"])
+        second = cache.get_set(2, 80, seed=5)
+        self.assertEqual(first, second)
+        self.assertEqual(os.path.getmtime(second[0]["path"]), mtime)
+
+    def test_new_set_prunes_previous(self):
+        """Generar un juego nuevo elimina los archivos del anterior."""
+        cache = GeneratedPlateCache(self.temp_dir)
+        old = cache.get_set(2, 80, seed=1)
+        cache.get_set(2, 80, seed=2)
+        self.assertFalse(os.path.exists(old[0]["path"]))
+
+    def test_prune_keeps_unrelated_files(self):
+        """En un directorio compartido solo se borran los juegos del generador."""
+        other = os.path.join(self.temp_dir, "notas.txt")
+        with open(other, "w") as f:
+            f.write("no borrar")
+        cache = GeneratedPlateCache(self.temp_dir)
+        cache.get_set(2, 80, seed=1)
+        cache.get_set(2, 80, seed=2)
+        self.assertTrue(os.path.exists(other))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests unitarios para el manifiesto de láminas.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.PlateCache import file_sha256
+from lib.PlateManifest import MANIFEST_FILENAME, PlateManifest, write_manifest
+
+
+class TestPlateManifest(unittest.TestCase):
+    """Tests para la validación incremental de PlateManifest."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.temp_dir, "cache", "index.json")
+        entries = []
+        for name, color in (("12", (200, 0, 0)), ("29", (0, 200, 0))):
+            path = os.path.join(self.temp_dir, f"{name}.png")
+            Image.new("RGB", (16, 12), color).save(path)
+            entries.append({"name": name, "file": f"{name}.png", "correct": int(name),
+                            "options": [int(name), 1, "No veo nada"], "difficulty": "easy",
+                            "sha256": file_sha256(path)})
+        write_manifest(os.path.join(self.temp_dir, MANIFEST_FILENAME), entries)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def manifest(self):
+        return PlateManifest(self.temp_dir, self.index_path)
+
+    def test_first_run_hashes_everything(self):
+        """Sin índice previo se verifican todos los archivos."""
+        manifest = self.manifest()
+        entries = manifest.validated_entries()
+        self.assertEqual([e["name"] for e in entries], ["12", "29"])
+        self.assertEqual((entries[0]["width"], entries[0]["height"]), (16, 12))
+        self.assertEqual((manifest.rehashed, manifest.reused), (2, 0))
+
+    def test_unchanged_files_are_not_rehashed(self):
+        """En el segundo arranque las entradas salen del índice."""
+        self.manifest().validated_entries()
+        manifest = self.manifest()
+        self.assertEqual(len(manifest.validated_entries()), 2)
+        self.assertEqual((manifest.rehashed, manifest.reused), (0, 2))
+
+    def test_modified_file_is_rejected(self):
+        """Un archivo cuyo hash ya no coincide se omite."""
+        self.manifest().validated_entries()
+        Image.new("RGB", (16, 12), (0, 0, 200)).save(os.path.join(self.temp_dir, "29.png"))
+        os.utime(os.path.join(self.temp_dir, "29.png"), ns=(1, 1))
+        manifest = self.manifest()
+        entries = manifest.validated_entries()
+        self.assertEqual([e["name"] for e in entries], ["12"])
+        self.assertEqual((manifest.rehashed, manifest.invalid), (1, 1))
+
+    def test_missing_file_is_skipped(self):
+        """Una lámina sin archivo no rompe la carga."""
+        os.remove(os.path.join(self.temp_dir, "12.png"))
+        self.assertEqual([e["name"] for e in self.manifest().validated_entries()], ["29"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Tests unitarios para el paquete de láminas mapeado en memoria.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import weakref
+import shutil
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.PlateManifest import MANIFEST_FILENAME, write_manifest
+from lib.PlatePack import PACK_FILENAME, PackedPlateImage, PlatePack, source_fingerprint, write_pack
+from lib.PlateStore import DecodedImageLRU
+
+
+def make_plate(name, value, shape=(20, 30)):
+    return {
+        "name": name, "correct": int(name), "options": [int(name), 1, 2, "No veo nada"],
+        "difficulty": "easy", "sha256": name * 8,
+        "image": np.full(shape + (3,), value, dtype=np.uint8),
+    }
+
+
+class TestPlatePack(unittest.TestCase):
+    """Tests para write_pack, PlatePack y PackedPlateImage."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, PACK_FILENAME)
+        write_pack(self.path, [make_plate("12", 10), make_plate("42", 200, (31, 17))])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_roundtrip(self):
+        """Cabecera y píxeles se recuperan tal cual se escribieron."""
+        pack = PlatePack(self.path)
+        self.assertEqual([e["name"] for e in pack.entries], ["12", "42"])
+        self.assertEqual(pack.entries[1]["options"], [42, 1, 2, "No veo nada"])
+        self.assertEqual(pack.array("42").shape, (31, 17, 3))
+        self.assertTrue((pack.array("42") == 200).all())
+        self.assertTrue((pack.array("12") == 10).all())
+
+    def test_streams_one_image_at_a_time(self):
+        """Con shape, write_pack suelta cada imagen antes de pedir la siguiente."""
+        plates = [dict(make_plate("12", 0), shape=(20, 30, 3)), dict(make_plate("42", 0), shape=(31, 17, 3))]
+        for plate in plates:
+            del plate["image"]
+        refs = []
+        alive = []
+
+        def images():
+            for value, shape in ((10, (20, 30, 3)), (200, (31, 17, 3))):
+                alive.append(sum(ref() is not None for ref in refs))
+                image = np.full(shape, value, np.uint8)
+                refs.append(weakref.ref(image))
+                yield image
+                del image
+
+        write_pack(self.path, plates, None, images())
+        self.assertEqual(alive, [0, 0])
+        pack = PlatePack(self.path)
+        self.assertTrue((pack.array("12") == 10).all())
+        self.assertTrue((pack.array("42") == 200).all())
+
+    def test_shape_mismatch_leaves_no_file(self):
+        """Una imagen que no coincide con la cabecera aborta sin dejar el paquete."""
+        target = os.path.join(self.temp_dir, "nuevo.dpk")
+        plate = dict(make_plate("12", 10), shape=(8, 8, 3))
+        with self.assertRaises(ValueError):
+            write_pack(target, [plate])
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), [PACK_FILENAME])
+
+    def test_views_are_zero_copy(self):
+        """Las láminas son vistas de solo lectura sobre el mmap."""
+        view = PlatePack(self.path).array("12")
+        self.assertFalse(view.flags.owndata)
+        self.assertFalse(view.flags.writeable)
+
+    def test_rejects_foreign_file(self):
+        """Un archivo sin la firma no se acepta como paquete."""
+        bad = os.path.join(self.temp_dir, "otro.dpk")
+        with open(bad, "wb") as f:
+            f.write(b"no es un paquete")
+        with self.assertRaises(ValueError):
+            PlatePack(bad)
+
+    def test_packed_plate_image(self):
+        """PackedPlateImage entrega la lámina escalada como una LazyPlateImage."""
+        pack = PlatePack(self.path)
+        plate = PackedPlateImage(pack, pack.entries[0], DecodedImageLRU())
+        self.assertEqual(plate.get(10).size, (10, 10))
+        self.assertEqual(plate.get().size, (30, 20))
+
+    def test_stale_reason(self):
+        """Cambios en una fuente o en el manifiesto invalidan el paquete."""
+        source = os.path.join(self.temp_dir, "12.png")
+        with open(source, "wb") as f:
+            f.write(b"v1")
+        manifest = os.path.join(self.temp_dir, MANIFEST_FILENAME)
+        write_manifest(manifest, [])
+        from lib.PlateCache import file_sha256
+        plate = dict(make_plate("12", 10), source=source_fingerprint(self.temp_dir, "12.png"))
+        write_pack(self.path, [plate], file_sha256(manifest))
+        self.assertIsNone(PlatePack(self.path).stale_reason(self.temp_dir))
+
+        with open(source, "wb") as f:
+            f.write(b"v2 distinto")
+        self.assertIn("12.png", PlatePack(self.path).stale_reason(self.temp_dir))
+
+        plate["source"] = source_fingerprint(self.temp_dir, "12.png")
+        write_pack(self.path, [plate], file_sha256(manifest))
+        write_manifest(manifest, [{"name": "12"}])
+        self.assertIn(MANIFEST_FILENAME, PlatePack(self.path).stale_reason(self.temp_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
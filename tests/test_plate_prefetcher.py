@@ -0,0 +1,77 @@
+"""
+Tests unitarios para la precarga de láminas en segundo plano.
+"""
+
+import unittest
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.PlatePrefetcher import PlatePrefetcher
+
+
+class FakeRoot:
+    """Simula root.after acumulando callbacks para ejecutarlos desde el test."""
+
+    def __init__(self):
+        self.callbacks = []
+        self.scheduled = threading.Event()
+
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+        self.scheduled.set()
+
+    def run_pending(self):
+        while self.callbacks:
+            self.callbacks.pop(0)()
+
+
+class TestPlatePrefetcher(unittest.TestCase):
+    """Tests para la clase PlatePrefetcher."""
+
+    def setUp(self):
+        self.root = FakeRoot()
+        self.prefetcher = PlatePrefetcher(
+            self.root, fetch=lambda plate: plate["path"].upper(), build=lambda data: f"photo:{data}"
+        )
+
+    def tearDown(self):
+        self.prefetcher.stop()
+
+    def wait_delivery(self):
+        self.assertTrue(self.root.scheduled.wait(2))
+        self.root.scheduled.clear()
+        self.root.run_pending()
+
+    def test_hit_after_delivery(self):
+        """Una lámina entregada antes de la ronda cuenta como acierto."""
+        self.prefetcher.request(0, {"path": "a"})
+        self.wait_delivery()
+        self.assertEqual(self.prefetcher.take(0), "photo:A")
+        self.assertEqual(self.prefetcher.stats()["hits"], 1)
+
+    def test_miss_when_not_ready(self):
+        """Sin precarga la ronda registra un fallo."""
+        self.assertIsNone(self.prefetcher.take(3))
+        self.assertEqual(self.prefetcher.stats()["misses"], 1)
+
+    def test_late_delivery_is_counted(self):
+        """Una entrega posterior a la ronda no se guarda y se marca tardía."""
+        self.prefetcher.request(1, {"path": "b"})
+        self.assertTrue(self.root.scheduled.wait(2))
+        self.prefetcher.take(1)
+        self.root.run_pending()
+        self.assertEqual(self.prefetcher.stats()["late"], 1)
+
+    def test_reset_discards_previous_session(self):
+        """Lo precargado en una sesión anterior no se reutiliza."""
+        self.prefetcher.request(0, {"path": "a"})
+        self.wait_delivery()
+        self.prefetcher.reset()
+        self.assertIsNone(self.prefetcher.take(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Tests unitarios para la pirámide multirresolución de láminas.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.PlatePyramid import PlatePyramid, nearest_level
+from lib.PlateStore import DecodedImageLRU, LazyPlateImage
+
+
+class TestPlatePyramid(unittest.TestCase):
+    """Tests para PlatePyramid."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.temp_dir, "12.png")
+        Image.new("RGB", (300, 300), (10, 120, 30)).save(self.source)
+        self.pyramid = PlatePyramid(os.path.join(self.temp_dir, "pyramid"), levels=(64, 128))
+        self.digest = "ab" * 32
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_nearest_level(self):
+        """Se elige el menor nivel que cubre el tamaño pedido."""
+        self.assertEqual(nearest_level(336), 384)
+        self.assertEqual(nearest_level(512), 512)
+        self.assertEqual(nearest_level(756), 768)
+        self.assertEqual(nearest_level(2000), 1024)
+
+    def test_build_and_load(self):
+        """Se generan todos los niveles y se sirve el tamaño exacto."""
+        self.assertEqual(self.pyramid.build(self.source, self.digest), 2)
+        self.assertTrue(self.pyramid.has(self.digest))
+        self.assertEqual(self.pyramid.build(self.source, self.digest), 0)
+        self.assertEqual(self.pyramid.load(self.digest, 100).size, (100, 100))
+        self.assertIsNotNone(self.pyramid.thumbnail_path(self.digest))
+
+    def test_missing_pyramid_falls_back(self):
+        """Sin niveles, LazyPlateImage decodifica el original."""
+        self.assertIsNone(self.pyramid.load(self.digest, 100))
+        plate = LazyPlateImage(self.source, DecodedImageLRU(), digest=self.digest, pyramid=self.pyramid)
+        self.assertEqual(plate.get(100).size, (100, 100))
+
+    def test_prune_removes_stale_plates(self):
+        """Los niveles de láminas retiradas se eliminan."""
+        self.pyramid.build(self.source, self.digest)
+        self.assertEqual(self.pyramid.prune([]), 2)
+        self.assertFalse(self.pyramid.has(self.digest))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests unitarios para la carga perezosa de láminas.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.PlateStore import DecodedImageLRU, LazyPlateImage, decode_for_size
+
+
+class TestPlateStore(unittest.TestCase):
+    """Tests para LazyPlateImage y DecodedImageLRU."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.png = os.path.join(self.temp_dir, "12.png")
+        self.jpg = os.path.join(self.temp_dir, "13.jpg")
+        Image.new("RGB", (400, 400), (200, 30, 30)).save(self.png)
+        Image.new("RGB", (800, 800), (30, 200, 30)).save(self.jpg)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_probe_reads_header_only(self):
+        """Al cargar solo se lee la cabecera, sin ocupar el LRU."""
+        lru = DecodedImageLRU()
+        plate = LazyPlateImage.probe(self.png, lru)
+        self.assertEqual(plate.size, (400, 400))
+        self.assertEqual(len(lru), 0)
+
+    def test_probe_rejects_invalid_file(self):
+        """Un archivo que no es imagen se rechaza al cargar."""
+        bad = os.path.join(self.temp_dir, "5.png")
+        open(bad, 'w').close()
+        with self.assertRaises(Exception):
+            LazyPlateImage.probe(bad, DecodedImageLRU())
+
+    def test_decode_to_target_size(self):
+        """PNG y JPEG se decodifican directamente al tamaño pedido."""
+        self.assertEqual(decode_for_size(self.png, 100).size, (100, 100))
+        self.assertEqual(decode_for_size(self.jpg, 100).size, (100, 100))
+
+    def test_get_reuses_decoded_pixels(self):
+        """La segunda petición del mismo tamaño sale del LRU."""
+        lru = DecodedImageLRU()
+        plate = LazyPlateImage.probe(self.png, lru)
+        first = plate.get(100)
+        self.assertIs(plate.get(100), first)
+        self.assertEqual((lru.hits, lru.misses), (1, 1))
+
+    def test_lru_respects_byte_budget(self):
+        """El LRU expulsa lo menos usado al superar el presupuesto."""
+        lru = DecodedImageLRU(max_bytes=2 * 100 * 100 * 3)
+        for i in range(3):
+            lru.put(i, Image.new("RGB", (100, 100)))
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get(0))
+        self.assertLessEqual(lru.current_bytes, lru.max_bytes)
+        self.assertEqual(lru.evictions, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests unitarios para el detector de presencia.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib import Presence
+from lib.Presence import PresenceEstimator, load_trace, replay, save_trace
+
+
+def feed(estimator, readings, start=0.0, step=0.1):
+    """Pasa lecturas equiespaciadas y devuelve la presencia tras cada una"""
+    return [estimator.update(d, start + i * step) for i, d in enumerate(readings)]
+
+
+class TestPresenceEstimator(unittest.TestCase):
+    """Tests para PresenceEstimator."""
+
+    def setUp(self):
+        self.estimator = PresenceEstimator(enter_cm=50, exit_cm=65, window=5, alpha=0.5, exit_dwell=2.0)
+
+    def test_single_near_reading_ignored(self):
+        """Un eco espurio cercano no hace presente al usuario"""
+        states = feed(self.estimator, [300, 300, 20, 300, 300])
+        self.assertFalse(any(states))
+
+    def test_enters_after_consistent_readings(self):
+        states = feed(self.estimator, [300] + [40] * 8)
+        self.assertFalse(states[2])
+        self.assertTrue(states[-1])
+
+    def test_spurious_far_readings_do_not_abort(self):
+        """Ecos perdidos sueltos con el usuario delante no abortan"""
+        feed(self.estimator, [40] * 10)
+        states = feed(self.estimator, [None, 40, 40, 999, 40, 40] * 5, start=1.0)
+        self.assertTrue(all(states))
+
+    def test_exit_needs_dwell(self):
+        """Solo se va tras superar el umbral de salida durante la permanencia"""
+        feed(self.estimator, [40] * 10)
+        states = feed(self.estimator, [200] * 30, start=1.0)
+        first_absent = states.index(False)
+        # Unas lecturas para que el filtro supere 65 cm y luego 2 s (20 lecturas)
+        self.assertGreaterEqual(first_absent, 20)
+        self.assertLess(first_absent, 26)
+
+    def test_hysteresis_band(self):
+        """Entre los umbrales de entrada y salida se mantiene el estado"""
+        feed(self.estimator, [40] * 10)
+        states = feed(self.estimator, [58] * 50, start=1.0)
+        self.assertTrue(all(states))
+        self.assertFalse(any(feed(PresenceEstimator(), [58] * 50)))
+
+    def test_returning_cancels_exit(self):
+        feed(self.estimator, [40] * 10)
+        feed(self.estimator, [200] * 12, start=1.0)
+        self.assertIsNotNone(self.estimator.leaving_since)
+        feed(self.estimator, [40] * 10, start=2.2)
+        self.assertTrue(self.estimator.present)
+        self.assertIsNone(self.estimator.leaving_since)
+
+    def test_adaptive_interval(self):
+        """Lento en reposo, rápido al acercarse o confirmando una salida"""
+        feed(self.estimator, [300] * 5)
+        self.assertEqual(self.estimator.interval(), Presence.IDLE_INTERVAL)
+        feed(self.estimator, [90] * 5, start=1.0)
+        self.assertEqual(self.estimator.interval(), Presence.APPROACH_INTERVAL)
+        feed(self.estimator, [40] * 5, start=2.0)
+        self.assertEqual(self.estimator.interval(), Presence.PRESENT_INTERVAL)
+        feed(self.estimator, [200] * 5, start=3.0)
+        self.assertEqual(self.estimator.interval(), Presence.APPROACH_INTERVAL)
+
+
+class TestReplay(unittest.TestCase):
+    """Tests para la reproducción de trazas."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_replay_visit(self):
+        """Una visita con un eco perdido da exactamente una entrada y una salida"""
+        trace = [(i * 0.05, 300.0) for i in range(200)]
+        trace += [(10 + i * 0.05, 40.0 if i % 50 else None) for i in range(400)]
+        trace += [(30 + i * 0.05, 300.0) for i in range(200)]
+        transitions, samples = replay(trace, PresenceEstimator())
+        self.assertEqual([present for _, present in transitions], [True, False])
+        self.assertGreater(transitions[1][0], 30 + Presence.EXIT_DWELL)
+        self.assertLess(samples, len(trace))
+
+    def test_fixed_interval(self):
+        trace = [(0.0, 300.0), (10.0, 300.0)]
+        _, samples = replay(trace, PresenceEstimator(), interval=1.0)
+        self.assertEqual(samples, 11)
+
+    def test_trace_roundtrip(self):
+        """CSV con ecos perdidos como celdas vacías"""
+        path = os.path.join(self.temp_dir, "traza.csv")
+        save_trace(path, [(0.0, 120.5), (0.05, None)])
+        self.assertEqual(load_trace(path), [(0.0, 120.5), (0.05, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
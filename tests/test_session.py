@@ -0,0 +1,82 @@
+"""
+Tests unitarios para la máquina de estados de la sesión.
+"""
+
+import unittest
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.Session import SessionEngine, evaluate
+
+COLORS = ["Rojo", "Verde", "Azul"]
+PLATES = [
+    {"correct_answer": 12, "options": [12, 17, 21, "No veo nada"]},
+    {"correct_answer": 8, "options": [8, 3, 6, "No veo nada"]},
+]
+
+
+class TestSessionEngine(unittest.TestCase):
+    """Tests para SessionEngine."""
+
+    def setUp(self):
+        self.session = SessionEngine(COLORS, PLATES, color_attempts=4, rng=random.Random(1))
+
+    def test_phases(self):
+        """La sesión pasa por colores, Ishihara y resultados."""
+        self.assertEqual(self.session.phase, "waiting")
+        self.session.start()
+        self.assertEqual(self.session.phase, "colors")
+        for _ in range(4):
+            self.assertTrue(self.session.answer(self.session.current_color))
+        self.assertEqual(self.session.phase, "ishihara")
+        self.assertEqual(self.session.current_plate["correct_answer"], 12)
+        self.assertFalse(self.session.answer(17))
+        self.assertTrue(self.session.answer(8))
+        self.assertEqual(self.session.phase, "results")
+        with self.assertRaises(RuntimeError):
+            self.session.answer(8)
+
+    def test_results_and_thresholds(self):
+        """Porcentajes y evaluación con los umbrales 75/85/65."""
+        results = self.session.run(lambda color: color, lambda plate: "No veo nada")
+        self.assertEqual(results["color_score"], 4)
+        self.assertEqual(results["ishihara_score"], 0)
+        self.assertAlmostEqual(results["overall_percentage"], 4 / 6 * 100)
+        self.assertFalse(results["satisfactory"])
+        self.assertEqual(results["evaluation"], "mild")
+        self.assertEqual(evaluate(85), "normal")
+        self.assertEqual(evaluate(64.9), "consult")
+
+    def test_no_plates_goes_to_results(self):
+        """Sin láminas, al terminar los colores se pasa a resultados."""
+        session = SessionEngine(COLORS, [], color_attempts=1)
+        session.start()
+        session.answer(session.current_color)
+        self.assertEqual(session.phase, "results")
+        self.assertEqual(session.results()["ishihara_attempts"], 0)
+
+    def test_restart_resets_scores(self):
+        """start() deja la sesión limpia aunque la anterior quedara a medias."""
+        self.session.start()
+        self.session.answer(self.session.current_color)
+        self.session.abort()
+        self.session.start()
+        self.assertEqual((self.session.color_attempt, self.session.color_score), (0, 0))
+        self.assertEqual(self.session.answers, [])
+
+    def test_skip_does_not_score(self):
+        """Una lámina sin imagen se salta sin puntuar."""
+        self.session.run(lambda color: color, lambda plate: plate["correct_answer"])
+        self.session.start()
+        for _ in range(4):
+            self.session.answer(self.session.current_color)
+        self.session.skip()
+        self.session.answer(8)
+        self.assertEqual(self.session.results()["ishihara_score"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
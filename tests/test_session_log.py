@@ -0,0 +1,310 @@
+"""
+Tests unitarios para la grabación y reproducción de sesiones.
+"""
+
+import unittest
+import json
+import os
+import random
+import struct
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.FakeGPIO import VirtualClock
+from lib.Hardware import led_color
+from lib.InputPipeline import InputPipeline
+from lib.Session import SessionEngine
+from lib.SessionLog import MAGIC, SessionRecorder, SessionReplay, read_log
+
+COLOR_NAMES = ["Rojo", "Verde", "Azul", "Amarillo", "Naranja", "Morado"]
+SEED = 1234
+
+
+class FakeRoot:
+    """root.after que ejecuta el callback en el acto"""
+
+    def after(self, ms, func=None, *args):
+        if func is not None:
+            func(*args)
+        return "after#1"
+
+
+class VirtualRoot:
+    """root.after sobre un reloj virtual: el callback corre al avanzar el reloj"""
+
+    def __init__(self, clock):
+        self.clock = clock
+
+    def after(self, ms, func=None, *args):
+        if func is not None:
+            self.clock.call_later(ms / 1000.0, func, *args)
+        return "after#1"
+
+
+class TestSessionLog(unittest.TestCase):
+    """Tests para SessionRecorder y read_log."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "logs", "dia.dlog")
+        self.clock = VirtualClock(start=50.0)
+        self.recorder = SessionRecorder(self.path, clock=self.clock, seed=SEED)
+
+    def tearDown(self):
+        self.recorder.close()
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        root = FakeRoot()
+        self.recorder.install(root)
+        self.recorder.distance(42.5)
+        self.clock.advance(0.25)
+        self.recorder.distance(None)
+        self.clock.advance(1000.0)
+        self.recorder.tap("ishihara", "ishihara", 12)
+        self.recorder.tap("colors", "results", "Rojo")
+        root.after(10, lambda: None)
+        self.recorder.command(led_color(0, 0, 100))
+        self.recorder.mark("round", "colors:0")
+        self.recorder.close()
+
+        header, events = read_log(self.path)
+        self.assertEqual(header["seed"], SEED)
+        self.assertEqual([(e.kind, e.data) for e in events], [
+            ("distance", (42.5,)), ("distance", (None,)), ("tap", ("ishihara", "ishihara", 12)),
+            ("tap", ("colors", "results", "Rojo")),
+            ("after", ("<lambda>",)), ("command", ("led", 1, "color 0/0/100")), ("mark", ("round", "colors:0")),
+        ])
+        self.assertEqual([e.t for e in events][:3], [0.0, 0.25, 1000.25])
+
+    def test_compact(self):
+        """Una lectura del sensor ocupa unos pocos bytes"""
+        for _ in range(1000):
+            self.recorder.distance(35.0)
+            self.clock.advance(0.25)
+        self.recorder.close()
+        self.assertLess(os.path.getsize(self.path), 1000 * 8 + 64)
+
+    def test_truncated_log(self):
+        for i in range(10):
+            self.recorder.mark("round", f"colors:{i}")
+        self.recorder.close()
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with open(self.path, "wb") as f:
+            f.write(data[:-2])
+        _, events = read_log(self.path)
+        self.assertEqual(len(events), 9)
+
+    def test_reads_version_1(self):
+        """Los logs v1 (pulsaciones sin pantalla) se siguen leyendo"""
+        self.recorder.close()
+        with open(self.path, "wb") as f:
+            f.write(struct.pack("<4sBdI", MAGIC, 1, 0.0, SEED))
+            f.write(bytes([0, 0, 6]) + b"colors" + bytes([0, 1, 6]) + b'"Rojo"')
+            f.write(bytes([2, 10, 0, 1]))
+        header, events = read_log(self.path)
+        self.assertEqual(header["version"], 1)
+        self.assertEqual([(e.kind, e.data) for e in events], [("tap", ("colors", None, "Rojo"))])
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"no es un log de sesiones")
+        with self.assertRaises(ValueError):
+            read_log(self.path)
+
+
+class TestSessionReplay(unittest.TestCase):
+    """Tests para SessionReplay sobre un log grabado."""
+
+    def record_session(self, path, double_tap=False, start_seed=True):
+        """Sesión de colores (sin láminas) con todas las respuestas correctas"""
+        clock = VirtualClock()
+        recorder = SessionRecorder(path, clock=clock, seed=SEED)
+        seed = recorder.session_seed()
+        colors = random.Random(seed)
+        for _ in range(3):
+            recorder.distance(200)
+            clock.advance(0.6)
+        for _ in range(10):
+            recorder.distance(30)
+            clock.advance(0.1)
+        recorder.mark("start", str(seed) if start_seed else "")
+        recorder.mark("plates", "[]")
+        for attempt in range(8):
+            recorder.mark("round", f"colors:{attempt}")
+            clock.advance(1.0)
+            recorder.distance(30)
+            color = colors.choice(COLOR_NAMES)
+            recorder.tap("colors", "colors", color)
+            if double_tap:
+                clock.advance(0.1)
+                recorder.tap("colors", "colors", color)
+            clock.advance(0.6)
+        recorder.mark("results", json.dumps({"color_score": 8, "overall_percentage": 100.0}))
+        recorder.close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "dia.dlog")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replay_matches_recording(self):
+        self.record_session(self.path)
+        header, events = read_log(self.path)
+        summary = SessionReplay(COLOR_NAMES, seed=header["seed"]).run(events)
+        self.assertEqual(summary["sessions"], 1)
+        self.assertEqual(summary["completed"], 1)
+        self.assertEqual(summary["recorded_sessions"], 1)
+        self.assertEqual(summary["mismatches"], [])
+
+    def test_double_taps_are_not_scored_twice(self):
+        self.record_session(self.path, double_tap=True)
+        header, events = read_log(self.path)
+        summary = SessionReplay(COLOR_NAMES, seed=header["seed"]).run(events)
+        # El toque repetido de la última ronda llega ya fuera del test
+        self.assertEqual(summary["input"], {"accepted": 8, "locked": 0, "bounced": 7})
+        self.assertEqual(summary["gated"], 1)
+        self.assertEqual(summary["mismatches"], [])
+
+    def test_detects_divergence(self):
+        """Otra semilla pide otros colores: los resultados no coinciden"""
+        self.record_session(self.path, start_seed=False)
+        _, events = read_log(self.path)
+        summary = SessionReplay(COLOR_NAMES, seed=SEED + 1).run(events)
+        self.assertEqual(len(summary["mismatches"]), 1)
+
+    def test_speed(self):
+        """A 100x, los ~17 s grabados se esperan en ~0.17 s (sueño simulado)"""
+        self.record_session(self.path)
+        header, events = read_log(self.path)
+        clock = VirtualClock()
+        replay = SessionReplay(COLOR_NAMES, seed=header["seed"], speed=100, sleep=clock.sleep, realtime=clock)
+        summary = replay.run(events)
+        self.assertAlmostEqual(summary["wall_s"], summary["virtual_s"] / 100, places=3)
+
+
+class TestReplayOfKioskRecording(unittest.TestCase):
+    """
+    Log grabado por los manejadores reales de TestDaltonismoCompleto (sin Tk: los
+    widgets y el hardware son mocks y root.after corre sobre un reloj virtual)
+    y reproducido con SessionReplay.
+    """
+
+    def setUp(self):
+        try:
+            import dalton
+        except ImportError:
+            self.skipTest("No se puede importar el módulo dalton")
+        self.dalton = dalton
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "kiosco.dlog")
+        self.clock = VirtualClock()
+        self.app = self.make_app()
+        patches = [patch.object(dalton, "SENSOR_ENABLED", True), patch.object(dalton, "REPORTING", MagicMock(failed=True))]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self.app.recorder.close()
+        self.tmp.cleanup()
+
+    def make_app(self):
+        dalton = self.dalton
+        app = dalton.TestDaltonismoCompleto.__new__(dalton.TestDaltonismoCompleto)
+        app.root = VirtualRoot(self.clock)
+        app.recorder = SessionRecorder(self.path, clock=self.clock, seed=SEED)
+        app.session = SessionEngine(dalton.colors.keys(), color_attempts=8)
+        app.input = InputPipeline(clock=self.clock)
+        app.presence = dalton.PresenceEstimator(dalton.MIN_DISTANCE, dalton.EXIT_DISTANCE, exit_dwell=dalton.EXIT_DWELL)
+        app.ultrasonic = MagicMock()
+        app.user_nearby = False
+        app.current_test = "waiting"
+        app.plates_ready = True
+        app.visible_screen = None
+        app.loop_monitor = None
+        app.ishihara_loader = None
+        app.buzzer_pwm = None
+        app.color_buttons = {name: MagicMock() for name in dalton.colors}
+        app.option_buttons = [MagicMock() for _ in range(4)]
+        for name in ("hardware", "animator", "plate_prefetcher", "test_indicator", "label", "main_frame",
+                     "ishihara_frame", "results_frame", "ishihara_image_label", "color_result_label",
+                     "ishihara_result_label", "results_title", "eval_label", "proximity_indicator"):
+            setattr(app, name, MagicMock())
+        app.ishihara_plates = [{"filename": str(n), "correct_answer": n, "options": [n, 1, 2, "No veo nada"],
+                                "image": object(), "difficulty": "easy"} for n in (12, 29, 42)]
+        app.session.set_plates(app.ishihara_plates)
+        return app
+
+    def stay(self, seconds, distance):
+        """Hilo del sensor: lecturas cada 0.1 s mientras avanza el reloj"""
+        end = self.clock() + seconds
+        while self.clock() < end:
+            self.app.ultrasonic.measure.return_value = distance
+            self.app.on_distance(self.app.get_distance(), self.clock())
+            self.clock.advance(0.1)
+
+    def answer(self, right=True):
+        session = self.app.session
+        if session.phase == "colors":
+            value = session.current_color if right else "Morado" if session.current_color != "Morado" else "Rojo"
+            self.app.check_color_answer_with_animation(value)
+        else:
+            value = session.current_plate["correct_answer"] if right else "No veo nada"
+            self.app.check_ishihara_answer(value)
+        return value
+
+    def test_replay_matches_kiosk(self):
+        app = self.app
+        # Primer visitante: test completo con un fallo, un doble toque y
+        # toques fuera de pantalla; pulsa "reiniciar" al ver el resultado
+        self.stay(3.0, 200)
+        self.stay(1.0, 35)
+        self.assertEqual(app.current_test, "colors")
+        app.check_ishihara_answer(12)
+        value = self.answer()
+        self.clock.advance(0.05)
+        app.check_color_answer_with_animation(value)
+        self.stay(1.0, 35)
+        while app.current_test in ("colors", "ishihara"):
+            self.answer(right=app.session.color_attempt != 3)
+            self.stay(1.6, 35)
+        self.assertEqual(app.current_test, "results")
+        app.check_ishihara_answer(42)
+        app.restart_test()
+        self.assertEqual(app.current_test, "waiting")
+
+        # Segundo visitante: se aleja y su última respuesta llega justo
+        # antes de que deje de contar como presente: la sesión se aborta
+        self.stay(4.0, 200)
+        self.stay(1.0, 35)
+        self.answer()
+        self.stay(1.0, 35)
+        self.stay(1.9, 200)
+        self.answer()
+        self.stay(3.0, 200)
+        self.assertEqual(app.current_test, "waiting")
+        app.recorder.close()
+
+        header, events = read_log(self.path)
+        summary = SessionReplay(self.dalton.colors.keys(), seed=header["seed"]).run(events)
+        self.assertEqual(summary["sessions"], 2)
+        self.assertEqual(summary["completed"], 1)
+        self.assertEqual(summary["aborted"], 1)
+        self.assertEqual(summary["restarts"], 1)
+        self.assertEqual(summary["recorded_completed"], 1)
+        self.assertEqual(summary["mismatches"], [])
+        self.assertEqual(summary["presence_mismatches"], 0)
+        # Mismos toques aceptados, repetidos y bloqueados que en el kiosco
+        self.assertEqual(summary["input"], app.input.stats())
+        self.assertEqual(summary["gated"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
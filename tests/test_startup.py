@@ -0,0 +1,104 @@
+"""
+Tests unitarios para el perfil de arranque y los imports en segundo plano.
+"""
+
+import unittest
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.Startup import BackgroundImport, StartupProfiler  # noqa: E402
+
+
+class FakeClock:
+    """Reloj manual en segundos"""
+
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStartupProfiler(unittest.TestCase):
+    """Tests para StartupProfiler."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.profiler = StartupProfiler(origin=9.0, clock=self.clock)
+
+    def test_marks_are_consecutive(self):
+        """Cada marca mide desde la anterior (la primera, desde el origen)"""
+        self.profiler.mark("modulos")
+        self.clock.now = 10.25
+        self.profiler.mark("ventana")
+
+        report = self.profiler.report()
+        self.assertEqual([e["phase"] for e in report], ["modulos", "ventana"])
+        self.assertEqual(report[0], {"phase": "modulos", "start_ms": 0.0, "ms": 1000.0})
+        self.assertEqual(report[1], {"phase": "ventana", "start_ms": 1000.0, "ms": 250.0})
+
+    def test_phase_measures_block_and_sorts_by_start(self):
+        """Las fases de otros hilos se intercalan por su inicio"""
+        self.clock.now = 10.5
+        with self.profiler.phase("laminas"):
+            self.clock.now = 11.0
+        self.clock.now = 12.0
+        self.profiler.mark("interfaz")
+
+        report = self.profiler.report()
+        self.assertEqual([e["phase"] for e in report], ["interfaz", "laminas"])
+        self.assertEqual(report[1]["start_ms"], 1500.0)
+        self.assertEqual(report[1]["ms"], 500.0)
+
+    def test_phase_recorded_on_error(self):
+        """Una fase que falla también queda anotada"""
+        with self.assertRaises(ValueError):
+            with self.profiler.phase("cache"):
+                raise ValueError("fallo")
+        self.assertEqual(self.profiler.report()[0]["phase"], "cache")
+
+    def test_disabled_records_nothing(self):
+        """Sin --profile-startup no se anota nada"""
+        profiler = StartupProfiler(enabled=False, clock=self.clock)
+        profiler.mark("modulos")
+        with profiler.phase("laminas"):
+            pass
+        self.assertEqual(profiler.report(), [])
+
+
+class TestBackgroundImport(unittest.TestCase):
+    """Tests para BackgroundImport."""
+
+    def test_imports_in_another_thread(self):
+        """El módulo se importa fuera del hilo que lo pide"""
+        loader = BackgroundImport("lib.Session").start()
+        module = loader.get(timeout=10)
+        self.assertTrue(loader.done())
+        self.assertFalse(loader.failed)
+        self.assertTrue(hasattr(module, "SessionEngine"))
+        self.assertIsNot(loader._thread, threading.current_thread())
+
+    def test_get_starts_import(self):
+        """get() sin start() previo lanza la importación"""
+        loader = BackgroundImport("json")
+        self.assertIsNotNone(loader.get(timeout=10))
+
+    def test_failed_import(self):
+        """Un módulo que no existe deja failed y get() devuelve None"""
+        loader = BackgroundImport("lib.ModuloInexistente")
+        self.assertIsNone(loader.get(timeout=10))
+        self.assertTrue(loader.failed)
+        self.assertIsInstance(loader.error, ImportError)
+
+    def test_profiled(self):
+        """Con perfilador, la importación aparece como una fase"""
+        profiler = StartupProfiler()
+        BackgroundImport("lib.Animator", profiler).get(timeout=10)
+        self.assertEqual(profiler.report()[0]["phase"], "import lib.Animator")
+
+
+if __name__ == '__main__':
+    unittest.main()
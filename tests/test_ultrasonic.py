@@ -0,0 +1,149 @@
+"""
+Tests unitarios para la medición del sensor ultrasónico.
+"""
+
+import unittest
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lib.Ultrasonic import SimulatedUltrasonic, UltrasonicSensor, pulse_to_cm  # noqa: E402
+
+TRIG, ECHO = 17, 27
+
+
+class FakeClock:
+    """Reloj manual en segundos"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeGPIO:
+    """
+    GPIO mínimo: al bajar TRIG genera los flancos de un eco de `pulse`
+    segundos (o ninguno si pulse es None), llamando al callback registrado.
+    """
+
+    BOTH = "both"
+
+    def __init__(self, clock, pulse=None, edge_detect=True):
+        self.clock = clock
+        self.pulse = pulse
+        self.edge_detect = edge_detect
+        self.callback = None
+        self.level = 0
+        self.removed = False
+
+    def add_event_detect(self, pin, edge, callback=None):
+        if not self.edge_detect:
+            raise RuntimeError("Failed to add edge detection")
+        self.callback = callback
+
+    def remove_event_detect(self, pin):
+        self.removed = True
+
+    def output(self, pin, value):
+        if pin == TRIG and not value and self.pulse is not None and self.callback:
+            self.clock.now += 0.0005
+            self.callback(ECHO)
+            self.clock.now += self.pulse
+            self.callback(ECHO)
+
+    def input(self, pin):
+        # Sondeo: el eco sube en la primera lectura y dura `pulse`
+        self.clock.now += 0.0001
+        if self.pulse is None:
+            return 0
+        if self.level == 0:
+            self.level = 1
+            self._fall = self.clock.now + self.pulse
+            return 1
+        return 1 if self.clock.now < self._fall else 0
+
+
+class TestUltrasonicSensor(unittest.TestCase):
+    """Tests para UltrasonicSensor."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make(self, pulse, edge_detect=True, timeout=0.03):
+        self.gpio = FakeGPIO(self.clock, pulse, edge_detect)
+        return UltrasonicSensor(self.gpio, TRIG, ECHO, timeout=timeout,
+                                clock=self.clock, sleep=lambda s: None).start()
+
+    def test_pulse_to_cm(self):
+        """Un pulso de 2 ms son ~34 cm (ida y vuelta)"""
+        self.assertAlmostEqual(pulse_to_cm(0.002), 34.3)
+
+    def test_edge_measurement(self):
+        """La distancia sale del tiempo entre los dos flancos"""
+        sensor = self.make(0.0025)
+        self.assertTrue(sensor.edge_detect)
+        self.assertAlmostEqual(sensor.measure(), pulse_to_cm(0.0025), places=6)
+        self.assertEqual(sensor.timeouts, 0)
+
+    def test_missed_echo_times_out(self):
+        """Sin eco la muestra devuelve None en el tiempo límite, sin colgarse"""
+        sensor = UltrasonicSensor(FakeGPIO(self.clock, None), TRIG, ECHO, timeout=0.01,
+                                  sleep=lambda s: None).start()
+        start = time.perf_counter()
+        self.assertIsNone(sensor.measure())
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(sensor.timeouts, 1)
+
+    def test_edges_outside_measurement_ignored(self):
+        """Flancos sueltos fuera de una medición no cuentan"""
+        sensor = self.make(0.002)
+        sensor._on_edge(ECHO)
+        sensor._on_edge(ECHO)
+        self.assertAlmostEqual(sensor.measure(), pulse_to_cm(0.002), places=6)
+
+    def test_polled_fallback(self):
+        """Sin detección de flancos se sondea con el mismo tiempo límite"""
+        sensor = self.make(0.002, edge_detect=False)
+        self.assertFalse(sensor.edge_detect)
+        self.assertAlmostEqual(sensor.measure(), pulse_to_cm(0.002), delta=0.5)
+
+    def test_polled_fallback_timeout(self):
+        """El sondeo también termina si el eco no llega"""
+        sensor = self.make(None, edge_detect=False, timeout=0.01)
+        self.assertIsNone(sensor.measure())
+
+    def test_close_removes_event_detect(self):
+        sensor = self.make(0.002)
+        sensor.close()
+        self.assertTrue(self.gpio.removed)
+        self.assertFalse(sensor.edge_detect)
+
+
+class TestSimulatedUltrasonic(unittest.TestCase):
+    """Tests para SimulatedUltrasonic."""
+
+    def test_fixed_distance(self):
+        self.assertEqual(SimulatedUltrasonic(30).measure(), 30.0)
+
+    def test_sequence_repeats_last(self):
+        """Una secuencia se reproduce y luego repite su último valor"""
+        sensor = SimulatedUltrasonic([80, None, 40])
+        self.assertEqual([sensor.measure() for _ in range(5)], [80.0, None, 40.0, 40.0, 40.0])
+        self.assertEqual(sensor.timeouts, 1)
+
+    def test_realtime_sleeps(self):
+        """En tiempo real un eco perdido espera el tiempo límite"""
+        waits = []
+        sensor = SimulatedUltrasonic([None, 343], timeout=0.03, realtime=True, sleep=waits.append)
+        sensor.measure()
+        sensor.measure()
+        self.assertEqual(waits[0], 0.03)
+        self.assertAlmostEqual(waits[1], 0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()